@@ -37,6 +37,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        render_as_batch=url.startswith("sqlite"),
     )
 
     with context.begin_transaction():
@@ -57,7 +58,10 @@ def run_migrations_online() -> None:
     with connectable.connect() as connection:
         context.configure(
             connection=connection, 
-            target_metadata=target_metadata
+            target_metadata=target_metadata,
+            # SQLite cannot ALTER most constraints in place; batch mode
+            # recreates tables so the same migrations run on edge nodes.
+            render_as_batch=connection.dialect.name == "sqlite"
         )
 
         with context.begin_transaction():
@@ -0,0 +1,47 @@
+"""add lexicon_version to cultural contexts
+
+Revision ID: 3f9c2a7d1b40
+Revises: 
+Create Date: 2026-10-19 03:06:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a7d1b40'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+TABLE = "anisa_cultural_contexts"
+INDEX = "ix_anisa_cultural_contexts_lexicon_version"
+
+
+def _has_column() -> bool:
+    """Whether the contexts table exists and already has lexicon_version."""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(TABLE):
+        return False
+    return "lexicon_version" in {column["name"] for column in inspector.get_columns(TABLE)}
+
+
+def upgrade() -> None:
+    # Fresh databases get the column from init_db(); only tables created
+    # before it need altering. Offline (--sql) output always includes it.
+    if not op.get_context().as_sql:
+        inspector = sa.inspect(op.get_bind())
+        if not inspector.has_table(TABLE) or _has_column():
+            return
+    with op.batch_alter_table(TABLE) as batch_op:
+        batch_op.add_column(sa.Column("lexicon_version", sa.String(length=20), nullable=True))
+        batch_op.create_index(INDEX, ["lexicon_version"], unique=False)
+
+
+def downgrade() -> None:
+    if not op.get_context().as_sql and not _has_column():
+        return
+    with op.batch_alter_table(TABLE) as batch_op:
+        batch_op.drop_index(INDEX)
+        batch_op.drop_column("lexicon_version")
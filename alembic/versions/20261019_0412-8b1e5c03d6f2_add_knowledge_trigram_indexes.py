@@ -0,0 +1,50 @@
+"""add pg_trgm GIN indexes on cultural knowledge
+
+Revision ID: 8b1e5c03d6f2
+Revises: 3f9c2a7d1b40
+Create Date: 2026-10-19 04:12:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b1e5c03d6f2'
+down_revision = '3f9c2a7d1b40'
+branch_labels = None
+depends_on = None
+
+TABLE = "anisa_cultural_knowledge"
+# Mirrors database.KNOWLEDGE_TRGM_COLUMNS
+COLUMNS = ("term", "definition", "trade_relevance")
+
+
+def _applies() -> bool:
+    """PostgreSQL only; online runs also need the knowledge table to exist."""
+    if op.get_context().dialect.name != "postgresql":
+        return False
+    if op.get_context().as_sql:
+        return True
+    return sa.inspect(op.get_bind()).has_table(TABLE)
+
+
+def upgrade() -> None:
+    # Databases created by init_db() after this change already have these
+    # (IF NOT EXISTS keeps the revision a no-op there).
+    if not _applies():
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in COLUMNS:
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_knowledge_{column}_trgm "
+            f"ON {TABLE} USING gin ({column} gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    # The pg_trgm extension is left installed; other objects may use it.
+    if not _applies():
+        return
+    for column in COLUMNS:
+        op.execute(f"DROP INDEX IF EXISTS idx_knowledge_{column}_trgm")
@@ -0,0 +1,53 @@
+"""add lot timeline index on cultural verifications
+
+Revision ID: c4d7a9e2f615
+Revises: 8b1e5c03d6f2
+Create Date: 2026-10-19 05:21:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d7a9e2f615'
+down_revision = '8b1e5c03d6f2'
+branch_labels = None
+depends_on = None
+
+TABLE = "anisa_cultural_verifications"
+INDEX = "idx_lot_created"
+# Single-column lot_id indexes covered by the leftmost column of INDEX
+REDUNDANT = ("idx_lot_id", "ix_anisa_cultural_verifications_lot_id")
+
+
+def _table_missing() -> bool:
+    """Databases without the table get the right indexes from init_db()."""
+    return not op.get_context().as_sql and not sa.inspect(op.get_bind()).has_table(TABLE)
+
+
+def _has_index(name: str) -> bool:
+    """Offline (--sql) runs assume the pre-revision indexes."""
+    if op.get_context().as_sql:
+        return name in REDUNDANT
+    return name in {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(TABLE)}
+
+
+def upgrade() -> None:
+    if _table_missing():
+        return
+    if not _has_index(INDEX):
+        op.create_index(INDEX, TABLE, ["lot_id", "created_at", "id"], unique=False)
+    for name in REDUNDANT:
+        if _has_index(name):
+            op.drop_index(name, table_name=TABLE)
+
+
+def downgrade() -> None:
+    if _table_missing():
+        return
+    for name in REDUNDANT:
+        if op.get_context().as_sql or not _has_index(name):
+            op.create_index(name, TABLE, ["lot_id"], unique=False)
+    if op.get_context().as_sql or _has_index(INDEX):
+        op.drop_index(INDEX, table_name=TABLE)
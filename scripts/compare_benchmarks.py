@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Compare pytest-benchmark JSON reports against the stored baseline.
+
+    pytest tests/performance --benchmark-json=run1.json
+    pytest tests/performance --benchmark-json=run2.json
+    python scripts/compare_benchmarks.py run1.json run2.json
+    python scripts/compare_benchmarks.py run1.json run2.json run3.json --update-baseline
+
+Timings are absolute, so the baseline is only meaningful on the machine that
+recorded it: regenerate it with ``--update-baseline`` on the CI runner (from
+three or more runs) whenever the runner or Python version changes. A
+comparison against a baseline from a different machine fails unless
+``--allow-machine-mismatch`` is given.
+
+Benchmarks are compared on ``min`` by default, the statistic least affected
+by scheduling noise. With several current reports each benchmark's best run
+is used; a baseline built from several reports keeps each benchmark's median
+run. A benchmark regresses when it is slower than the baseline by more than
+its tolerance: ``--tolerance`` normally, ``--fast-tolerance`` for benchmarks
+under ``--fast-threshold-us`` (whose timings jitter more in relative terms),
+or the ``tolerance`` a benchmark sets in its ``extra_info`` (e.g. handlers
+that write to the database). Baselines are stored without per-round samples
+to keep them small enough to commit.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+STATS = ("min", "median", "mean")
+DEFAULT_BASELINE = Path(__file__).resolve().parent.parent / "tests" / "performance" / "baselines" / "baseline.json"
+DEFAULT_TOLERANCE = 0.30
+DEFAULT_FAST_TOLERANCE = 0.60
+DEFAULT_FAST_THRESHOLD_US = 100.0
+
+# Exit codes
+REGRESSED = 1
+MACHINE_MISMATCH = 2
+
+
+def load_report(path: str) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Any]]:
+    """Benchmarks keyed by full test name, plus the machine info of the run."""
+    with open(path, "r", encoding="utf-8") as f:
+        report = json.load(f)
+    benchmarks = {bench["fullname"]: bench for bench in report.get("benchmarks", [])}
+    return benchmarks, report.get("machine_info", {})
+
+
+def best_of(reports: Sequence[Dict[str, Dict[str, Any]]], stat: str = "min") -> Dict[str, Dict[str, Any]]:
+    """Each benchmark's fastest run on ``stat`` across several reports."""
+    best: Dict[str, Dict[str, Any]] = {}
+    for benchmarks in reports:
+        for name, bench in benchmarks.items():
+            if name not in best or bench["stats"][stat] < best[name]["stats"][stat]:
+                best[name] = bench
+    return best
+
+
+def median_of(reports: Sequence[Dict[str, Dict[str, Any]]], stat: str = "min") -> Dict[str, Dict[str, Any]]:
+    """Each benchmark's median run on ``stat`` across several reports."""
+    runs: Dict[str, List[Dict[str, Any]]] = {}
+    for benchmarks in reports:
+        for name, bench in benchmarks.items():
+            runs.setdefault(name, []).append(bench)
+    median = {}
+    for name, benches in runs.items():
+        benches.sort(key=lambda bench: bench["stats"][stat])
+        median[name] = benches[(len(benches) - 1) // 2]
+    return median
+
+
+def write_baseline(report_paths: Sequence[str], baseline_path: str, stat: str = "min") -> int:
+    """Store the median of one or more runs as the baseline, dropping raw samples and host details."""
+    reports = []
+    for path in report_paths:
+        with open(path, "r", encoding="utf-8") as f:
+            reports.append(json.load(f))
+    first = reports[0]
+    selected = median_of([{b["fullname"]: b for b in r.get("benchmarks", [])} for r in reports], stat)
+    machine = {key: value for key, value in first.get("machine_info", {}).items() if key != "node"}
+    benchmarks = [
+        {
+            "group": bench.get("group"),
+            "name": bench["name"],
+            "fullname": bench["fullname"],
+            "params": bench.get("params"),
+            "extra_info": bench.get("extra_info") or {},
+            "stats": {key: value for key, value in bench["stats"].items() if key != "data"},
+        }
+        for bench in sorted(selected.values(), key=lambda bench: bench["fullname"])
+    ]
+    commit = first.get("commit_info", {})
+    baseline = {
+        "machine_info": machine,
+        "commit_info": {"id": commit.get("id"), "dirty": commit.get("dirty")},
+        "datetime": first.get("datetime"),
+        "version": first.get("version"),
+        "runs": len(reports),
+        "benchmarks": benchmarks,
+    }
+    Path(baseline_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(baseline_path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2)
+    return len(benchmarks)
+
+
+def tolerance_for(
+    bench: Dict[str, Any],
+    stat: str = "min",
+    tolerance: float = DEFAULT_TOLERANCE,
+    fast_tolerance: float = DEFAULT_FAST_TOLERANCE,
+    fast_threshold_us: float = DEFAULT_FAST_THRESHOLD_US,
+) -> float:
+    """Allowed relative slowdown for one baseline benchmark."""
+    override = (bench.get("extra_info") or {}).get("tolerance")
+    if override is not None:
+        return float(override)
+    if bench["stats"][stat] * 1e6 < fast_threshold_us:
+        return fast_tolerance
+    return tolerance
+
+
+def compare(
+    baseline: Dict[str, Dict[str, Any]],
+    current: Dict[str, Dict[str, Any]],
+    stat: str = "min",
+    tolerance: float = DEFAULT_TOLERANCE,
+    fast_tolerance: float = DEFAULT_FAST_TOLERANCE,
+    fast_threshold_us: float = DEFAULT_FAST_THRESHOLD_US,
+) -> List[Dict[str, Any]]:
+    """One row per benchmark present in both reports, with its status."""
+    rows = []
+    for name in sorted(baseline.keys() & current.keys()):
+        before = baseline[name]["stats"][stat]
+        after = current[name]["stats"][stat]
+        allowed = tolerance_for(baseline[name], stat, tolerance, fast_tolerance, fast_threshold_us)
+        ratio = after / before if before > 0 else float("inf")
+        if ratio > 1 + allowed:
+            status = "REGRESSION"
+        elif ratio < 1 - allowed:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append({
+            "name": name,
+            "group": current[name].get("group") or "",
+            "baseline_us": before * 1e6,
+            "current_us": after * 1e6,
+            "ratio": ratio,
+            "tolerance": allowed,
+            "status": status,
+        })
+    return rows
+
+
+def machine_differences(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """Host details that make absolute timings incomparable."""
+    differences = []
+    for key in ("python_implementation", "python_version", "machine", "system"):
+        if baseline.get(key) != current.get(key):
+            differences.append(f"{key}: {baseline.get(key)} -> {current.get(key)}")
+    cpu_before = baseline.get("cpu", {}).get("brand_raw")
+    cpu_after = current.get("cpu", {}).get("brand_raw")
+    if cpu_before != cpu_after:
+        differences.append(f"cpu: {cpu_before} -> {cpu_after}")
+    count_before = baseline.get("cpu", {}).get("count")
+    count_after = current.get("cpu", {}).get("count")
+    if count_before != count_after:
+        differences.append(f"cpu count: {count_before} -> {count_after}")
+    return differences
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Flag pytest-benchmark regressions against a baseline")
+    parser.add_argument("current", nargs="+", help="Current --benchmark-json reports (best run per benchmark is used)")
+    parser.add_argument("--baseline", type=str, default=str(DEFAULT_BASELINE), help="Baseline report")
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Store the median of the current reports as the baseline"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Allowed relative slowdown (0.30 = 30%%)"
+    )
+    parser.add_argument(
+        "--fast-tolerance",
+        type=float,
+        default=DEFAULT_FAST_TOLERANCE,
+        help="Allowed relative slowdown for benchmarks under --fast-threshold-us"
+    )
+    parser.add_argument(
+        "--fast-threshold-us",
+        type=float,
+        default=DEFAULT_FAST_THRESHOLD_US,
+        help="Baseline time below which --fast-tolerance applies"
+    )
+    parser.add_argument("--stat", choices=STATS, default="min", help="Statistic compared")
+    parser.add_argument("--fail-on-missing", action="store_true", help="Fail when a baseline benchmark did not run")
+    parser.add_argument(
+        "--allow-machine-mismatch",
+        action="store_true",
+        help="Compare even when the baseline was recorded on a different machine"
+    )
+    args = parser.parse_args()
+
+    if args.update_baseline:
+        count = write_baseline(args.current, args.baseline, args.stat)
+        print(f"📄 Baseline of {count} benchmarks from {len(args.current)} run(s) written to {args.baseline}")
+        return 0
+
+    baseline, baseline_machine = load_report(args.baseline)
+    reports = [load_report(path) for path in args.current]
+    current = best_of([benchmarks for benchmarks, _ in reports], args.stat)
+    differences = machine_differences(baseline_machine, reports[0][1])
+    for difference in differences:
+        print(f"⚠️  Different environment, timings are not comparable ({difference})")
+    if differences and not args.allow_machine_mismatch:
+        print("❌ Regenerate the baseline on this machine with --update-baseline, "
+              "or pass --allow-machine-mismatch to compare anyway")
+        return MACHINE_MISMATCH
+
+    rows = compare(baseline, current, args.stat, args.tolerance, args.fast_tolerance, args.fast_threshold_us)
+    width = max((len(row["name"].split("::", 1)[-1]) for row in rows), default=10)
+    print(f"{'benchmark':<{width}}  {'baseline us':>12}  {'current us':>12}  {'change':>8}  {'allowed':>8}  status")
+    for row in rows:
+        print(f"{row['name'].split('::', 1)[-1]:<{width}}  {row['baseline_us']:>12.2f}  {row['current_us']:>12.2f}  "
+              f"{row['ratio'] - 1:>+8.1%}  {row['tolerance']:>8.0%}  {row['status']}")
+
+    missing = sorted(baseline.keys() - current.keys())
+    added = sorted(current.keys() - baseline.keys())
+    for name in missing:
+        print(f"➖ Not run: {name}")
+    for name in added:
+        print(f"➕ No baseline: {name}")
+
+    regressions = [row for row in rows if row["status"] == "REGRESSION"]
+    print(f"\n{len(rows)} compared on {args.stat} over {len(args.current)} run(s): "
+          f"{len(regressions)} regressions, {sum(row['status'] == 'improved' for row in rows)} improved")
+    if regressions or (args.fail_on_missing and missing):
+        return REGRESSED
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
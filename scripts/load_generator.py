@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+ANISA Load Generator
+Open-loop load against a running v1 or v2 API server.
+
+Requests are sent on a fixed schedule (uniform or Poisson arrivals at
+``--rate`` per second) whether or not earlier requests have finished, so a
+slow server cannot slow the generator down and hide its own latency.
+Latency is reported two ways:
+
+- ``corrected``: from the *intended* send time to the response. This
+  includes any time the generator fell behind schedule and is the number
+  to compare against latency targets (coordinated-omission corrected).
+  Errors and timeouts count at the time they took to fail, since they are
+  the requests that back up under overload.
+- ``uncorrected``: from the actual send to the response, also over every
+  request.
+
+``corrected_success`` repeats the corrected figures for successful
+responses only.
+
+Traffic comes from JSONL request logs (``--replay``) or a synthetic mix of
+endpoints (``--mix``). One asyncio process tops out at a few thousand
+requests per second; use ``--processes`` to spread the schedule over
+several generator processes.
+
+Examples:
+    python scripts/load_generator.py --api v2 --rate 500 --duration 60
+    python scripts/load_generator.py --replay logs/requests.jsonl --rate 10000 --processes 8
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+@dataclass
+class RequestSpec:
+    """One request to send: endpoint label, method, path and JSON body."""
+    name: str
+    method: str
+    path: str
+    body: Optional[Dict[str, Any]] = None
+
+
+def _synthetic_endpoints(api: str, text: str, i: int) -> Dict[str, RequestSpec]:
+    if api == "v1":
+        return {
+            "query": RequestSpec("query", "POST", "/api/v1/query", {"text": text[:1000], "language": "en"}),
+            "panx": RequestSpec("panx", "POST", "/api/v1/panx/analyze", {"text": text[:2000], "language": "en"}),
+            "insights": RequestSpec("insights", "POST", "/api/v1/insights", {"topic": text.split()[0].lower()}),
+            "health": RequestSpec("health", "GET", "/health"),
+        }
+    return {
+        "analyze": RequestSpec("analyze", "POST", "/api/v2/analyze", {"text": text[:5000]}),
+        "weights": RequestSpec("weights", "POST", "/api/v2/panx/cultural_weights", {
+            "event_type": "lot_verification",
+            "lot_id": f"LOT-{i % 1000:04d}",
+            "validators": [f"validator-{j}" for j in range(3)],
+            "region": "west_africa",
+        }),
+        "knowledge": RequestSpec("knowledge", "GET", f"/api/v2/knowledge/search?q={text.split()[0].lower()}&limit=5"),
+        "health": RequestSpec("health", "GET", "/health"),
+    }
+
+
+DEFAULT_MIX = {
+    "v1": "query=0.85,panx=0.1,health=0.05",
+    "v2": "analyze=0.8,weights=0.1,knowledge=0.05,health=0.05",
+}
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """``name=weight,...`` into normalised endpoint weights."""
+    weights = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError(f"Mix weights must be positive: {value}")
+    return {name: weight / total for name, weight in weights.items()}
+
+
+def synthetic_requests(api: str, mix: Dict[str, float], texts: Sequence[str], count: int, seed: int = 0) -> List[RequestSpec]:
+    """``count`` requests drawn from the endpoint mix, cycling through ``texts``."""
+    known = _synthetic_endpoints(api, "probe", 0)
+    unknown = set(mix) - set(known)
+    if unknown:
+        raise ValueError(f"Unknown {api} endpoints in mix: {sorted(unknown)} (available: {sorted(known)})")
+    rng = np.random.default_rng(seed)
+    names = list(mix)
+    picks = rng.choice(len(names), size=count, p=[mix[name] for name in names])
+    return [_synthetic_endpoints(api, texts[i % len(texts)], i)[names[pick]] for i, pick in enumerate(picks)]
+
+
+def _logged_request(record: Dict[str, Any], api: str) -> Optional[RequestSpec]:
+    body = next((record[key] for key in ("body", "json", "payload") if isinstance(record.get(key), dict)), None)
+    target = record.get("path") or record.get("url") or record.get("endpoint")
+    if isinstance(target, str):
+        parts = urlsplit(target)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        method = str(record.get("method") or ("POST" if body is not None else "GET")).upper()
+        return RequestSpec(f"{method} {parts.path}", method, path, body)
+    text = next((record[key] for key in ("text", "query", "query_text") if isinstance(record.get(key), str)), None)
+    if text is None and body is not None:
+        text = next((body[key] for key in ("text", "query") if isinstance(body.get(key), str)), None)
+    if not text:
+        return None
+    return _synthetic_endpoints(api, text, 0)["query" if api == "v1" else "analyze"]
+
+
+def replay_requests(paths: Sequence[str], api: str) -> List[RequestSpec]:
+    """
+    Requests from JSONL logs.
+
+    Records with a ``path``/``url`` (plus optional ``method`` and
+    ``body``) are replayed as-is; records with only query text go to the
+    main query endpoint of ``api``.
+    """
+    from training.data.streaming import iter_jsonl
+
+    requests = []
+    for record in iter_jsonl(list(paths)):
+        spec = _logged_request(record, api) if isinstance(record, dict) else None
+        if spec is not None:
+            requests.append(spec)
+    if not requests:
+        raise ValueError(f"No replayable requests in {', '.join(paths)}")
+    return requests
+
+
+def arrival_offsets(rate: float, duration: float, arrival: str = "uniform", seed: int = 0) -> np.ndarray:
+    """Intended send times (seconds from start) for an open-loop schedule."""
+    expected = rate * duration
+    if arrival == "poisson":
+        rng = np.random.default_rng(seed)
+        # Draw gaps in blocks until the schedule runs past the end
+        block = int(expected + 4 * math.sqrt(expected)) + 16
+        offsets = np.cumsum(rng.exponential(1.0 / rate, size=block))
+        while offsets[-1] < duration:
+            more = offsets[-1] + np.cumsum(rng.exponential(1.0 / rate, size=block))
+            offsets = np.concatenate([offsets, more])
+        return offsets[offsets < duration]
+    offsets = np.arange(math.ceil(expected), dtype=np.float64) / rate
+    return offsets[offsets < duration]
+
+
+@dataclass
+class LoadConfig:
+    """Settings for one generator process."""
+    base_url: str
+    api_key: Optional[str] = None
+    connections: int = 256
+    timeout: float = 10.0
+
+
+async def _generate(
+    config: LoadConfig,
+    requests: Sequence[RequestSpec],
+    offsets: np.ndarray,
+    indexes: np.ndarray,
+    start_at: float,
+) -> Dict[str, Any]:
+    import httpx
+
+    n = len(offsets)
+    sent = np.full(n, np.nan)
+    done = np.full(n, np.nan)
+    statuses = np.zeros(n, dtype=np.int16)  # 0 = transport error
+    failures: Counter = Counter()
+    headers = {"X-API-Key": config.api_key} if config.api_key else {}
+    limits = httpx.Limits(max_connections=config.connections, max_keepalive_connections=config.connections)
+
+    async with httpx.AsyncClient(base_url=config.base_url, headers=headers, limits=limits, timeout=config.timeout) as client:
+        loop = asyncio.get_running_loop()
+        base = loop.time() + (start_at - time.time())
+
+        async def send(slot: int, spec: RequestSpec) -> None:
+            sent[slot] = loop.time() - base
+            try:
+                response = await client.request(spec.method, spec.path, json=spec.body)
+                statuses[slot] = response.status_code
+            except Exception as e:
+                failures[type(e).__name__] += 1
+            done[slot] = loop.time() - base
+
+        tasks = set()
+        for slot in range(n):
+            delay = base + offsets[slot] - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(send(slot, requests[indexes[slot]]))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.wait(tasks)
+
+    return {"sent": sent, "done": done, "statuses": statuses, "failures": dict(failures)}
+
+
+def _run_process(
+    config: LoadConfig,
+    requests: Sequence[RequestSpec],
+    offsets: np.ndarray,
+    indexes: np.ndarray,
+    start_at: float,
+) -> Dict[str, Any]:
+    return asyncio.run(_generate(config, requests, offsets, indexes, start_at))
+
+
+def latency_percentiles(seconds: np.ndarray) -> Dict[str, float]:
+    """Count, mean, percentiles and max in milliseconds."""
+    if not seconds.size:
+        return {"count": 0}
+    ms = seconds * 1000.0
+    summary = {"count": int(ms.size), "mean_ms": round(float(ms.mean()), 3)}
+    for pct, value in zip(PERCENTILES, np.percentile(ms, PERCENTILES)):
+        summary[f"p{pct:g}_ms"] = round(float(value), 3)
+    summary["max_ms"] = round(float(ms.max()), 3)
+    return summary
+
+
+def summarize(
+    requests: Sequence[RequestSpec],
+    offsets: np.ndarray,
+    indexes: np.ndarray,
+    results: Dict[str, Any],
+    warmup: float,
+    duration: float,
+    timeout: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Error rates and corrected/uncorrected latency, excluding the warmup window.
+
+    Failed requests count at their elapsed time; requests that never
+    finished count at ``timeout`` (or the end of the run when not given).
+    """
+    measured = offsets >= warmup
+    statuses = results["statuses"][measured]
+    intended = offsets[measured]
+    finished = results["done"][measured]
+    # Achieved throughput counts the time taken to drain a backlog, not just the schedule
+    drained = float(np.nanmax(finished)) if np.isfinite(finished).any() else duration
+    window = max(duration - warmup, 1e-9)
+    unfinished_at = intended + timeout if timeout is not None else max(drained, duration)
+    done = np.where(np.isnan(finished), unfinished_at, finished)
+    sent = np.where(np.isnan(results["sent"][measured]), intended, results["sent"][measured])
+    corrected = done - intended
+    uncorrected = done - sent
+    lag = sent - intended
+    names = np.array([requests[i].name for i in indexes[measured]])
+    errors = (statuses == 0) | (statuses >= 400)
+
+    status_counts = Counter(str(status) if status else "transport_error" for status in statuses.tolist())
+    endpoints = {}
+    for name in sorted(set(names.tolist())):
+        mask = names == name
+        endpoints[name] = {
+            "requests": int(mask.sum()),
+            "errors": int(errors[mask].sum()),
+            "error_rate": round(float(errors[mask].mean()), 5),
+            "corrected": latency_percentiles(corrected[mask]),
+            "corrected_success": latency_percentiles(corrected[mask & ~errors]),
+        }
+    return {
+        "requests": int(measured.sum()),
+        "offered_rps": round(float(measured.sum()) / window, 2),
+        "achieved_rps": round(float((~errors).sum()) / max(drained - warmup, window), 2),
+        "errors": int(errors.sum()),
+        "error_rate": round(float(errors.mean()), 5) if errors.size else 0.0,
+        "statuses": dict(status_counts),
+        "transport_errors": results["failures"],
+        "latency": {
+            "corrected": latency_percentiles(corrected),
+            "corrected_success": latency_percentiles(corrected[~errors]),
+            "uncorrected": latency_percentiles(uncorrected),
+        },
+        "max_send_lag_ms": round(float(lag.max()) * 1000.0, 3) if lag.size else 0.0,
+        "endpoints": endpoints,
+    }
+
+
+def run_load(
+    config: LoadConfig,
+    requests: Sequence[RequestSpec],
+    rate: float,
+    duration: float,
+    warmup: float = 5.0,
+    arrival: str = "uniform",
+    processes: int = 1,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Drive an open-loop schedule against the server and summarise the results.
+
+    Args:
+        config: Target server and client settings
+        requests: Requests cycled through in order
+        rate: Arrivals per second across all processes
+        duration: Schedule length in seconds, including warmup
+        warmup: Leading seconds excluded from the results
+        arrival: ``uniform`` (fixed gaps) or ``poisson`` (exponential gaps)
+        processes: Generator processes sharing the schedule round-robin
+        seed: Seed for Poisson arrivals
+
+    Returns:
+        JSON-serialisable report
+    """
+    offsets = arrival_offsets(rate, duration, arrival, seed)
+    indexes = np.arange(offsets.size) % len(requests)
+    results = {
+        "sent": np.full(offsets.size, np.nan),
+        "done": np.full(offsets.size, np.nan),
+        "statuses": np.zeros(offsets.size, dtype=np.int16),
+        "failures": Counter(),
+    }
+    if processes <= 1:
+        parts = [(slice(None), _run_process(config, requests, offsets, indexes, time.time() + 0.1))]
+    else:
+        # Round-robin keeps each process's share evenly spread over the schedule
+        start_at = time.time() + 2.0 + 0.2 * processes
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [
+                (slice(k, None, processes), pool.submit(
+                    _run_process, config, requests, offsets[k::processes], indexes[k::processes], start_at,
+                ))
+                for k in range(processes)
+            ]
+            parts = [(part, future.result()) for part, future in futures]
+    for part, result in parts:
+        for key in ("sent", "done", "statuses"):
+            results[key][part] = result[key]
+        results["failures"].update(result["failures"])
+    results["failures"] = dict(results["failures"])
+
+    return {
+        "target": config.base_url,
+        "rate": rate,
+        "duration_seconds": duration,
+        "warmup_seconds": warmup,
+        "arrival": arrival,
+        "processes": processes,
+        "connections_per_process": config.connections,
+        **summarize(requests, offsets, indexes, results, warmup, duration, config.timeout),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ANISA open-loop load generator")
+    parser.add_argument("--base-url", default=os.environ.get("ANISA_BASE_URL", "http://localhost:8000"))
+    parser.add_argument("--api", choices=["v1", "v2"], default="v2", help="API version for synthetic/text-only requests")
+    parser.add_argument("--replay", nargs="*", default=[], help="JSONL request logs (files or directories)")
+    parser.add_argument("--mix", type=str, default=None, help="Synthetic endpoint mix, e.g. analyze=0.8,health=0.2")
+    parser.add_argument("--corpus", type=str, default=None, help="JSONL texts for synthetic requests")
+    parser.add_argument("--rate", type=float, default=100.0, help="Requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load, including warmup")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Leading seconds excluded from results")
+    parser.add_argument("--arrival", choices=["uniform", "poisson"], default="poisson")
+    parser.add_argument("--processes", type=int, default=1, help="Generator processes")
+    parser.add_argument("--connections", type=int, default=256, help="Max connections per process")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, default=None, help="JSON report file")
+    return parser.parse_args()
+
+
+def main() -> None:
+    from benchmark import load_corpus
+
+    args = parse_args()
+    if args.warmup >= args.duration:
+        sys.exit("--warmup must be shorter than --duration")
+    if args.replay:
+        requests = replay_requests(args.replay, args.api)
+        source = f"{len(requests)} logged requests"
+    else:
+        mix = parse_mix(args.mix or DEFAULT_MIX[args.api])
+        texts = load_corpus(args.corpus)
+        requests = synthetic_requests(args.api, mix, texts, count=max(1000, len(texts)), seed=args.seed)
+        source = f"synthetic mix {mix}"
+
+    config = LoadConfig(args.base_url, os.environ.get("ANISA_API_KEY"), args.connections, args.timeout)
+    print(f"🚦 {args.rate:g} req/s ({args.arrival}) for {args.duration:g}s against {args.base_url} "
+          f"from {source}, {args.processes} process(es)")
+    report = run_load(
+        config, requests, args.rate, args.duration, args.warmup, args.arrival, args.processes, args.seed,
+    )
+    report["config"] = asdict(config)
+    report["config"].pop("api_key")
+
+    latency = report["latency"]
+    print(f"\n📊 {report['requests']} requests after warmup: offered {report['offered_rps']} req/s, "
+          f"achieved {report['achieved_rps']} req/s, error rate {report['error_rate']:.3%}")
+    print(f"   Statuses: {report['statuses']}")
+    print(f"   {'latency':<20}" + "".join(f"{f'p{pct:g} ms':>12}" for pct in PERCENTILES) + f"{'max ms':>12}")
+    for label in ("corrected", "corrected_success", "uncorrected"):
+        summary = latency[label]
+        if summary.get("count"):
+            print(f"   {label:<20}" + "".join(f"{summary[f'p{pct:g}_ms']:>12.2f}" for pct in PERCENTILES)
+                  + f"{summary['max_ms']:>12.2f}")
+    print(f"   Max send lag: {report['max_send_lag_ms']} ms")
+    for name, endpoint in report["endpoints"].items():
+        p99 = endpoint["corrected"].get("p99_ms")
+        print(f"   {name:<40}{endpoint['requests']:>8} req  {endpoint['error_rate']:>8.3%} err  p99 {p99} ms")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
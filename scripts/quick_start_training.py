@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
+import argparse
 import asyncio
-import json
-import os
+import itertools
 import sys
 from pathlib import Path
 
@@ -11,36 +11,80 @@ SRC_DIR = PROJECT_ROOT / "src"
 sys.path.insert(0, str(SRC_DIR))
 
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ANISA quick-start training")
+    parser.add_argument("--from-db", action="store_true", help="Include stored analyses from the database")
+    parser.add_argument("--request-logs", nargs="*", default=[], help="JSONL request log files or directories")
+    parser.add_argument("--export-dir", help="Parquet export directory (see `cli.py export`)")
+    parser.add_argument("--shard-size", type=int, default=100_000, help="Records per JSONL shard")
+    parser.add_argument("--dedup-threshold", type=float, default=0.85,
+                        help="MinHash similarity above which texts are near-duplicates (0 disables)")
+    parser.add_argument("--dedup-workers", type=int, default=None, help="Processes for MinHash signatures")
+    parser.add_argument("--onnx", action="store_true", help="Export to ONNX (fp32 + int8) and benchmark both")
+    return parser.parse_args()
+
+
 async def main() -> None:
     from training.data.data_collector import CulturalDataCollector
     from training.automl.huggingface_training import HFCulturalTrainer, HFConfig
 
+    args = parse_args()
     print("\n🚀 ANISA Quick-Start Training\n")
 
-    # 1) Collect seed data
+    # 1) Stream seed data plus any larger sources straight to shards
     collector = CulturalDataCollector()
-    examples = collector.collect_initial_training_data()
+    sources = [collector.iter_initial_training_data()]
+    if args.from_db:
+        sources.append(collector.iter_database_data())
+    if args.request_logs:
+        sources.append(collector.iter_request_log_data(args.request_logs))
+    if args.export_dir:
+        from training.data.exporter import iter_training_examples
+        sources.append(iter_training_examples(args.export_dir))
 
-    # Save for reproducibility
-    out_path = collector.save_training_data(examples, filename="quick_start_data")
-    print(f"Saved seed data to: {out_path}")
+    shards = collector.stream_training_data(
+        itertools.chain.from_iterable(sources),
+        name="quick_start_data",
+        max_records_per_shard=args.shard_size,
+    )
+    print(f"Saved training data to {len(shards)} shard(s) in: {shards[0].parent}")
 
-    # Prepare minimal list for trainer
-    train_items = [
-        {"text": e.text, "cultural_context": e.cultural_context} for e in examples
-    ]
+    if args.dedup_threshold > 0:
+        from training.data.dedup import DedupConfig, NearDuplicateFilter
+        dedup_config = DedupConfig(threshold=args.dedup_threshold)
+        if args.dedup_workers:
+            dedup_config.workers = args.dedup_workers
+        dedup = NearDuplicateFilter(dedup_config)
+        shards = dedup.dedup_shards(shards, collector.data_dir / "raw" / "quick_start_data_dedup",
+                                    max_records_per_shard=args.shard_size)
+        print(f"Removed {dedup.stats.dropped} near-duplicates, kept {dedup.stats.kept}")
 
-    # 2) Train a tiny HF model (CPU-friendly)
+    # 2) Train a tiny HF model (CPU-friendly), reading the shards lazily
     cfg = HFConfig()
     trainer = HFCulturalTrainer(cfg)
-    dataset = trainer.prepare_dataset(train_items)
+    dataset = trainer.prepare_dataset_from_jsonl(shards)
     eval_res = trainer.train(dataset)
     print("\n📈 Evaluation:")
     for k, v in eval_res.items():
         print(f"  {k}: {v}")
 
+    trainer.save()
     print(f"\n✅ Model artifacts in: {cfg.output_dir}")
 
+    # 3) Optional ONNX export with int8 quantization for CPU serving
+    if args.onnx:
+        from training.automl.onnx_export import ONNXExportConfig, compare_fp32_int8, export_and_quantize
+        onnx_cfg = ONNXExportConfig(model_dir=cfg.output_dir, output_dir=f"{cfg.output_dir}-onnx", max_length=cfg.max_length)
+        export_and_quantize(onnx_cfg)
+        validation = dataset["validation"]
+        for result in compare_fp32_int8(onnx_cfg.output_dir, validation["text"],
+                                        [trainer.inv_label_map[i] for i in validation["label"]],
+                                        max_length=onnx_cfg.max_length):
+            print(f"  {result.model}: accuracy={result.accuracy:.3f} "
+                  f"p50={result.latency_ms['p50']:.2f}ms p95={result.latency_ms['p95']:.2f}ms "
+                  f"size={result.size_mb:.1f}MB")
+        print(f"✅ ONNX models in: {onnx_cfg.output_dir}")
+
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,218 @@
+"""
+ANISA Allocation Tracking
+Per-stage memory allocation measurements using ``tracemalloc``.
+
+``AllocationTracker`` is a stage hook (see ``ANISACore.add_stage_hook``).
+For every stage call it records:
+
+- peak bytes: the highest traced memory above the level at stage entry,
+  i.e. the transient working set of the stage
+- net bytes: traced memory still held when the stage exits
+- net blocks: change in allocated memory blocks, a proxy for objects created
+
+Samples are aggregated into fixed log2 histograms per stage, so tracking can
+stay enabled for long runs. Stage calls whose peak exceeds the budget are
+logged as offenders, with their top allocating source lines when
+``top_lines`` is set.
+
+``tracemalloc`` counters are process-wide: with concurrent requests on the
+event loop, a stage's numbers include whatever other requests allocated
+while it was suspended. Measure with a concurrency of 1 for exact
+attribution.
+"""
+
+import logging
+import sys
+import tracemalloc
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Histogram upper bounds: 256 B .. 64 MiB and 1 .. 64k blocks
+BYTE_BUCKETS = tuple(float(2 ** k) for k in range(8, 27))
+BLOCK_BUCKETS = tuple(float(2 ** k) for k in range(0, 17))
+
+METRICS = ("peak_bytes", "net_bytes", "net_blocks")
+
+
+class Histogram:
+    """Fixed-bucket histogram with Prometheus-style ``le`` upper bounds."""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = float("-inf")
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def buckets(self) -> List[List[Any]]:
+        """Cumulative ``[le, count]`` pairs, ending with ``["+Inf", count]``."""
+        cumulative = []
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            cumulative.append([bound, seen])
+        cumulative.append(["+Inf", self.count])
+        return cumulative
+
+    def summary(self) -> Dict[str, float]:
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean": round(self.sum / self.count, 1),
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+        }
+
+
+class AllocationTracker:
+    """
+    Stage hook recording tracemalloc allocations of every stage call.
+
+    Args:
+        budget_bytes: Peak bytes above which a stage call is logged as an
+            offender; 0 disables offender logging
+        top_lines: Allocating source lines logged per offender; above 0 a
+            tracemalloc snapshot is taken around every stage, which is slow
+        frames: Traceback depth when this tracker starts tracemalloc
+        max_offenders: Most recent offenders kept for ``summary``
+    """
+
+    def __init__(self, budget_bytes: int = 0, top_lines: int = 0, frames: int = 1, max_offenders: int = 20):
+        self.budget_bytes = budget_bytes
+        self.top_lines = top_lines
+        self.frames = max(frames, 1)
+        self.histograms: Dict[str, Dict[str, Histogram]] = {}
+        self.offender_count = 0
+        self.offenders: Deque[Dict[str, Any]] = deque(maxlen=max_offenders)
+        self._started_tracing = False
+
+    def start(self) -> None:
+        """Start tracemalloc unless it is already tracing."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+            logger.info(f"tracemalloc started for allocation tracking ({self.frames} frames)")
+
+    def stop(self) -> None:
+        """Stop tracemalloc if this tracker started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self) -> "AllocationTracker":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    @contextmanager
+    def __call__(self, stage: str) -> Iterator[None]:
+        if not tracemalloc.is_tracing():
+            yield
+            return
+        before = self._snapshot() if self.top_lines else None
+        start_bytes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        start_blocks = sys.getallocatedblocks()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            net_blocks = sys.getallocatedblocks() - start_blocks
+            self.record(stage, max(peak - start_bytes, 0), current - start_bytes, net_blocks, before)
+
+    def record(
+        self,
+        stage: str,
+        peak_bytes: int,
+        net_bytes: int,
+        net_blocks: int,
+        before: Optional[tracemalloc.Snapshot] = None,
+    ) -> None:
+        """Add one stage call to the histograms and check it against the budget."""
+        histograms = self.histograms.get(stage)
+        if histograms is None:
+            histograms = self.histograms[stage] = {
+                "peak_bytes": Histogram(BYTE_BUCKETS),
+                "net_bytes": Histogram(BYTE_BUCKETS),
+                "net_blocks": Histogram(BLOCK_BUCKETS),
+            }
+        histograms["peak_bytes"].observe(peak_bytes)
+        histograms["net_bytes"].observe(net_bytes)
+        histograms["net_blocks"].observe(net_blocks)
+
+        if self.budget_bytes and peak_bytes > self.budget_bytes:
+            self.offender_count += 1
+            lines = self._top_lines(before) if before is not None else []
+            self.offenders.append({
+                "stage": stage,
+                "peak_bytes": peak_bytes,
+                "net_bytes": net_bytes,
+                "net_blocks": net_blocks,
+                "top_lines": lines,
+            })
+            details = "".join(f"\n    {line}" for line in lines)
+            logger.warning(
+                f"Stage {stage} allocated {peak_bytes} bytes at peak, over the {self.budget_bytes} byte budget "
+                f"(net {net_bytes} bytes, {net_blocks} blocks){details}"
+            )
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+    def _top_lines(self, before: tracemalloc.Snapshot) -> List[str]:
+        diff = self._snapshot().compare_to(before, "lineno")
+        return [str(stat) for stat in diff if stat.size_diff > 0][:self.top_lines]
+
+    def summary(self) -> Dict[str, Any]:
+        """Per-stage percentiles (bucket upper bounds) and recent offenders."""
+        return {
+            "budget_bytes": self.budget_bytes,
+            "offender_count": self.offender_count,
+            "stages": {
+                stage: {metric: histograms[metric].summary() for metric in METRICS}
+                for stage, histograms in self.histograms.items()
+            },
+            "recent_offenders": list(self.offenders),
+        }
+
+    def export_histograms(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Cumulative buckets, count and sum per stage and metric."""
+        return {
+            stage: {
+                metric: {"buckets": histogram.buckets(), "count": histogram.count, "sum": histogram.sum}
+                for metric, histogram in histograms.items()
+            }
+            for stage, histograms in self.histograms.items()
+        }
+
+    def reset(self) -> None:
+        self.histograms.clear()
+        self.offenders.clear()
+        self.offender_count = 0
@@ -9,7 +9,8 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 import os
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Header, Depends, Response
+from uuid import uuid4
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Header, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 
@@ -131,8 +132,9 @@ app.add_middleware(
 )
 
 # Initialize ANISA core
-config = ANISAConfig()
+config = ANISAConfig.from_environment()
 core = ANISACore(config)
+tracer = core.tracer
 logger = logging.getLogger(__name__)
 
 # Simple API key auth (SGX placeholder)
@@ -160,17 +162,31 @@ def publish_event(event_name: str, payload: Dict[str, Any]) -> None:
         pass
 
 
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Run each request under a server span tagged with its request ID."""
+    request_id = request.headers.get("X-Request-Id", str(uuid4()))
+    response, _ = await tracer.trace_request(request, call_next, request_id)
+    response.headers["X-Request-Id"] = request_id
+    return response
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup."""
     logger.info("ANISA API starting up...")
     logger.info(f"Configuration: {config.to_dict()}")
+    await core.start_batching()
+    core.start_model_watch()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown."""
     logger.info("ANISA API shutting down...")
+    await core.stop_model_watch()
+    await core.stop_batching()
+    tracer.close()
 
 
 @app.get("/", response_model=Dict[str, str])
@@ -195,14 +211,13 @@ async def process_cultural_query(request: QueryRequest, http_response: Response)
     start_time = datetime.now()
     
     try:
-        # Process the query
-        response_obj = await core.process_cultural_query(request.text, request.language)
+        # Process the query; the response carries the detected context
+        auth_result, response_obj = await core.analyze_cultural_query(request.text)
+        context = response_obj.cultural_context
         
         # Calculate processing time
         processing_time = (datetime.now() - start_time).total_seconds()
         
-        # Get cultural context
-        context = await core.detect_cultural_context(request.text, request.language)
         # Set helpful response headers for gateways/policies
         http_response.headers["X-ANISA-Region"] = context.region.value
         http_response.headers["X-ANISA-Variant"] = context.variant.value
@@ -222,15 +237,15 @@ async def process_cultural_query(request: QueryRequest, http_response: Response)
 
         return QueryResponse(
             response_text=response_obj.response_text,
-            cultural_variant=response_obj.cultural_variant.value,
+            cultural_variant=context.variant.value,
             authenticity_score=response_obj.authenticity_score,
-            cultural_markers_used=response_obj.cultural_markers_used,
+            cultural_markers_used=auth_result.cultural_markers,
             processing_time=processing_time,
             cultural_context={
                 "region": context.region.value,
                 "variant": context.variant.value,
-                "language": context.language,
-                "dialect": context.dialect
+                "language": request.language,
+                "trade_context": context.trade_context.value
             }
         )
         
@@ -346,13 +361,13 @@ async def run_demo():
         results = []
         for query in demo_queries:
             try:
-                response = await core.process_cultural_query(query, "en")
-                context = await core.detect_cultural_context(query, "en")
+                response = await core.process_cultural_query(query)
+                context = response.cultural_context
                 
                 results.append({
                     "query": query,
                     "response": response.response_text[:100] + "...",
-                    "cultural_variant": response.cultural_variant.value,
+                    "cultural_variant": context.variant.value,
                     "authenticity_score": response.authenticity_score,
                     "detected_region": context.region.value
                 })
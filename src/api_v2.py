@@ -12,20 +12,25 @@ from typing import Dict, Any, List, Optional
 from uuid import uuid4
 
 import httpx
-from fastapi import FastAPI, HTTPException, Header, Depends, Response, Request
+from fastapi import FastAPI, HTTPException, Header, Depends, Query, Response, Request, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from prometheus_client import Counter, Histogram, generate_latest
+from prometheus_client import Counter, Histogram
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from core import ANISACore
 from config import ANISAConfig
-from database import get_db, init_db, CulturalContext as DBContext, CulturalInsight as DBInsight
+from database import get_db, init_db, engine, SessionLocal, CulturalContext as DBContext, CulturalInsight as DBInsight
 from database import CulturalVerification, CulturalMetrics
-from models import CulturalContext, CulturalRegion, CulturalVariant
-
-# Metrics
+from knowledge_search import KnowledgeSearchIndex, search_knowledge
+from lot_cache import LotVerificationCache, LotVerificationEntry, load_lot_timeline
+from monitoring import RuntimeMetrics, instrument_engine, mark_process_dead, render_latest, stage_timer
+from training.data.exporter import AnalysisExporter, ExportConfig, EXPORT_TABLES
+from models import CulturalContext, CulturalRegion, CulturalVariant, TradeContext
+from services import LEXICON_VERSION
+
+# Metrics (endpoint labels are route templates, never raw paths)
 request_count = Counter('anisa_requests_total', 'Total requests', ['endpoint', 'method', 'status'])
 request_duration = Histogram('anisa_request_duration_seconds', 'Request duration', ['endpoint'])
 cultural_analysis_count = Counter('anisa_cultural_analysis_total', 'Cultural analyses', ['region', 'variant'])
@@ -53,19 +58,51 @@ app.add_middleware(
 )
 
 # Initialize ANISA core
-config = ANISAConfig()
+config = ANISAConfig.from_environment()
 core = ANISACore(config)
 
+# Request, stage, flush and Cortex spans (no-ops unless ANISA_TRACE_EXPORTER is set)
+tracer = core.tracer
+tracer.instrument_sessions(SessionLocal)
+
+# Per-stage latency histograms and database pool usage
+core.add_stage_hook(stage_timer)
+instrument_engine(engine)
+
 # API Configuration
 ANISA_API_KEY = os.getenv("ANISA_API_KEY")
 PANX_URL = os.getenv("PANX_URL", "http://panx:8081")
 CORTEX_URL = os.getenv("CORTEX_URL", "http://cortex:8082")
 PANX_API_KEY = os.getenv("PANX_API_KEY")
 CORTEX_API_KEY = os.getenv("CORTEX_API_KEY")
+EXPORT_DIR = os.getenv("ANISA_EXPORT_DIR", "exports")
 
 # HTTP client for integrations
 http_client = httpx.AsyncClient(timeout=30.0)
 
+# Recently active PANX lots (per worker process)
+lot_cache = LotVerificationCache(
+    max_lots=int(os.getenv("ANISA_LOT_CACHE_SIZE", "1024")),
+    ttl_seconds=float(os.getenv("ANISA_LOT_CACHE_TTL", "30")),
+)
+
+# Parquet export jobs started by this worker
+export_jobs: Dict[str, Dict[str, Any]] = {}
+
+# In-process knowledge search index for non-PostgreSQL backends (built lazily,
+# rebuilt when the knowledge table changes or the index outlives its TTL)
+knowledge_index: Optional[KnowledgeSearchIndex] = None
+KNOWLEDGE_INDEX_TTL = float(os.getenv("ANISA_KNOWLEDGE_INDEX_TTL", "300"))
+
+# Cache, queue, pool and event-loop metrics sampled in the background
+runtime_metrics = RuntimeMetrics(
+    core,
+    engine=engine,
+    caches={"lot_verification": lot_cache},
+    queues={"export": lambda: sum(job["status"] in ("scheduled", "running") for job in export_jobs.values())},
+    sample_interval=float(os.getenv("ANISA_METRICS_SAMPLE_SECONDS", "5")),
+)
+
 
 # Request/Response Models
 class CulturalAnalysisRequest(BaseModel):
@@ -105,6 +142,72 @@ class PANXIntegrationResponse(BaseModel):
     recommendations: List[str]
 
 
+class LotVerificationItem(BaseModel):
+    """Single verification in a lot timeline"""
+    id: int
+    panx_event_id: Optional[str] = None
+    validators: List[str]
+    cultural_weights: Dict[str, float]
+    consensus_adjustment: float
+    verification_status: str
+    created_at: Optional[datetime] = None
+    verified_at: Optional[datetime] = None
+
+
+class LotTimelineResponse(BaseModel):
+    """Cultural verification history and aggregates for a PANX lot"""
+    lot_id: str
+    verification_count: int
+    aggregate_weights: Dict[str, float]
+    mean_consensus_adjustment: float
+    status_counts: Dict[str, int]
+    first_verified_at: Optional[datetime] = None
+    last_verified_at: Optional[datetime] = None
+    timeline: List[LotVerificationItem]
+    cached: bool
+
+
+class ExportRequest(BaseModel):
+    """Request for a Parquet export of stored analyses"""
+    tables: List[str] = Field(default_factory=lambda: list(EXPORT_TABLES))
+    partition_by: List[str] = Field(default_factory=lambda: ["region", "event_type"])
+    compression: str = Field(default="zstd", max_length=20)
+    row_group_size: int = Field(default=50_000, ge=1_000, le=1_000_000)
+
+
+class ExportStatusResponse(BaseModel):
+    """Status of a Parquet export job"""
+    export_id: str
+    status: str
+    output_dir: str
+    tables: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
+    error: Optional[str] = None
+
+
+class ModelReloadRequest(BaseModel):
+    """Detector version to activate and load"""
+    version: Optional[str] = Field(None, description="Registered version; defaults to the manifest's active version")
+
+
+class KnowledgeSearchHit(BaseModel):
+    """Ranked cultural knowledge entry"""
+    id: int
+    term: str
+    definition: Optional[str] = None
+    trade_relevance: Optional[str] = None
+    region: str
+    variant: str
+    category: str
+    score: float
+
+
+class KnowledgeSearchResponse(BaseModel):
+    """Response from knowledge search"""
+    query: str
+    results: List[KnowledgeSearchHit]
+    processing_time_ms: float
+
+
 # Middleware
 @app.middleware("http")
 async def add_request_id(request: Request, call_next):
@@ -113,7 +216,7 @@ async def add_request_id(request: Request, call_next):
     request.state.request_id = request_id
     
     start_time = time.time()
-    response = await call_next(request)
+    response, route = await tracer.trace_request(request, call_next, request_id)
     process_time = (time.time() - start_time) * 1000
     
     response.headers["X-Request-Id"] = request_id
@@ -124,12 +227,12 @@ async def add_request_id(request: Request, call_next):
     
     # Record metrics
     request_count.labels(
-        endpoint=request.url.path,
+        endpoint=route,
         method=request.method,
         status=response.status_code
     ).inc()
     
-    request_duration.labels(endpoint=request.url.path).observe(process_time / 1000)
+    request_duration.labels(endpoint=route).observe(process_time / 1000)
     
     return response
 
@@ -148,13 +251,21 @@ async def startup_event():
     logger.info("ANISA v2 starting up...")
     init_db()
     logger.info("Database initialized")
+    await core.start_batching()
+    core.start_model_watch()
+    runtime_metrics.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("ANISA v2 shutting down...")
+    await runtime_metrics.stop()
+    await core.stop_model_watch()
+    await core.stop_batching()
     await http_client.aclose()
+    tracer.close()
+    mark_process_dead()
 
 
 # Health & Metrics Endpoints
@@ -171,8 +282,10 @@ async def health_check():
 
 @app.get("/metrics")
 async def metrics():
-    """Prometheus metrics endpoint"""
-    return Response(content=generate_latest(), media_type="text/plain")
+    """Prometheus metrics endpoint (all workers when PROMETHEUS_MULTIPROC_DIR is set)"""
+    runtime_metrics.sample()
+    content, content_type = render_latest()
+    return Response(content=content, headers={"Content-Type": content_type})
 
 
 # Core API Endpoints
@@ -186,9 +299,19 @@ async def analyze_cultural_context(
     start_time = time.time()
     
     try:
-        # Perform cultural analysis
-        context = await core.detect_cultural_context(request.text, request.language)
-        insights = await core.generate_cultural_insights(request.text, context)
+        # Perform cultural analysis. trade_context is free-form (it is stored
+        # as the insight's event type); other values are detected from the text.
+        try:
+            trade_context = TradeContext(request.trade_context)
+        except ValueError:
+            trade_context = core.auth_service.detect_trade_context(request.text)
+        auth_result, response_obj = await core.analyze_cultural_query(request.text, trade_context)
+        context = response_obj.cultural_context
+        trade_implications = {
+            "trade_context": response_obj.trade_context.value,
+            "compliance_notes": response_obj.compliance_notes,
+            "integration_hints": response_obj.gtcx_integration_hints,
+        }
         
         # Store in database
         db_context = DBContext(
@@ -196,20 +319,21 @@ async def analyze_cultural_context(
             language=request.language,
             region=context.region.value,
             variant=context.variant.value,
-            confidence_score=insights.authenticity_score,
-            cultural_markers=insights.cultural_markers_used,
-            trade_context=request.trade_context
+            confidence_score=auth_result.confidence_score,
+            cultural_markers=auth_result.cultural_markers,
+            trade_context=request.trade_context,
+            lexicon_version=LEXICON_VERSION
         )
         db.add(db_context)
-        db.commit()
+        db.flush()  # assign the context id; context and insight commit together
         
         db_insight = DBInsight(
             context_id=db_context.id,
             event_type=request.trade_context or "general",
-            cultural_factors=insights.cultural_factors,
-            recommendations=insights.recommendations,
-            authenticity_score=insights.authenticity_score,
-            trade_implications=insights.trade_implications
+            cultural_factors=response_obj.cultural_adaptation,
+            recommendations=response_obj.gtcx_recommendations,
+            authenticity_score=response_obj.authenticity_score,
+            trade_implications=trade_implications
         )
         db.add(db_insight)
         db.commit()
@@ -226,7 +350,7 @@ async def analyze_cultural_context(
             "analysis_id": str(db_context.id),
             "region": context.region.value,
             "variant": context.variant.value,
-            "confidence_score": insights.authenticity_score,
+            "confidence_score": auth_result.confidence_score,
             "timestamp": datetime.utcnow().isoformat()
         })
         
@@ -236,10 +360,10 @@ async def analyze_cultural_context(
             analysis_id=str(db_context.id),
             region=context.region.value,
             variant=context.variant.value,
-            confidence_score=insights.authenticity_score,
-            cultural_factors=insights.cultural_factors,
-            trade_implications=insights.trade_implications,
-            recommendations=insights.recommendations,
+            confidence_score=auth_result.confidence_score,
+            cultural_factors=response_obj.cultural_adaptation,
+            trade_implications=trade_implications,
+            recommendations=response_obj.gtcx_recommendations,
             processing_time_ms=processing_time
         )
         
@@ -289,6 +413,7 @@ async def get_cultural_weights_for_panx(
         )
         db.add(verification)
         db.commit()
+        lot_cache.record(request.lot_id, LotVerificationEntry.from_row(verification))
         
         return PANXIntegrationResponse(
             cultural_weights=cultural_weights,
@@ -302,6 +427,147 @@ async def get_cultural_weights_for_panx(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/v2/panx/lots/{lot_id}/verifications", response_model=LotTimelineResponse, dependencies=[Depends(verify_api_key)])
+async def get_lot_verification_timeline(
+    lot_id: str,
+    db: Session = Depends(get_db)
+):
+    """Cultural verification timeline and aggregate weights for a PANX lot"""
+    try:
+        timeline = lot_cache.get(lot_id)
+        cached = timeline is not None
+        if timeline is None:
+            timeline = load_lot_timeline(db, lot_id)
+            lot_cache.put(timeline)
+        
+        if not timeline.entries:
+            raise HTTPException(status_code=404, detail=f"No cultural verifications for lot {lot_id}")
+        
+        return LotTimelineResponse(
+            **timeline.summary(),
+            timeline=[LotVerificationItem(**vars(entry)) for entry in timeline.entries],
+            cached=cached
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error loading lot timeline: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/v2/knowledge/search", response_model=KnowledgeSearchResponse, dependencies=[Depends(verify_api_key)])
+async def search_cultural_knowledge(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(default=10, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Fuzzy and prefix search over cultural knowledge terms and definitions"""
+    global knowledge_index
+    start_time = time.time()
+    
+    try:
+        if db.get_bind().dialect.name != "postgresql" and (
+            knowledge_index is None or knowledge_index.is_stale(db, KNOWLEDGE_INDEX_TTL)
+        ):
+            knowledge_index = KnowledgeSearchIndex.from_session(db)
+        
+        results = search_knowledge(db, q, limit=limit, index=knowledge_index)
+        
+        return KnowledgeSearchResponse(
+            query=q,
+            results=[
+                KnowledgeSearchHit(
+                    id=r.id,
+                    term=r.term,
+                    definition=r.definition,
+                    trade_relevance=r.trade_relevance,
+                    region=r.region,
+                    variant=r.variant,
+                    category=r.category,
+                    score=r.score
+                )
+                for r in results
+            ],
+            processing_time_ms=(time.time() - start_time) * 1000
+        )
+        
+    except Exception as e:
+        logger.error(f"Error searching cultural knowledge: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/v2/export", response_model=ExportStatusResponse, status_code=202, dependencies=[Depends(verify_api_key)])
+async def start_analysis_export(request: ExportRequest, background_tasks: BackgroundTasks):
+    """Schedule a streaming Parquet export of stored analyses"""
+    unknown = [t for t in request.tables if t not in EXPORT_TABLES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown export tables: {unknown}")
+    
+    export_id = datetime.utcnow().strftime("%Y%m%dT%H%M%S") + "-" + uuid4().hex[:8]
+    export_config = ExportConfig(
+        output_dir=os.path.join(EXPORT_DIR, export_id),
+        tables=request.tables,
+        partition_by=request.partition_by,
+        compression=request.compression,
+        row_group_size=request.row_group_size
+    )
+    try:
+        exporter = AnalysisExporter(export_config)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    export_jobs[export_id] = {"status": "scheduled", "output_dir": export_config.output_dir, "tables": {}, "error": None}
+    background_tasks.add_task(run_analysis_export, export_id, exporter)
+    
+    return ExportStatusResponse(export_id=export_id, **export_jobs[export_id])
+
+
+@app.get("/api/v2/export/{export_id}", response_model=ExportStatusResponse, dependencies=[Depends(verify_api_key)])
+async def get_analysis_export(export_id: str):
+    """Status of a Parquet export started by this worker"""
+    job = export_jobs.get(export_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown export: {export_id}")
+    return ExportStatusResponse(export_id=export_id, **job)
+
+
+@app.get("/api/v2/models", dependencies=[Depends(verify_api_key)])
+async def list_models():
+    """Registered detector versions and the version loaded by this worker"""
+    if core.model_registry is None:
+        raise HTTPException(status_code=404, detail="No model registry configured")
+    name = config.model_name
+    try:
+        return {
+            "model": name,
+            "active_version": core.model_registry.active_version(name),
+            "loaded_version": core.model_version,
+            "versions": [core.model_registry.info(name, v) for v in core.model_registry.versions(name)],
+        }
+    except Exception as e:
+        logger.error(f"Error listing models: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/v2/models/reload", dependencies=[Depends(verify_api_key)])
+async def reload_model(request: ModelReloadRequest):
+    """
+    Activate a detector version and hot-swap it in without a restart.
+    
+    The swap happens in this worker immediately; other workers pick up the
+    manifest change on their next registry poll.
+    """
+    if core.model_registry is None:
+        raise HTTPException(status_code=404, detail="No model registry configured")
+    try:
+        return await core.reload_detector(request.version, activate=request.version is not None)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error reloading model: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/api/v2/cortex/forward")
 async def forward_cultural_event(event: Dict[str, Any]):
     """Forward cultural events to Cortex"""
@@ -363,20 +629,46 @@ def generate_cultural_recommendations(region: str, event_type: str, validators:
     return recommendations
 
 
+def run_analysis_export(export_id: str, exporter: AnalysisExporter) -> None:
+    """Run a Parquet export in a worker thread with its own session"""
+    job = export_jobs[export_id]
+    job["status"] = "running"
+    db = SessionLocal()
+    try:
+        for result in exporter.export(db):
+            job["tables"][result.table] = {"rows": result.rows, "files": len(result.files), "seconds": result.seconds}
+        job["status"] = "completed"
+    except Exception as e:
+        logger.error(f"Export {export_id} failed: {e}")
+        job["status"] = "failed"
+        job["error"] = str(e)
+    finally:
+        db.close()
+
+
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
 async def forward_to_cortex(event: Dict[str, Any]) -> Dict[str, str]:
     """Forward event to Cortex for analytics"""
-    try:
-        response = await http_client.post(
-            f"{CORTEX_URL}/cortex/ingest",
-            json={"events": [event]},
-            headers={"X-API-Key": CORTEX_API_KEY} if CORTEX_API_KEY else {}
-        )
-        response.raise_for_status()
-        return {"status": "forwarded", "cortex_response": response.json()}
-    except Exception as e:
-        logger.error(f"Failed to forward to Cortex: {e}")
-        return {"status": "failed", "error": str(e)}
+    with tracer.span("cortex.forward", kind="client", **{"http.url": f"{CORTEX_URL}/cortex/ingest"}) as span:
+        headers = {"X-API-Key": CORTEX_API_KEY} if CORTEX_API_KEY else {}
+        if span is not None:
+            headers["traceparent"] = span.traceparent()
+            headers["X-Request-Id"] = span.trace.request_id
+        try:
+            response = await http_client.post(
+                f"{CORTEX_URL}/cortex/ingest",
+                json={"events": [event]},
+                headers=headers
+            )
+            if span is not None:
+                span.set_attribute("http.status_code", response.status_code)
+            response.raise_for_status()
+            return {"status": "forwarded", "cortex_response": response.json()}
+        except Exception as e:
+            logger.error(f"Failed to forward to Cortex: {e}")
+            if span is not None:
+                span.set_error(e)
+            return {"status": "failed", "error": str(e)}
 
 
 if __name__ == "__main__":
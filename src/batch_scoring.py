@@ -0,0 +1,235 @@
+"""
+ANISA Batch Scoring
+Streams JSONL records through the full query pipeline on a process pool.
+
+The parent reads the input in chunks and writes results; each worker
+process owns one ``ANISACore`` and runs ``process_cultural_query`` over its
+chunk. Output keeps input order unless ``ordered`` is False, in which case
+chunks are written as soon as they finish. With ``persist`` the scored
+records are also stored as analyses through ``BatchWriter``, one
+transaction per batch.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+from models import ComplianceLevel, IntelligentResponse, TradeContext
+from worker_pool import init_worker, worker_core
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchConfig:
+    """Settings for a batch scoring run."""
+    input_path: str
+    output_path: str
+    workers: int = max(1, (os.cpu_count() or 2) - 1)
+    chunk_size: int = 256
+    ordered: bool = True
+    max_in_flight: int = 0  # chunks queued ahead of the writer; 0 = 2 x workers
+    text_field: str = "text"
+    trade_context: str = TradeContext.COMPLIANCE.value
+    compliance_level: str = ComplianceLevel.BASIC.value
+    progress_interval: float = 1.0  # seconds between progress callbacks
+    persist: bool = False  # also store scored records in the database
+    persist_batch_size: int = 500
+
+
+@dataclass
+class BatchResult:
+    """Outcome of a batch scoring run."""
+    processed: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def items_per_second(self) -> float:
+        return self.processed / self.seconds if self.seconds > 0 else 0.0
+
+
+def response_record(response: IntelligentResponse) -> Dict[str, Any]:
+    """JSON-serialisable summary of a pipeline response."""
+    context = response.cultural_context
+    return {
+        "region": context.region.value,
+        "variant": context.variant.value,
+        "trade_context": response.trade_context.value,
+        "authenticity_score": response.authenticity_score,
+        "response_text": response.response_text,
+        "compliance_notes": response.compliance_notes,
+        "gtcx_recommendations": response.gtcx_recommendations,
+    }
+
+
+def stored_analysis(record: Dict[str, Any], text_field: str = "text"):
+    """Database context (with its insight) for one scored record."""
+    from database import CulturalContext as DBContext, CulturalInsight as DBInsight
+    anisa = record["anisa"]
+    return DBContext(
+        text=record[text_field],
+        language=record.get("language") or "en",
+        region=anisa["region"],
+        variant=anisa["variant"],
+        confidence_score=anisa["authenticity_score"],
+        trade_context=anisa["trade_context"],
+        # No lexicon version: `reprocess` fills in the cultural markers
+        lexicon_version=None,
+        insights=[DBInsight(
+            event_type=anisa["trade_context"],
+            recommendations=anisa["gtcx_recommendations"],
+            authenticity_score=anisa["authenticity_score"],
+        )],
+    )
+
+
+async def _process_records(
+    records: List[Dict[str, Any]],
+    text_field: str,
+    trade_context: TradeContext,
+    compliance_level: ComplianceLevel,
+) -> List[Dict[str, Any]]:
+    core = worker_core()
+    results = []
+    for record in records:
+        if "error" in record:
+            results.append(record)
+            continue
+        text = record.get(text_field)
+        if not isinstance(text, str) or not text.strip():
+            results.append({**record, "error": f"missing '{text_field}'"})
+            continue
+        try:
+            response = await core.process_cultural_query(text, trade_context, compliance_level)
+            results.append({**record, "anisa": response_record(response)})
+        except Exception as e:
+            results.append({**record, "error": f"{type(e).__name__}: {e}"})
+    return results
+
+
+def process_chunk(
+    records: List[Dict[str, Any]],
+    text_field: str = "text",
+    trade_context: str = TradeContext.COMPLIANCE.value,
+    compliance_level: str = ComplianceLevel.BASIC.value,
+) -> List[Dict[str, Any]]:
+    """Run one chunk of records through the pipeline in a worker process."""
+    return asyncio.run(_process_records(
+        records, text_field, TradeContext(trade_context), ComplianceLevel(compliance_level),
+    ))
+
+
+def read_records(path: str, chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Chunks of input records; malformed lines become error records."""
+    chunk: List[Dict[str, Any]] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                record = {"line": line_no, "error": f"invalid JSON: {e}"}
+            if isinstance(record, str):
+                record = {"text": record}
+            elif not isinstance(record, dict):
+                record = {"line": line_no, "error": "record is not an object"}
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+class BatchScoringJob:
+    """
+    Parallel JSONL scoring with bounded read-ahead.
+
+    At most ``max_in_flight`` chunks are queued, so memory stays flat no
+    matter how large the input is.
+    """
+
+    def __init__(
+        self,
+        config: BatchConfig,
+        on_progress: Optional[Callable[[BatchResult], None]] = None,
+        session_factory=None,
+    ):
+        self.config = config
+        self.on_progress = on_progress
+        self.session_factory = session_factory
+        self._stop = False
+
+    def stop(self) -> None:
+        """Ask the run to write the in-flight chunks and exit."""
+        self._stop = True
+
+    def run(self) -> BatchResult:
+        config = self.config
+        max_in_flight = config.max_in_flight or 2 * config.workers
+        result = BatchResult()
+        started = time.monotonic()
+        last_progress = started
+        chunks = read_records(config.input_path, config.chunk_size)
+        exhausted = False
+        in_flight: Deque[Future] = deque()
+
+        logger.info(
+            f"Scoring {config.input_path} -> {config.output_path} with {config.workers} workers "
+            f"({'ordered' if config.ordered else 'unordered'})"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(config.output_path)), exist_ok=True)
+        if config.persist:
+            from database import BatchWriter
+            store = BatchWriter(self.session_factory, batch_size=config.persist_batch_size)
+        else:
+            store = nullcontext()
+        with ProcessPoolExecutor(max_workers=config.workers, initializer=init_worker) as pool, \
+                open(config.output_path, "w", encoding="utf-8") as out, store as writer:
+            while True:
+                while not exhausted and not self._stop and len(in_flight) < max_in_flight:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        exhausted = True
+                        break
+                    in_flight.append(pool.submit(
+                        process_chunk, chunk, config.text_field, config.trade_context, config.compliance_level,
+                    ))
+                if not in_flight:
+                    break
+
+                if config.ordered:
+                    done = [in_flight.popleft()]
+                else:
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    done = [f for f in in_flight if f in finished]
+                    for future in done:
+                        in_flight.remove(future)
+
+                for future in done:
+                    for record in future.result():
+                        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                        result.processed += 1
+                        result.failed += "error" in record
+                        if writer is not None and "anisa" in record:
+                            writer.add(stored_analysis(record, config.text_field))
+
+                now = time.monotonic()
+                result.seconds = now - started
+                if self.on_progress is not None and now - last_progress >= config.progress_interval:
+                    self.on_progress(result)
+                    last_progress = now
+
+        result.seconds = time.monotonic() - started
+        logger.info(f"Scored {result.processed} records ({result.failed} failed) at {result.items_per_second:.1f} items/s")
+        return result
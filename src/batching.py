@@ -0,0 +1,173 @@
+"""
+ANISA Micro-Batching
+Collects concurrent inference requests into batches for vectorized models.
+
+Requests are queued on the event loop; a worker drains up to
+``max_batch_size`` items, waiting at most ``max_wait_ms`` after the first
+one, runs a single batched inference in an executor thread and resolves
+each request's future with its own result.
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass
+class BatchStats:
+    """Running batcher statistics."""
+    batches: int = 0
+    items: int = 0
+    max_batch: int = 0
+    errors: int = 0
+    inference_seconds: float = 0.0
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.items / self.batches if self.batches else 0.0
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Asyncio micro-batcher around a synchronous batch function.
+
+    Args:
+        infer: Maps a list of inputs to a list of results of the same length
+        max_batch_size: Largest batch passed to ``infer``
+        max_wait_ms: Longest time the first queued item waits for company
+        max_queue: Pending items accepted before ``submit`` applies backpressure
+        executor: Executor for ``infer``; defaults to a dedicated thread
+        name: Label used in logs and metrics
+    """
+
+    def __init__(
+        self,
+        infer: Callable[[List[T]], Sequence[R]],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        max_queue: int = 10_000,
+        executor: Optional[Executor] = None,
+        name: str = "batcher",
+    ):
+        self.infer = infer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue = max_queue
+        self.name = name
+        self.stats = BatchStats()
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+        """Start the batching worker on the running event loop."""
+        if self.running:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"anisa-{self.name}")
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._worker = asyncio.create_task(self._run())
+        logger.info(
+            f"Micro-batcher '{self.name}' started (max batch {self.max_batch_size}, "
+            f"max wait {self.max_wait * 1000:.1f}ms)"
+        )
+
+    async def stop(self) -> None:
+        """Finish queued requests, then stop the worker."""
+        if not self.running:
+            return
+        await self._queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        logger.info(f"Micro-batcher '{self.name}' stopped after {self.stats.batches} batches")
+
+    async def submit(self, item: T) -> R:
+        """Queue one input and wait for its result."""
+        if not self.running:
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[T, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # Take whatever is already queued before waiting for more
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            inputs = [item for item, _ in batch]
+            started = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self._executor, self.infer, inputs)
+                if len(results) != len(inputs):
+                    raise RuntimeError(f"{self.name}: {len(results)} results for {len(inputs)} inputs")
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+            except Exception as e:
+                self.stats.errors += 1
+                logger.error(f"Micro-batch inference failed in '{self.name}': {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                self.stats.batches += 1
+                self.stats.items += len(batch)
+                self.stats.max_batch = max(self.stats.max_batch, len(batch))
+                self.stats.inference_seconds += time.perf_counter() - started
+                for _ in batch:
+                    self._queue.task_done()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Statistics for status endpoints and metrics."""
+        return {
+            "name": self.name,
+            "running": self.running,
+            "queue_depth": self.queue_depth,
+            "batches": self.stats.batches,
+            "items": self.stats.items,
+            "mean_batch_size": round(self.stats.mean_batch_size, 2),
+            "max_batch": self.stats.max_batch,
+            "errors": self.stats.errors,
+        }
@@ -0,0 +1,218 @@
+"""
+ANISA Pipeline Benchmark
+Runs a corpus through ``ANISACore`` and reports per-stage latency percentiles.
+
+Stage timings come from a stage hook (see ``ANISACore.add_stage_hook``), so
+the numbers cover exactly the code paths served in production. Results are
+written as JSON so runs can be diffed.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import platform
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from allocations import AllocationTracker
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:  # pragma: no cover - not on Windows
+    RESOURCE_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Small built-in corpus: short, medium and long queries across variants
+BUILTIN_CORPUS = [
+    "How can I build a strong community?",
+    "We need to consult with the community before making any decisions about mining operations.",
+    "Let's build relationships first before discussing business terms with the Shanghai partners.",
+    "We can find a creative solution with limited resources for the Mumbai cooperative.",
+    "Family ties and traditional authority in Amman matter in this negotiation.",
+    "There's always a way to make this work with the port authority in Santos.",
+    "Regulatory compliance, export certification and LBMA traceability are required before shipment.",
+    (
+        "Our gold cooperative in Ghana wants to sell to a refinery in Dubai. The community elders must "
+        "agree, the chief has asked for a development fund, and the buyer requires OECD due diligence, "
+        "chain of custody documentation and an assay certificate before any payment is released. "
+        "How should we structure consultation, compliance and the trade itself?"
+    ),
+]
+
+
+def latency_summary(seconds: Sequence[float]) -> Dict[str, float]:
+    """Count, mean and p50/p95/p99/max in milliseconds."""
+    if not len(seconds):
+        return {"count": 0}
+    ms = np.asarray(seconds, dtype=np.float64) * 1000.0
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "count": int(ms.size),
+        "mean_ms": round(float(ms.mean()), 4),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "max_ms": round(float(ms.max()), 4),
+    }
+
+
+class StageTimer:
+    """Stage hook recording wall-clock duration of every stage call."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    @contextmanager
+    def __call__(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples[stage].append(time.perf_counter() - started)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {stage: latency_summary(values) for stage, values in self.samples.items()}
+
+
+def max_rss_mb() -> Optional[float]:
+    """Process resident-set high-water mark in MiB."""
+    if not RESOURCE_AVAILABLE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 2)
+
+
+def load_corpus(path: Optional[str] = None, text_field: str = "text", limit: Optional[int] = None) -> List[str]:
+    """Texts from JSONL shards/directories, or the built-in corpus when ``path`` is None."""
+    if not path:
+        return list(BUILTIN_CORPUS)
+    from training.data.streaming import iter_jsonl
+
+    texts = []
+    for record in iter_jsonl([path]):
+        text = record.get(text_field) if isinstance(record, dict) else record
+        if isinstance(text, str) and text.strip():
+            texts.append(text)
+            if limit and len(texts) >= limit:
+                break
+    if not texts:
+        raise ValueError(f"No '{text_field}' texts found in {path}")
+    return texts
+
+
+@dataclass
+class BenchConfig:
+    """Settings for a benchmark run."""
+    corpus_path: Optional[str] = None
+    text_field: str = "text"
+    synthetic_count: Optional[int] = None  # generated queries used instead of a corpus
+    synthetic_seed: int = 0
+    count: Optional[int] = 1000  # queries to time; ignored when duration is set
+    duration_seconds: Optional[float] = None
+    warmup: int = 50  # untimed queries run first
+    concurrency: int = 1  # concurrent queries on the event loop
+    track_allocations: bool = False  # per-stage tracemalloc histograms; inflates stage timings
+    allocation_budget_bytes: int = 0  # log stage calls whose peak exceeds this
+
+
+async def run_benchmark(core, texts: Sequence[str], config: BenchConfig) -> Dict[str, Any]:
+    """
+    Run queries through ``core.process_cultural_query`` and collect timings.
+
+    With ``concurrency`` above 1, stage timings include time spent waiting
+    for the event loop while other queries run, and allocation numbers
+    include other queries' allocations.
+
+    Args:
+        core: An ``ANISACore``
+        texts: Corpus, cycled as needed
+        config: Benchmark settings
+
+    Returns:
+        JSON-serialisable results
+    """
+    for i in range(config.warmup):
+        await core.process_cultural_query(texts[i % len(texts)])
+
+    timer = StageTimer()
+    tracker = AllocationTracker(budget_bytes=config.allocation_budget_bytes) if config.track_allocations else None
+    totals: List[float] = []
+    errors = 0
+    next_index = 0
+    deadline = time.perf_counter() + config.duration_seconds if config.duration_seconds else None
+    limit = None if deadline else (config.count or len(texts))
+
+    async def worker() -> None:
+        nonlocal next_index, errors
+        while True:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            if limit is not None and next_index >= limit:
+                return
+            text = texts[next_index % len(texts)]
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                await core.process_cultural_query(text)
+            except Exception as e:
+                errors += 1
+                logger.debug(f"Benchmark query failed: {e}")
+                continue
+            totals.append(time.perf_counter() - started)
+
+    if tracker is not None:
+        tracker.start()
+        core.add_stage_hook(tracker)
+    core.add_stage_hook(timer)
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, config.concurrency))))
+    finally:
+        elapsed = time.perf_counter() - started
+        core.remove_stage_hook(timer)
+        if tracker is not None:
+            core.remove_stage_hook(tracker)
+            tracker.stop()
+
+    results = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": asdict(config),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "detector_backend": core.config.detector_backend,
+        },
+        "corpus_size": len(texts),
+        "queries": len(totals),
+        "errors": errors,
+        "seconds": round(elapsed, 4),
+        "throughput_per_second": round(len(totals) / elapsed, 2) if elapsed > 0 else 0.0,
+        "total": latency_summary(totals),
+        "stages": timer.summary(),
+        "memory": {"max_rss_mb": max_rss_mb()},
+    }
+    if tracker is not None:
+        results["allocations"] = {**tracker.summary(), "histograms": tracker.export_histograms()}
+    return results
+
+
+def write_results(results: Dict[str, Any], path: str) -> Path:
+    """Write benchmark results as indented JSON."""
+    output = Path(path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    return output
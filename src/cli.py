@@ -154,6 +154,211 @@ class ANISACLI:
         print("\n🎉 Demo completed! Try your own queries or type 'help' for commands.")
 
 
+def run_export(args: argparse.Namespace):
+    """Export stored analyses to Parquet."""
+    from database import SessionLocal
+    from training.data.exporter import AnalysisExporter, ExportConfig
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    export_config = ExportConfig(
+        output_dir=args.output,
+        tables=args.tables,
+        partition_by=args.partition_by,
+        compression=args.compression,
+        row_group_size=args.row_group_size,
+        max_rows_per_file=args.max_rows_per_file
+    )
+    
+    db = SessionLocal()
+    try:
+        results = AnalysisExporter(export_config).export(db)
+    except Exception as e:
+        print(f"❌ Export failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+    
+    print("\n📦 Export complete:")
+    for result in results:
+        print(f"   {result.table}: {result.rows} rows in {len(result.files)} files ({result.seconds:.1f}s)")
+
+
+def run_reprocess(args: argparse.Namespace):
+    """Re-score stored analyses after a lexicon update."""
+    import signal
+    from reprocess import ReprocessConfig, ReprocessJob
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    reprocess_config = ReprocessConfig(
+        chunk_size=args.chunk_size,
+        max_rows_per_second=args.max_rows_per_second,
+        checkpoint_path=args.checkpoint,
+        only_stale=not args.all,
+        restart=args.restart
+    )
+    if args.workers:
+        reprocess_config.workers = args.workers
+    
+    job = ReprocessJob(reprocess_config)
+    
+    def request_stop(signum, frame):
+        print("\n⏸️  Stopping after in-flight chunks; progress is checkpointed.")
+        job.stop()
+    
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+    
+    checkpoint = job.run()
+    status = "complete" if checkpoint.completed else "paused"
+    print(f"\n🔁 Reprocessing {status}: {checkpoint.processed} rows, {checkpoint.changed} changed "
+          f"(lexicon {checkpoint.lexicon_version}, last id {checkpoint.last_id})")
+
+
+def run_score(args: argparse.Namespace):
+    """Score a JSONL file through the full pipeline on a process pool."""
+    import signal
+    from batch_scoring import BatchConfig, BatchScoringJob
+    
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    batch_config = BatchConfig(
+        input_path=args.input,
+        output_path=args.output,
+        chunk_size=args.chunk_size,
+        ordered=not args.unordered,
+        persist=args.persist
+    )
+    if args.workers:
+        batch_config.workers = args.workers
+    
+    def show_progress(result):
+        print(f"\r⚙️  {result.processed} items, {result.failed} failed, "
+              f"{result.items_per_second:.1f} items/s", end="", file=sys.stderr, flush=True)
+    
+    job = BatchScoringJob(batch_config, on_progress=show_progress)
+    
+    def request_stop(signum, frame):
+        print("\n⏸️  Stopping after in-flight chunks.", file=sys.stderr)
+        job.stop()
+    
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+    
+    try:
+        result = job.run()
+    except Exception as e:
+        print(f"\n❌ Batch scoring failed: {e}")
+        sys.exit(1)
+    print(f"\n📦 Scored {result.processed} records ({result.failed} failed) in {result.seconds:.1f}s "
+          f"({result.items_per_second:.1f} items/s) -> {args.output}")
+
+
+async def run_bench(args: argparse.Namespace):
+    """Benchmark the query pipeline with a per-stage latency breakdown."""
+    from benchmark import BenchConfig, load_corpus, run_benchmark, write_results
+    
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    bench_config = BenchConfig(
+        corpus_path=args.corpus,
+        text_field=args.text_field,
+        synthetic_count=args.synthetic,
+        synthetic_seed=args.seed,
+        count=args.count,
+        duration_seconds=args.duration,
+        warmup=args.warmup,
+        concurrency=args.concurrency,
+        track_allocations=args.allocations,
+        allocation_budget_bytes=args.allocation_budget
+    )
+    core = ANISACore(ANISAConfig.from_environment())
+    try:
+        if bench_config.synthetic_count:
+            from training.data.synthetic import SyntheticCorpusConfig, SyntheticCorpusGenerator
+            texts = SyntheticCorpusGenerator(
+                SyntheticCorpusConfig(count=bench_config.synthetic_count, seed=bench_config.synthetic_seed)
+            ).texts()
+        else:
+            texts = load_corpus(bench_config.corpus_path, bench_config.text_field, args.corpus_limit)
+        await core.start_batching()
+        try:
+            results = await run_benchmark(core, texts, bench_config)
+        finally:
+            await core.stop_batching()
+    except Exception as e:
+        print(f"❌ Benchmark failed: {e}")
+        sys.exit(1)
+    
+    path = write_results(results, args.output)
+    print(f"\n⏱️  {results['queries']} queries in {results['seconds']:.2f}s "
+          f"({results['throughput_per_second']:.1f} queries/s, {results['errors']} errors)")
+    print(f"   {'stage':<20}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for stage, summary in [*results['stages'].items(), ("total", results['total'])]:
+        if summary.get("count"):
+            print(f"   {stage:<20}{summary['p50_ms']:>10.3f}{summary['p95_ms']:>10.3f}{summary['p99_ms']:>10.3f}")
+    print(f"   Max RSS: {results['memory']['max_rss_mb']} MiB")
+    if 'allocations' in results:
+        print(f"   {'stage':<20}{'p50 KiB':>10}{'p95 KiB':>10}{'max KiB':>10}{'p95 blocks':>12}  (peak allocations)")
+        for stage, metrics in results['allocations']['stages'].items():
+            peak, blocks = metrics['peak_bytes'], metrics['net_blocks']
+            if peak.get("count"):
+                print(f"   {stage:<20}{peak['p50'] / 1024:>10.1f}{peak['p95'] / 1024:>10.1f}"
+                      f"{peak['max'] / 1024:>10.1f}{blocks['p95']:>12.0f}")
+        if results['allocations']['budget_bytes']:
+            print(f"   {results['allocations']['offender_count']} stage calls over the allocation budget")
+    print(f"📄 Results written to {path}")
+
+
+async def run_profile(args: argparse.Namespace):
+    """Profile the query pipeline or a single API endpoint."""
+    from benchmark import load_corpus
+    from profiling import (
+        EndpointWorkload, PipelineWorkload, ProfileConfig, api_key_headers, load_app, parse_body,
+        run_profile as profile_workload,
+    )
+    
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    profile_config = ProfileConfig(
+        output_dir=args.output_dir,
+        name=args.name or ("endpoint" if args.endpoint else "pipeline"),
+        profiler=args.profiler,
+        count=args.count,
+        warmup=args.warmup,
+        top=args.top,
+        sort=args.sort,
+        interval_ms=args.interval_ms,
+        sampling_seconds=args.sampling_seconds,
+        all_threads=args.all_threads
+    )
+    try:
+        texts = load_corpus(args.corpus, args.text_field, args.corpus_limit)
+        if args.endpoint:
+            workload = EndpointWorkload(
+                load_app(args.app),
+                args.endpoint,
+                method=args.method,
+                body=parse_body(args.body),
+                texts=texts,
+                text_key=args.text_key,
+                headers=api_key_headers()
+            )
+        else:
+            workload = PipelineWorkload(ANISACore(ANISAConfig.from_environment()), texts)
+        result = await profile_workload(workload, profile_config)
+    except Exception as e:
+        print(f"❌ Profiling failed: {e}")
+        sys.exit(1)
+    
+    runs = ", ".join(
+        f"{name}: {result.iterations[name]} iterations in {seconds:.2f}s" for name, seconds in result.seconds.items()
+    )
+    print(f"\n🔥 Profiled {runs}")
+    if result.failures:
+        print(f"   ⚠️  {result.failures} requests failed")
+    for row in result.top_sampled[:10]:
+        print(f"   {row['self_pct']:>6.2f}% self {row['total_pct']:>6.2f}% total  {row['function']}")
+    for kind, path in result.files.items():
+        print(f"📄 {kind}: {path}")
+
+
 async def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -175,8 +380,151 @@ async def main():
         help="Path to configuration file"
     )
     
+    subparsers = parser.add_subparsers(dest="command")
+    
+    score_parser = subparsers.add_parser(
+        "score",
+        help="Score a JSONL file of records through the pipeline on parallel workers"
+    )
+    score_parser.add_argument("--input", type=str, required=True, help="JSONL file of records to score")
+    score_parser.add_argument("--output", type=str, required=True, help="JSONL file for results")
+    score_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPUs - 1)")
+    score_parser.add_argument("--chunk-size", type=int, default=256, help="Records per work unit")
+    score_parser.add_argument(
+        "--unordered", 
+        action="store_true", 
+        help="Write results as chunks finish instead of in input order"
+    )
+    score_parser.add_argument(
+        "--persist", 
+        action="store_true", 
+        help="Also store scored records in the database, committed in batches"
+    )
+    
+    export_parser = subparsers.add_parser(
+        "export",
+        help="Export stored analyses to partitioned Parquet files"
+    )
+    export_parser.add_argument("--output", type=str, default="exports", help="Output directory")
+    export_parser.add_argument(
+        "--tables", 
+        nargs="+", 
+        choices=["contexts", "insights"], 
+        default=["contexts", "insights"],
+        help="Tables to export"
+    )
+    export_parser.add_argument(
+        "--partition-by", 
+        nargs="*", 
+        choices=["region", "variant", "language", "trade_context", "event_type"],
+        default=["region", "event_type"],
+        help="Columns to partition by (applied to tables that have them)"
+    )
+    export_parser.add_argument("--compression", type=str, default="zstd", help="Parquet compression codec")
+    export_parser.add_argument("--row-group-size", type=int, default=50_000, help="Rows per Parquet row group")
+    export_parser.add_argument("--max-rows-per-file", type=int, default=1_000_000, help="Rows per output file")
+    
+    reprocess_parser = subparsers.add_parser(
+        "reprocess",
+        help="Re-score stored analyses with the current marker lexicon"
+    )
+    reprocess_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPUs - 1)")
+    reprocess_parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per keyset chunk")
+    reprocess_parser.add_argument(
+        "--max-rows-per-second", 
+        type=float, 
+        default=0.0, 
+        help="Throttle rate (0 = unthrottled)"
+    )
+    reprocess_parser.add_argument(
+        "--checkpoint", 
+        type=str, 
+        default="reprocess_checkpoint.json", 
+        help="Checkpoint file used to resume"
+    )
+    reprocess_parser.add_argument("--restart", action="store_true", help="Ignore any existing checkpoint")
+    reprocess_parser.add_argument(
+        "--all", 
+        action="store_true", 
+        help="Re-score rows already at the current lexicon version"
+    )
+    
+    bench_parser = subparsers.add_parser(
+        "bench",
+        help="Benchmark the query pipeline with per-stage latency percentiles"
+    )
+    bench_parser.add_argument("--corpus", type=str, default=None, help="JSONL corpus (default: built-in queries)")
+    bench_parser.add_argument("--text-field", type=str, default="text", help="Record field holding the query")
+    bench_parser.add_argument("--corpus-limit", type=int, default=None, help="Texts loaded from the corpus")
+    bench_parser.add_argument(
+        "--synthetic", 
+        type=int, 
+        default=None, 
+        help="Generate this many synthetic multilingual queries instead of loading a corpus"
+    )
+    bench_parser.add_argument("--seed", type=int, default=0, help="Seed for --synthetic")
+    bench_parser.add_argument("--count", type=int, default=1000, help="Queries to time")
+    bench_parser.add_argument("--duration", type=float, default=None, help="Seconds to run (overrides --count)")
+    bench_parser.add_argument("--warmup", type=int, default=50, help="Untimed queries run first")
+    bench_parser.add_argument("--concurrency", type=int, default=1, help="Concurrent queries")
+    bench_parser.add_argument(
+        "--allocations", 
+        action="store_true", 
+        help="Record per-stage tracemalloc allocations (slows every stage)"
+    )
+    bench_parser.add_argument(
+        "--allocation-budget", 
+        type=int, 
+        default=0, 
+        help="Log stage calls allocating more than this many bytes at peak (with --allocations)"
+    )
+    bench_parser.add_argument("--output", type=str, default="bench_results.json", help="JSON results file")
+    
+    profile_parser = subparsers.add_parser(
+        "profile",
+        help="Profile the pipeline or an API endpoint (pstats + collapsed stacks)"
+    )
+    profile_parser.add_argument("--corpus", type=str, default=None, help="JSONL corpus (default: built-in queries)")
+    profile_parser.add_argument("--text-field", type=str, default="text", help="Record field holding the query")
+    profile_parser.add_argument("--corpus-limit", type=int, default=None, help="Texts loaded from the corpus")
+    profile_parser.add_argument("--count", type=int, default=500, help="Iterations per profiler")
+    profile_parser.add_argument("--warmup", type=int, default=20, help="Unprofiled iterations run first")
+    profile_parser.add_argument(
+        "--profiler", 
+        choices=["cprofile", "sampling", "both"], 
+        default="both", 
+        help="Deterministic (cProfile), sampling, or both in turn"
+    )
+    profile_parser.add_argument("--interval-ms", type=float, default=1.0, help="Sampling interval")
+    profile_parser.add_argument("--sampling-seconds", type=float, default=2.0, help="Minimum sampled run time")
+    profile_parser.add_argument("--all-threads", action="store_true", help="Sample every thread, not just the event loop")
+    profile_parser.add_argument("--top", type=int, default=25, help="Hot functions in the summary")
+    profile_parser.add_argument("--sort", type=str, default="cumulative", help="pstats sort key for the summary")
+    profile_parser.add_argument("--output-dir", type=str, default="profiles", help="Directory for profile files")
+    profile_parser.add_argument("--name", type=str, default=None, help="Output file prefix")
+    profile_parser.add_argument("--endpoint", type=str, default=None, help="API path to profile, e.g. /api/v2/analyze")
+    profile_parser.add_argument("--app", choices=["v1", "v2"], default="v2", help="API serving --endpoint")
+    profile_parser.add_argument("--method", type=str, default="POST", help="HTTP method for --endpoint")
+    profile_parser.add_argument("--body", type=str, default=None, help="Fixed JSON body, or @file")
+    profile_parser.add_argument("--text-key", type=str, default="text", help="Body field filled from the corpus")
+    
     args = parser.parse_args()
     
+    if args.command == "score":
+        run_score(args)
+        return
+    if args.command == "export":
+        run_export(args)
+        return
+    if args.command == "reprocess":
+        run_reprocess(args)
+        return
+    if args.command == "bench":
+        await run_bench(args)
+        return
+    if args.command == "profile":
+        await run_profile(args)
+        return
     try:
         cli = ANISACLI()
         
@@ -42,6 +42,34 @@ class ANISAConfig:
     enable_variant_switching: bool = True
     variant_confidence_threshold: float = 0.8
     
+    # Detection Backend Settings
+    detector_backend: str = "keyword"  # keyword | linear | cascade
+    detector_model_path: str = ""
+    cascade_margin: int = 1  # keyword lead over the runner-up needed to skip the model
+    cascade_min_score: int = 1  # keyword matches needed to skip the model
+    model_registry_dir: str = ""  # when set, learned backends load the registry's active version
+    model_name: str = "cultural-detector"
+    model_poll_seconds: float = 10.0  # how often workers check the registry for a new active version
+    enable_micro_batching: bool = True  # batch concurrent model-backed detections in the API
+    batch_max_size: int = 64
+    batch_max_wait_ms: float = 2.0
+    
+    # Insight Retrieval Settings
+    insight_index_dir: str = ""  # saved index built by insight_index.py; empty = build from built-in insights
+    insight_n_probe: int = 8  # IVF lists scanned per topic lookup
+    insight_min_score: float = 0.2  # minimum cosine similarity for a returned insight
+    
+    # Allocation Tracking Settings (opt-in, slows every stage)
+    enable_allocation_tracking: bool = False  # tracemalloc measurements per pipeline stage
+    allocation_budget_bytes: int = 1048576  # peak bytes per stage call before it is logged
+    allocation_top_lines: int = 0  # source lines logged per offender; > 0 snapshots every stage
+    
+    # Tracing Settings
+    trace_exporter: str = "none"  # none | jsonl | otlp
+    trace_path: str = "traces/anisa-spans-{pid}.jsonl"  # {pid} keeps worker processes in separate files
+    trace_sample_rate: float = 0.1  # fraction of requests traced
+    trace_slow_ms: float = 0.0  # always export requests slower than this; 0 disables
+    
     @classmethod
     def from_environment(cls) -> "ANISAConfig":
         """Create configuration from environment variables."""
@@ -63,7 +91,27 @@ class ANISAConfig:
             log_format=os.getenv("ANISA_LOG_FORMAT", "json"),
             default_variant=os.getenv("ANISA_DEFAULT_VARIANT", "ubuntu"),
             enable_variant_switching=os.getenv("ANISA_ENABLE_VARIANT_SWITCHING", "true").lower() == "true",
-            variant_confidence_threshold=float(os.getenv("ANISA_VARIANT_CONFIDENCE_THRESHOLD", "0.8"))
+            variant_confidence_threshold=float(os.getenv("ANISA_VARIANT_CONFIDENCE_THRESHOLD", "0.8")),
+            detector_backend=os.getenv("ANISA_DETECTOR_BACKEND", "keyword"),
+            detector_model_path=os.getenv("ANISA_DETECTOR_MODEL_PATH", ""),
+            cascade_margin=int(os.getenv("ANISA_CASCADE_MARGIN", "1")),
+            cascade_min_score=int(os.getenv("ANISA_CASCADE_MIN_SCORE", "1")),
+            model_registry_dir=os.getenv("ANISA_MODEL_REGISTRY_DIR", ""),
+            model_name=os.getenv("ANISA_MODEL_NAME", "cultural-detector"),
+            model_poll_seconds=float(os.getenv("ANISA_MODEL_POLL_SECONDS", "10.0")),
+            enable_micro_batching=os.getenv("ANISA_ENABLE_MICRO_BATCHING", "true").lower() == "true",
+            batch_max_size=int(os.getenv("ANISA_BATCH_MAX_SIZE", "64")),
+            batch_max_wait_ms=float(os.getenv("ANISA_BATCH_MAX_WAIT_MS", "2.0")),
+            insight_index_dir=os.getenv("ANISA_INSIGHT_INDEX_DIR", ""),
+            insight_n_probe=int(os.getenv("ANISA_INSIGHT_N_PROBE", "8")),
+            insight_min_score=float(os.getenv("ANISA_INSIGHT_MIN_SCORE", "0.2")),
+            enable_allocation_tracking=os.getenv("ANISA_ENABLE_ALLOCATION_TRACKING", "false").lower() == "true",
+            allocation_budget_bytes=int(os.getenv("ANISA_ALLOCATION_BUDGET_BYTES", "1048576")),
+            allocation_top_lines=int(os.getenv("ANISA_ALLOCATION_TOP_LINES", "0")),
+            trace_exporter=os.getenv("ANISA_TRACE_EXPORTER", "none"),
+            trace_path=os.getenv("ANISA_TRACE_PATH", "traces/anisa-spans-{pid}.jsonl"),
+            trace_sample_rate=float(os.getenv("ANISA_TRACE_SAMPLE_RATE", "0.1")),
+            trace_slow_ms=float(os.getenv("ANISA_TRACE_SLOW_MS", "0"))
         )
     
     def to_dict(self) -> Dict[str, Any]:
@@ -86,5 +134,25 @@ class ANISAConfig:
             "log_format": self.log_format,
             "default_variant": self.default_variant,
             "enable_variant_switching": self.enable_variant_switching,
-            "variant_confidence_threshold": self.variant_confidence_threshold
+            "variant_confidence_threshold": self.variant_confidence_threshold,
+            "detector_backend": self.detector_backend,
+            "detector_model_path": self.detector_model_path,
+            "cascade_margin": self.cascade_margin,
+            "cascade_min_score": self.cascade_min_score,
+            "model_registry_dir": self.model_registry_dir,
+            "model_name": self.model_name,
+            "model_poll_seconds": self.model_poll_seconds,
+            "enable_micro_batching": self.enable_micro_batching,
+            "batch_max_size": self.batch_max_size,
+            "batch_max_wait_ms": self.batch_max_wait_ms,
+            "insight_index_dir": self.insight_index_dir,
+            "insight_n_probe": self.insight_n_probe,
+            "insight_min_score": self.insight_min_score,
+            "enable_allocation_tracking": self.enable_allocation_tracking,
+            "allocation_budget_bytes": self.allocation_budget_bytes,
+            "allocation_top_lines": self.allocation_top_lines,
+            "trace_exporter": self.trace_exporter,
+            "trace_path": self.trace_path,
+            "trace_sample_rate": self.trace_sample_rate,
+            "trace_slow_ms": self.trace_slow_ms
         }
@@ -4,8 +4,11 @@ Provides cultural intelligence processing for the GTCX ecosystem.
 """
 
 import asyncio
+import logging
 import time
-from typing import Dict, List, Optional, Any
+from contextlib import ExitStack, contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, Tuple
 from models import (
     CulturalContext, CulturalAuthentication, NativeUnderstanding, 
     IntelligentResponse, CulturalRegion, CulturalVariant, TradeContext, 
@@ -13,8 +16,26 @@ from models import (
     GTCTradePhase, GTCTradeQuery, GTCTradeResponse
 )
 from config import ANISAConfig
+from allocations import AllocationTracker
+from batching import MicroBatcher
+from insight_index import InsightIndex, iter_language_insights
+from model_registry import ModelRegistry, load_and_warm
+from tracing import Tracer
 from services import CulturalAuthenticationService, NativeLanguageService, IntelligenceService
 
+logger = logging.getLogger(__name__)
+
+# Detection backends that use a learned model
+LEARNED_BACKENDS = ("linear", "cascade")
+
+# Pipeline stages reported to stage hooks, in execution order
+PIPELINE_STAGES = ("context_detection", "authentication", "native_language", "intelligence", "trade_response")
+
+# A stage hook maps a stage name to a context manager wrapped around that stage
+StageHook = Callable[[str], ContextManager[Any]]
+
+_NO_HOOKS = nullcontext()
+
 
 class ANISACore:
     """
@@ -25,7 +46,13 @@ class ANISACore:
     def __init__(self, config: Optional[ANISAConfig] = None):
         """Initialize ANISA Core with GTCX ecosystem integration."""
         self.config = config or ANISAConfig()
-        self.auth_service = CulturalAuthenticationService()
+        self.model_registry: Optional[ModelRegistry] = None
+        self.model_version: Optional[str] = None
+        detector = None
+        if self.config.model_registry_dir and self.config.detector_backend in LEARNED_BACKENDS:
+            self.model_registry = ModelRegistry(self.config.model_registry_dir)
+            detector = self._load_registry_detector()
+        self.auth_service = CulturalAuthenticationService(self.config, detector=detector)
         self.language_service = NativeLanguageService(self.config)
         self.intelligence_service = IntelligenceService(self.config)
         self.performance_metrics = {
@@ -34,6 +61,146 @@ class ANISACore:
             'cultural_accuracy': 0.0,
             'gtcx_integration_success': 0.0
         }
+        self.detection_batcher: Optional[MicroBatcher] = None
+        self._model_watch: Optional[asyncio.Task] = None
+        self._reload_lock = asyncio.Lock()
+        self.insight_index: Optional[InsightIndex] = None
+        self._stage_hooks: List[StageHook] = []
+        self.allocation_tracker: Optional[AllocationTracker] = None
+        if self.config.enable_allocation_tracking:
+            self.allocation_tracker = AllocationTracker(
+                budget_bytes=self.config.allocation_budget_bytes,
+                top_lines=self.config.allocation_top_lines
+            )
+            self.allocation_tracker.start()
+            self.add_stage_hook(self.allocation_tracker)
+        self.tracer = Tracer.from_config(self.config)
+        if self.tracer.enabled:
+            self.add_stage_hook(self.tracer.stage)
+    
+    def add_stage_hook(self, hook: StageHook) -> None:
+        """
+        Wrap every pipeline stage with ``hook(stage_name)``.
+        
+        Hooks are entered in registration order and exited in reverse; they
+        are used for timing, allocation tracking and tracing.
+        """
+        self._stage_hooks.append(hook)
+    
+    def remove_stage_hook(self, hook: StageHook) -> None:
+        if hook in self._stage_hooks:
+            self._stage_hooks.remove(hook)
+    
+    def _stage(self, name: str) -> ContextManager[Any]:
+        hooks = self._stage_hooks
+        if not hooks:
+            return _NO_HOOKS
+        if len(hooks) == 1:
+            return hooks[0](name)
+        return self._stacked_stage(name)
+    
+    @contextmanager
+    def _stacked_stage(self, name: str) -> Iterator[None]:
+        with ExitStack() as stack:
+            for hook in list(self._stage_hooks):
+                stack.enter_context(hook(name))
+            yield
+    
+    def _load_registry_detector(self):
+        """Load the registry's active detector version at startup."""
+        try:
+            loaded = load_and_warm(self.model_registry, self.config.model_name)
+        except Exception as e:
+            logger.warning(f"No usable {self.config.model_name} in registry: {e}")
+            return None
+        self.model_version = loaded["version"]
+        logger.info(f"Loaded {self.config.model_name} {self.model_version} in {loaded['load_ms']:.0f}ms")
+        return loaded["model"]
+    
+    async def reload_detector(self, version: Optional[str] = None, activate: bool = False) -> Dict[str, Any]:
+        """
+        Load a detector version from the registry and hot-swap it in.
+        
+        Loading and warm-up run in a worker thread; requests keep using the
+        current detector until the swap, which is a single reference update.
+        
+        Args:
+            version: Version to load; defaults to the manifest's active version
+            activate: Also mark ``version`` active in the manifest, so other
+                worker processes pick it up on their next poll
+            
+        Returns:
+            Loaded version, previous version and load time
+        """
+        if self.model_registry is None:
+            raise RuntimeError("No model registry configured (set ANISA_MODEL_REGISTRY_DIR)")
+        name = self.config.model_name
+        loop = asyncio.get_running_loop()
+        async with self._reload_lock:
+            if activate and version:
+                await loop.run_in_executor(None, self.model_registry.activate, version, name)
+            loaded = await loop.run_in_executor(None, load_and_warm, self.model_registry, name, version)
+            previous = self.model_version
+            self.auth_service.set_detector(loaded["model"])
+            self.model_version = loaded["version"]
+        if self.detection_batcher is None or not self.detection_batcher.running:
+            await self.start_batching()
+        logger.info(f"Swapped {name} {previous} -> {self.model_version} (loaded in {loaded['load_ms']:.0f}ms)")
+        return {
+            "model": name,
+            "version": self.model_version,
+            "previous_version": previous,
+            "load_ms": round(loaded["load_ms"], 2),
+        }
+    
+    def start_model_watch(self) -> None:
+        """Poll the registry manifest and hot-swap when the active version changes."""
+        if self.model_registry is None or self.config.model_poll_seconds <= 0:
+            return
+        if self._model_watch is None or self._model_watch.done():
+            self._model_watch = asyncio.create_task(self._watch_model_registry())
+    
+    async def stop_model_watch(self) -> None:
+        if self._model_watch is not None:
+            self._model_watch.cancel()
+            try:
+                await self._model_watch
+            except asyncio.CancelledError:
+                pass
+            self._model_watch = None
+    
+    async def _watch_model_registry(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.model_poll_seconds)
+            try:
+                active = self.model_registry.active_version(self.config.model_name)
+                if active and active != self.model_version:
+                    await self.reload_detector(active)
+            except Exception as e:
+                logger.error(f"Model registry poll failed: {e}")
+    
+    async def start_batching(self) -> None:
+        """
+        Start micro-batching of region/variant detection on the running loop.
+        
+        Only model-backed detection is batched; keyword detection is cheaper
+        inline than a queue hop.
+        """
+        if not (self.config.enable_micro_batching and self.auth_service.model_backed):
+            return
+        if self.detection_batcher is None:
+            self.detection_batcher = MicroBatcher(
+                self.auth_service.detect_region_and_variant_batch,
+                max_batch_size=self.config.batch_max_size,
+                max_wait_ms=self.config.batch_max_wait_ms,
+                name="detection",
+            )
+        await self.detection_batcher.start()
+    
+    async def stop_batching(self) -> None:
+        """Drain and stop the detection micro-batcher."""
+        if self.detection_batcher is not None:
+            await self.detection_batcher.stop()
         
     async def process_cultural_query(
         self, 
@@ -54,33 +221,57 @@ class ANISACore:
         Returns:
             IntelligentResponse with GTCX integration insights
         """
+        _, response_obj = await self.analyze_cultural_query(
+            query, trade_context, compliance_level, gtcx_components
+        )
+        return response_obj
+    
+    async def analyze_cultural_query(
+        self, 
+        query: str, 
+        trade_context: TradeContext = TradeContext.COMPLIANCE,
+        compliance_level: ComplianceLevel = ComplianceLevel.BASIC,
+        gtcx_components: Optional[List[GTCEcosystemComponent]] = None
+    ) -> Tuple[CulturalAuthentication, IntelligentResponse]:
+        """
+        Run the query pipeline, keeping the authentication result.
+        
+        Same pipeline as ``process_cultural_query``; callers that report
+        cultural markers or confidence use this instead of authenticating
+        the query a second time. The detected context is
+        ``response.cultural_context``.
+        """
         start_time = time.time()
         
         # Detect cultural context with GTCX considerations
-        cultural_context = await self.detect_cultural_context(
-            query, trade_context, compliance_level, gtcx_components
-        )
+        with self._stage("context_detection"):
+            cultural_context = await self.detect_cultural_context(
+                query, trade_context, compliance_level, gtcx_components
+            )
         
         # Authenticate cultural context
-        auth_result = await self.auth_service.authenticate_cultural_context(
-            query, cultural_context
-        )
+        with self._stage("authentication"):
+            auth_result = await self.auth_service.authenticate_cultural_context(
+                query, cultural_context
+            )
         
         # Process native language understanding
-        native_understanding = await self.language_service.process_native_language(
-            query, cultural_context
-        )
+        with self._stage("native_language"):
+            native_understanding = await self.language_service.process_native_language(
+                query, cultural_context
+            )
         
         # Generate intelligent response with GTCX integration
-        response_obj = await self.intelligence_service.generate_intelligent_response(
-            query, cultural_context, auth_result, native_understanding
-        )
+        with self._stage("intelligence"):
+            response_obj = await self.intelligence_service.generate_intelligent_response(
+                query, cultural_context, auth_result, native_understanding
+            )
         
         # Update performance metrics
         processing_time = time.time() - start_time
         self._update_metrics(processing_time, auth_result.confidence_score)
         
-        return response_obj
+        return auth_result, response_obj
     
     async def process_gtcx_trade_query(self, trade_query: GTCTradeQuery) -> GTCTradeResponse:
         """
@@ -95,12 +286,13 @@ class ANISACore:
         start_time = time.time()
         
         # Detect cultural context for trade
-        cultural_context = await self.detect_cultural_context(
-            trade_query.query_text,
-            TradeContext.COMPLIANCE,  # Default, will be overridden
-            ComplianceLevel.BASIC,    # Default, will be overridden
-            trade_query.gtcx_components
-        )
+        with self._stage("context_detection"):
+            cultural_context = await self.detect_cultural_context(
+                trade_query.query_text,
+                TradeContext.COMPLIANCE,  # Default, will be overridden
+                ComplianceLevel.BASIC,    # Default, will be overridden
+                trade_query.gtcx_components
+            )
         
         # Update context with trade-specific information
         cultural_context.trade_context = TradeContext.COMPLIANCE  # Will be refined
@@ -115,22 +307,45 @@ class ANISACore:
         )
         
         # Authenticate cultural context for trade
-        auth_result = await self.auth_service.authenticate_cultural_context(
-            trade_query.query_text, cultural_context
-        )
+        with self._stage("authentication"):
+            auth_result = await self.auth_service.authenticate_cultural_context(
+                trade_query.query_text, cultural_context
+            )
         
         # Process native language understanding for trade
-        native_understanding = await self.language_service.process_native_language(
-            trade_query.query_text, cultural_context
-        )
+        with self._stage("native_language"):
+            native_understanding = await self.language_service.process_native_language(
+                trade_query.query_text, cultural_context
+            )
         
         # Generate intelligent response for trade
-        intelligent_response = await self.intelligence_service.generate_intelligent_response(
-            trade_query.query_text, cultural_context, auth_result, native_understanding
-        )
+        with self._stage("intelligence"):
+            intelligent_response = await self.intelligence_service.generate_intelligent_response(
+                trade_query.query_text, cultural_context, auth_result, native_understanding
+            )
         
         # Create comprehensive GTCX trade response
-        trade_response = GTCTradeResponse(
+        with self._stage("trade_response"):
+            trade_response = self._build_trade_response(
+                trade_query, cultural_context, auth_result, native_understanding, intelligent_response
+            )
+        
+        # Update performance metrics
+        processing_time = time.time() - start_time
+        self._update_metrics(processing_time, auth_result.confidence_score)
+        
+        return trade_response
+    
+    def _build_trade_response(
+        self,
+        trade_query: GTCTradeQuery,
+        cultural_context: CulturalContext,
+        auth_result: CulturalAuthentication,
+        native_understanding: NativeUnderstanding,
+        intelligent_response: IntelligentResponse
+    ) -> GTCTradeResponse:
+        """Assemble the GTCX trade response from the pipeline results."""
+        return GTCTradeResponse(
             trade_recommendations=self._generate_trade_recommendations(cultural_context, auth_result),
             cultural_adaptations=self._generate_cultural_adaptations(cultural_context, native_understanding),
             compliance_strategy=self._generate_compliance_strategy(cultural_context, auth_result),
@@ -143,12 +358,6 @@ class ANISACore:
             native_understanding=native_understanding,
             intelligent_response=intelligent_response
         )
-        
-        # Update performance metrics
-        processing_time = time.time() - start_time
-        self._update_metrics(processing_time, auth_result.confidence_score)
-        
-        return trade_response
     
     async def detect_cultural_context(
         self, 
@@ -170,8 +379,11 @@ class ANISACore:
             CulturalContext with GTCX integration
         """
         # Detect region and variant
-        detected_region = self.auth_service.detect_cultural_region(query)
-        detected_variant = self.auth_service.detect_cultural_variant(query)
+        if self.detection_batcher is not None and self.detection_batcher.running:
+            detected_region, detected_variant = await self.detection_batcher.submit(query)
+        else:
+            detected_region = self.auth_service.detect_cultural_region(query)
+            detected_variant = self.auth_service.detect_cultural_variant(query)
         
         # Determine GTCX components if not provided
         if gtcx_components is None:
@@ -193,6 +405,35 @@ class ANISACore:
         
         return cultural_context
     
+    def _get_insight_index(self) -> InsightIndex:
+        """Saved insight index if configured, else one built from the language service insights."""
+        if self.insight_index is None:
+            directory = self.config.insight_index_dir
+            if directory and (Path(directory) / "meta.json").exists():
+                self.insight_index = InsightIndex.load(directory)
+                logger.info(f"Loaded insight index with {len(self.insight_index)} entries from {directory}")
+            else:
+                if directory:
+                    logger.warning(f"No insight index at {directory}; using built-in insights")
+                self.insight_index = InsightIndex.build(iter_language_insights(self.language_service))
+            self.insight_index.n_probe = self.config.insight_n_probe
+        return self.insight_index
+    
+    async def get_cultural_insights(self, topic: str, limit: int = 5) -> List[str]:
+        """
+        Retrieve cultural insights related to a topic.
+        
+        Args:
+            topic: Topic or free-text question
+            limit: Maximum number of insights
+            
+        Returns:
+            Insights ordered by similarity to the topic
+        """
+        hits = self._get_insight_index().search(topic, k=limit * 2, min_score=self.config.insight_min_score)
+        # Knowledge entries and built-in insights can repeat each other
+        return list(dict.fromkeys(hit.text for hit in hits))[:limit]
+    
     def _determine_relevant_gtcx_components(
         self, 
         region: CulturalRegion, 
@@ -475,7 +716,16 @@ class ANISACore:
     
     def get_performance_metrics(self) -> Dict[str, Any]:
         """Get current performance metrics."""
-        return self.performance_metrics.copy()
+        metrics = self.performance_metrics.copy()
+        if self.auth_service.cascade is not None:
+            metrics['detection_tiers'] = self.auth_service.cascade.stats()
+        if self.detection_batcher is not None:
+            metrics['detection_batching'] = self.detection_batcher.snapshot()
+        if self.model_registry is not None:
+            metrics['model_version'] = self.model_version
+        if self.allocation_tracker is not None:
+            metrics['allocations'] = self.allocation_tracker.summary()
+        return metrics
     
     def reset_metrics(self):
         """Reset performance metrics."""
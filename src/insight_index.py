@@ -0,0 +1,374 @@
+"""
+ANISA Cultural Insight Index
+Embedding retrieval over cultural knowledge and native-language insights.
+
+Texts are embedded with signed feature hashing (words, word bigrams and
+character trigrams) into L2-normalised float32 vectors. Vectors are
+partitioned with spherical k-means (IVF) and stored list by list in one
+contiguous ``.npy`` matrix. A query scores the centroids, then only the
+``n_probe`` closest lists; the matrix is memory-mapped, so a lookup reads
+a few contiguous slices, and all processes on a host share one copy.
+"""
+
+import argparse
+import json
+import logging
+import mmap
+import os
+import re
+import shutil
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT = 1
+
+_WORD_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+# Feature weights; character trigrams give partial credit for inflections
+WORD_WEIGHT = 1.0
+BIGRAM_WEIGHT = 0.7
+TRIGRAM_WEIGHT = 0.25
+
+
+class HashedEmbedder:
+    """
+    Signed feature-hashing embeddings.
+
+    Each feature hashes (crc32) to a dimension and a sign, so unrelated
+    features cancel out on average instead of accumulating. The mapping is
+    fixed, so vectors built offline match query vectors at serving time.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def _features(self, text: str) -> Tuple[List[str], np.ndarray]:
+        words = _WORD_RE.findall((text or "").lower())
+        bigrams = [f"{a} {b}" for a, b in zip(words, words[1:])]
+        grams = []
+        for word in words:
+            padded = f" {word} "
+            grams.extend(f"#{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        features = words + bigrams + grams
+        weights = np.concatenate([
+            np.full(len(words), WORD_WEIGHT, dtype=np.float32),
+            np.full(len(bigrams), BIGRAM_WEIGHT, dtype=np.float32),
+            np.full(len(grams), TRIGRAM_WEIGHT, dtype=np.float32),
+        ])
+        return features, weights
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Unit-length vectors, shape ``(len(texts), dim)``; empty texts give zeros."""
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            features, weights = self._features(text)
+            if not features:
+                continue
+            hashes = np.fromiter(
+                (zlib.crc32(f.encode("utf-8")) for f in features), dtype=np.uint32, count=len(features),
+            ).astype(np.int64)
+            signs = np.where((hashes // self.dim) & 1, -1.0, 1.0)
+            vectors[i] = np.bincount(hashes % self.dim, weights=signs * weights, minlength=self.dim)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return np.divide(vectors, norms, out=vectors, where=norms > 0)
+
+
+def spherical_kmeans(
+    vectors: np.ndarray,
+    n_lists: int,
+    n_iter: int = 10,
+    points_per_list: int = 64,
+    seed: int = 0,
+    chunk_size: int = 65_536,
+) -> np.ndarray:
+    """Unit-length centroids from k-means on cosine similarity over a sample."""
+    rng = np.random.default_rng(seed)
+    n = len(vectors)
+    sample_idx = np.sort(rng.choice(n, size=min(n, n_lists * points_per_list), replace=False))
+    sample = np.asarray(vectors[sample_idx], dtype=np.float32)
+    centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+    for _ in range(n_iter):
+        assign = assign_lists(sample, centroids, chunk_size)
+        # Per-list sums from one sort instead of a scatter-add
+        order = np.argsort(assign, kind="stable")
+        lists, starts = np.unique(assign[order], return_index=True)
+        sums = sample[rng.choice(len(sample), size=n_lists)]  # re-seeds lists left empty
+        sums[lists] = np.add.reduceat(sample[order], starts, axis=0)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = sums / np.maximum(norms, 1e-12)
+    return centroids.astype(np.float32)
+
+
+def assign_lists(vectors: np.ndarray, centroids: np.ndarray, chunk_size: int = 65_536) -> np.ndarray:
+    """Closest centroid for each vector, computed in chunks."""
+    assign = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), chunk_size):
+        block = np.asarray(vectors[start:start + chunk_size])
+        assign[start:start + len(block)] = (block @ centroids.T).argmax(axis=1)
+    return assign
+
+
+@dataclass
+class InsightHit:
+    """A retrieved insight and its cosine similarity."""
+    text: str
+    source: str
+    variant: str
+    region: str
+    score: float
+
+
+class InsightIndex:
+    """
+    IVF index over embedded insight entries.
+
+    Args:
+        embedder: Embedder used for entries and queries
+        centroids: ``(n_lists, dim)`` list centroids
+        offsets: ``n_lists + 1`` row offsets of each list in ``vectors``
+        vectors: ``(n, dim)`` vectors ordered by list
+        ids: Entry number of each row in ``vectors``
+        entries: Entry number to entry dict (a list or a lazy reader)
+        n_probe: Lists scanned per query
+    """
+
+    def __init__(
+        self,
+        embedder: HashedEmbedder,
+        centroids: np.ndarray,
+        offsets: np.ndarray,
+        vectors: np.ndarray,
+        ids: np.ndarray,
+        entries: Sequence[Dict[str, Any]],
+        n_probe: int = 8,
+    ):
+        self.embedder = embedder
+        self.centroids = centroids
+        self.offsets = offsets
+        self.vectors = vectors
+        self.ids = ids
+        self.entries = entries
+        self.n_probe = n_probe
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(
+        cls,
+        entries: Iterable[Dict[str, Any]],
+        dim: int = 512,
+        n_lists: Optional[int] = None,
+        n_probe: int = 8,
+        seed: int = 0,
+    ) -> "InsightIndex":
+        """
+        Build an in-memory index.
+
+        Args:
+            entries: Dicts with ``text`` (embedded) and optional ``insight``
+                (returned; defaults to ``text``), ``source``, ``variant``, ``region``
+            dim: Embedding dimensions
+            n_lists: IVF lists; defaults to about sqrt(n)
+            n_probe: Lists scanned per query
+            seed: k-means seed
+
+        Returns:
+            The index
+        """
+        embedder = HashedEmbedder(dim)
+        entries = [e for e in entries if e.get("text")]
+        vectors = embedder.embed([e["text"] for e in entries])
+        n = len(vectors)
+        n_lists = max(1, min(n, n_lists or int(np.sqrt(n)) or 1))
+        if n:
+            centroids = spherical_kmeans(vectors, n_lists, seed=seed)
+            assign = assign_lists(vectors, centroids)
+        else:
+            centroids = np.zeros((1, dim), dtype=np.float32)
+            assign = np.zeros(0, dtype=np.int32)
+        # Group rows by list so each list is one contiguous slice
+        ids = np.argsort(assign, kind="stable").astype(np.int64)
+        offsets = np.zeros(len(centroids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=len(centroids)), out=offsets[1:])
+        return cls(embedder, centroids, offsets, np.ascontiguousarray(vectors[ids]), ids, entries, n_probe)
+
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        n_probe: Optional[int] = None,
+        min_score: float = 0.0,
+    ) -> List[InsightHit]:
+        """
+        Approximate nearest entries to a query.
+
+        Args:
+            query: Topic or free text
+            k: Maximum number of hits
+            n_probe: Lists scanned (defaults to the index setting)
+            min_score: Minimum cosine similarity
+
+        Returns:
+            Hits ordered by descending similarity
+        """
+        if not len(self):
+            return []
+        q = self.embedder.embed([query])[0]
+        if not q.any():
+            return []
+        n_probe = min(n_probe or self.n_probe, len(self.centroids))
+        centroid_scores = self.centroids @ q
+        if n_probe < len(self.centroids):
+            lists = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+        else:
+            lists = np.arange(len(self.centroids))
+
+        # Each list is a contiguous slice of the (memory-mapped) matrix
+        rows, scores = [], []
+        for l in lists:
+            start, end = int(self.offsets[l]), int(self.offsets[l + 1])
+            if start < end:
+                rows.append(np.arange(start, end))
+                scores.append(self.vectors[start:end] @ q)
+        if not rows:
+            return []
+        rows, scores = np.concatenate(rows), np.concatenate(scores)
+        keep = np.flatnonzero(scores >= min_score)
+        if keep.size > k:
+            keep = keep[np.argpartition(-scores[keep], k - 1)[:k]]
+        keep = keep[np.argsort(-scores[keep], kind="stable")]
+
+        hits = []
+        for pos in keep:
+            entry = self.entries[int(self.ids[rows[pos]])]
+            hits.append(InsightHit(
+                text=entry.get("insight") or entry["text"],
+                source=entry.get("source", ""),
+                variant=entry.get("variant", ""),
+                region=entry.get("region", ""),
+                score=round(float(scores[pos]), 4),
+            ))
+        return hits
+
+    def save(self, path: str) -> Path:
+        """Write the index directory, replacing any previous index there."""
+        directory = Path(path)
+        staging = directory.with_name(f".{directory.name}.staging")
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        np.save(staging / "centroids.npy", self.centroids)
+        np.save(staging / "offsets.npy", self.offsets)
+        np.save(staging / "vectors.npy", np.ascontiguousarray(self.vectors, dtype=np.float32))
+        np.save(staging / "ids.npy", self.ids)
+        line_offsets = [0]
+        with open(staging / "entries.jsonl", "wb") as f:
+            for i in range(len(self.entries)):
+                line_offsets.append(line_offsets[-1] + f.write(json.dumps(self.entries[i]).encode("utf-8") + b"\n"))
+        np.save(staging / "entry_offsets.npy", np.asarray(line_offsets, dtype=np.int64))
+        with open(staging / "meta.json", "w", encoding="utf-8") as f:
+            json.dump({"format": INDEX_FORMAT, "dim": self.embedder.dim, "n_probe": self.n_probe, "count": len(self)}, f)
+
+        previous = directory.with_name(f".{directory.name}.previous")
+        shutil.rmtree(previous, ignore_errors=True)
+        if directory.exists():
+            os.replace(directory, previous)
+        os.replace(staging, directory)
+        shutil.rmtree(previous, ignore_errors=True)
+        return directory
+
+    @classmethod
+    def load(cls, path: str, mmap_vectors: bool = True) -> "InsightIndex":
+        """Load a saved index; vectors and entries are memory-mapped."""
+        directory = Path(path)
+        with open(directory / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != INDEX_FORMAT:
+            raise ValueError(f"Unsupported insight index format: {meta.get('format')}")
+        return cls(
+            embedder=HashedEmbedder(meta["dim"]),
+            centroids=np.load(directory / "centroids.npy"),
+            offsets=np.load(directory / "offsets.npy"),
+            vectors=np.load(directory / "vectors.npy", mmap_mode="r" if mmap_vectors else None),
+            ids=np.load(directory / "ids.npy", mmap_mode="r"),
+            entries=EntryReader(directory / "entries.jsonl", np.load(directory / "entry_offsets.npy", mmap_mode="r")),
+            n_probe=meta.get("n_probe", 8),
+        )
+
+
+class EntryReader:
+    """Random access to JSONL entries by line number through mmap."""
+
+    def __init__(self, path: Path, offsets: np.ndarray):
+        self.offsets = offsets
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        return json.loads(self._data[int(self.offsets[i]):int(self.offsets[i + 1])])
+
+
+def iter_language_insights(language_service) -> Iterator[Dict[str, Any]]:
+    """Insight entries from ``NativeLanguageService.cultural_insights``."""
+    for variant, insights in language_service.cultural_insights.items():
+        for insight in insights:
+            yield {"text": insight, "source": "native_language", "variant": variant.value, "region": ""}
+
+
+def iter_knowledge_insights(db, chunk_size: int = 1000) -> Iterator[Dict[str, Any]]:
+    """Insight entries from ``CulturalKnowledge`` rows, streamed from the database."""
+    from database import CulturalKnowledge
+
+    rows = db.query(CulturalKnowledge).order_by(CulturalKnowledge.id).yield_per(chunk_size)
+    for row in rows:
+        parts = [row.term, row.definition, row.cultural_significance, row.trade_relevance]
+        yield {
+            "text": " ".join(p for p in parts if p),
+            "insight": f"{row.term}: {row.definition}" if row.definition else row.term,
+            "source": "knowledge",
+            "variant": row.variant,
+            "region": row.region,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the ANISA cultural insight index")
+    parser.add_argument("--output", default="./data/insight_index", help="Index directory")
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--n-lists", type=int, default=None)
+    parser.add_argument("--no-knowledge", action="store_true", help="Skip CulturalKnowledge rows")
+    args = parser.parse_args()
+
+    from itertools import chain
+
+    from config import ANISAConfig
+    from services import NativeLanguageService
+
+    logging.basicConfig(level=logging.INFO)
+    sources = [iter_language_insights(NativeLanguageService(ANISAConfig()))]
+    db = None
+    if not args.no_knowledge:
+        from database import SessionLocal
+        db = SessionLocal()
+        sources.append(iter_knowledge_insights(db))
+    try:
+        index = InsightIndex.build(chain(*sources), dim=args.dim, n_lists=args.n_lists)
+    finally:
+        if db is not None:
+            db.close()
+    path = index.save(args.output)
+    print(f"Indexed {len(index)} insights in {len(index.centroids)} lists at {path}")
+
+
+if __name__ == "__main__":
+    main()
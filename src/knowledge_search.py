@@ -0,0 +1,363 @@
+"""
+ANISA Knowledge Search
+Fuzzy and prefix search over cultural knowledge terms and definitions.
+
+PostgreSQL deployments rank with pg_trgm similarity backed by GIN indexes
+(see database.py). Embedded deployments use an in-process trigram inverted
+index with the same scoring model.
+"""
+
+import bisect
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import case, func, or_
+from sqlalchemy.orm import Session
+
+from database import CulturalKnowledge
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+# Field weights used for ranking; term matches dominate, definition and
+# trade relevance act as secondary evidence.
+TERM_WEIGHT = 1.0
+DEFINITION_WEIGHT = 0.6
+TRADE_RELEVANCE_WEIGHT = 0.5
+PREFIX_BOOST = 0.5
+
+DEFAULT_MIN_SCORE = 0.3
+
+
+def trigrams(text: str) -> List[str]:
+    """Extract pg_trgm-compatible trigrams from text.
+
+    Each lowercased word is padded with two leading spaces and one trailing
+    space before being split into three-character grams.
+    """
+    grams = set()
+    for word in _WORD_RE.findall((text or "").lower()):
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return list(grams)
+
+
+def knowledge_snapshot(db: Session) -> Tuple[int, Optional[int], Optional[datetime]]:
+    """Row count, highest id and latest validation time of the knowledge table.
+
+    Changes whenever entries are added, deleted or validated; an index built
+    from an earlier snapshot no longer reflects the table.
+    """
+    count, max_id, last_validated = db.query(
+        func.count(CulturalKnowledge.id),
+        func.max(CulturalKnowledge.id),
+        func.max(CulturalKnowledge.validated_at),
+    ).one()
+    return count, max_id, last_validated
+
+
+@dataclass
+class KnowledgeSearchResult:
+    """A ranked knowledge search hit."""
+    id: int
+    term: str
+    definition: Optional[str]
+    trade_relevance: Optional[str]
+    region: str
+    variant: str
+    category: str
+    score: float
+    matched_fields: List[str] = field(default_factory=list)
+
+
+class KnowledgeSearchIndex:
+    """
+    In-process trigram inverted index over cultural knowledge entries.
+
+    Postings are kept as Python lists while entries are added and frozen
+    into numpy arrays on first search; a query only touches the postings of
+    its own trigrams and the matching term-prefix range. Indexes built with
+    ``from_session`` remember the table snapshot they were built from so
+    callers can rebuild them with ``is_stale``.
+    """
+
+    FIELDS = ("term", "definition", "trade_relevance")
+
+    def __init__(self):
+        self._entries: List[Tuple[int, str, Optional[str], Optional[str], str, str, str]] = []
+        self._postings: Dict[str, Dict[str, List[int]]] = {f: {} for f in self.FIELDS}
+        self._gram_counts: Dict[str, List[int]] = {f: [] for f in self.FIELDS}
+        self._prefix_keys: List[Tuple[str, int]] = []
+        self._frozen_postings: Dict[str, Dict[str, np.ndarray]] = {}
+        self._frozen_counts: Dict[str, np.ndarray] = {}
+        self._dirty = True
+        self.snapshot: Optional[Tuple[int, Optional[int], Optional[datetime]]] = None
+        self.built_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(
+        self,
+        entry_id: int,
+        term: str,
+        definition: Optional[str] = None,
+        trade_relevance: Optional[str] = None,
+        region: str = "",
+        variant: str = "",
+        category: str = "",
+    ) -> None:
+        """Add a knowledge entry to the index."""
+        doc = len(self._entries)
+        self._entries.append((entry_id, term, definition, trade_relevance, region, variant, category))
+
+        for field_name, value in zip(self.FIELDS, (term, definition, trade_relevance)):
+            grams = trigrams(value) if value else []
+            postings = self._postings[field_name]
+            for gram in grams:
+                postings.setdefault(gram, []).append(doc)
+            self._gram_counts[field_name].append(len(grams))
+
+        self._prefix_keys.append(((term or "").lower(), doc))
+        self._dirty = True
+
+    def add_many(self, entries: Iterable[CulturalKnowledge]) -> int:
+        """Add knowledge rows (ORM objects or compatible records)."""
+        count = 0
+        for entry in entries:
+            self.add(
+                entry.id,
+                entry.term,
+                entry.definition,
+                entry.trade_relevance,
+                entry.region,
+                entry.variant,
+                entry.category,
+            )
+            count += 1
+        return count
+
+    @classmethod
+    def from_session(cls, db: Session, chunk_size: int = 1000) -> "KnowledgeSearchIndex":
+        """Build an index by streaming every knowledge row from the database."""
+        index = cls()
+        # Taken first, so rows written while streaming make the index stale
+        index.snapshot = knowledge_snapshot(db)
+        rows = db.query(CulturalKnowledge).order_by(CulturalKnowledge.id).yield_per(chunk_size)
+        count = index.add_many(rows)
+        logger.info(f"Knowledge search index built with {count} entries")
+        return index
+
+    def is_stale(self, db: Session, max_age: Optional[float] = None) -> bool:
+        """Whether the knowledge table changed since ``from_session`` built this index.
+
+        ``max_age`` (seconds) also expires the index, catching in-place edits
+        that leave the snapshot unchanged. Indexes filled with ``add`` have
+        no snapshot and are always stale.
+        """
+        if self.snapshot is None:
+            return True
+        if max_age is not None and time.monotonic() - self.built_at >= max_age:
+            return True
+        return knowledge_snapshot(db) != self.snapshot
+
+    def _freeze(self) -> None:
+        """Convert postings to numpy arrays for vectorised scoring."""
+        self._frozen_postings = {
+            field_name: {gram: np.asarray(docs, dtype=np.int32) for gram, docs in postings.items()}
+            for field_name, postings in self._postings.items()
+        }
+        self._frozen_counts = {
+            field_name: np.asarray(counts, dtype=np.float32)
+            for field_name, counts in self._gram_counts.items()
+        }
+        self._prefix_keys.sort()
+        self._dirty = False
+
+    def _shared_counts(self, field_name: str, query_grams: List[str]) -> Optional[np.ndarray]:
+        """Count query trigrams shared with each document for a field."""
+        postings = self._frozen_postings[field_name]
+        hits = [postings[g] for g in query_grams if g in postings]
+        if not hits:
+            return None
+        return np.bincount(np.concatenate(hits), minlength=len(self._entries))
+
+    def _prefix_docs(self, prefix: str) -> List[int]:
+        """Documents whose term starts with the given prefix."""
+        start = bisect.bisect_left(self._prefix_keys, (prefix, -1))
+        docs = []
+        for i in range(start, len(self._prefix_keys)):
+            key, doc = self._prefix_keys[i]
+            if not key.startswith(prefix):
+                break
+            docs.append(doc)
+        return docs
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        min_score: float = DEFAULT_MIN_SCORE,
+    ) -> List[KnowledgeSearchResult]:
+        """
+        Search entries by trigram similarity and term prefix.
+
+        Args:
+            query: Free-text query (e.g. "wasta", "traditional auth")
+            limit: Maximum number of results
+            min_score: Minimum ranking score for a hit
+
+        Returns:
+            Results ordered by descending score
+        """
+        if not self._entries or not query.strip():
+            return []
+        if self._dirty:
+            self._freeze()
+
+        query_grams = trigrams(query)
+        n_query = float(max(1, len(query_grams)))
+
+        # Dense per-field counts via bincount; scoring then runs only on the
+        # documents that share a trigram or match the term prefix.
+        shared = {name: self._shared_counts(name, query_grams) for name in self.FIELDS}
+        prefix_docs = np.asarray(self._prefix_docs(query.strip().lower()), dtype=np.int64)
+        present = [counts for counts in shared.values() if counts is not None]
+        if present:
+            candidates = np.flatnonzero(np.add.reduce(present))
+            if prefix_docs.size:
+                candidates = np.union1d(candidates, prefix_docs)
+        else:
+            candidates = np.unique(prefix_docs)
+        if candidates.size == 0:
+            return []
+
+        def field_shared(name: str) -> np.ndarray:
+            counts = shared[name]
+            if counts is None:
+                return np.zeros(candidates.size, dtype=np.float32)
+            return counts[candidates].astype(np.float32)
+
+        # Term: symmetric similarity, as pg_trgm similarity()
+        term_shared = field_shared("term")
+        term_union = n_query + self._frozen_counts["term"][candidates] - term_shared
+        term_score = np.divide(term_shared, term_union, out=np.zeros_like(term_shared), where=term_union > 0)
+
+        # Long text fields: fraction of the query found, as word_similarity()
+        definition_score = field_shared("definition") / n_query
+        trade_score = field_shared("trade_relevance") / n_query
+
+        scores = np.maximum.reduce([
+            term_score * TERM_WEIGHT,
+            definition_score * DEFINITION_WEIGHT,
+            trade_score * TRADE_RELEVANCE_WEIGHT,
+        ])
+        if prefix_docs.size:
+            scores[np.searchsorted(candidates, prefix_docs)] += PREFIX_BOOST
+
+        keep = np.flatnonzero(scores >= min_score)
+        if keep.size == 0:
+            return []
+        if keep.size > limit:
+            keep = keep[np.argpartition(-scores[keep], limit - 1)[:limit]]
+        keep = keep[np.argsort(-scores[keep], kind="stable")]
+
+        results = []
+        for pos in keep:
+            entry_id, term, definition, trade_relevance, region, variant, category = self._entries[candidates[pos]]
+            matched = [
+                name for name, value in (
+                    ("term", term_score[pos]),
+                    ("definition", definition_score[pos]),
+                    ("trade_relevance", trade_score[pos]),
+                ) if value > 0
+            ]
+            results.append(KnowledgeSearchResult(
+                id=entry_id,
+                term=term,
+                definition=definition,
+                trade_relevance=trade_relevance,
+                region=region,
+                variant=variant,
+                category=category,
+                score=round(float(scores[pos]), 4),
+                matched_fields=matched,
+            ))
+        return results
+
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards in user input."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_knowledge_postgres(
+    db: Session,
+    query: str,
+    limit: int = 10,
+    min_score: float = DEFAULT_MIN_SCORE,
+) -> List[KnowledgeSearchResult]:
+    """Search knowledge entries using pg_trgm operators and GIN indexes."""
+    prefix = f"{_escape_like(query.strip())}%"
+
+    term_score = func.similarity(CulturalKnowledge.term, query) * TERM_WEIGHT
+    definition_score = func.word_similarity(query, func.coalesce(CulturalKnowledge.definition, "")) * DEFINITION_WEIGHT
+    trade_score = func.word_similarity(query, func.coalesce(CulturalKnowledge.trade_relevance, "")) * TRADE_RELEVANCE_WEIGHT
+    prefix_bonus = case((CulturalKnowledge.term.ilike(prefix), PREFIX_BOOST), else_=0.0)
+    score = (func.greatest(term_score, definition_score, trade_score) + prefix_bonus).label("score")
+
+    rows = (
+        db.query(CulturalKnowledge, score)
+        .filter(or_(
+            CulturalKnowledge.term.op("%")(query),
+            CulturalKnowledge.term.ilike(prefix),
+            CulturalKnowledge.definition.op("%>")(query),
+            CulturalKnowledge.trade_relevance.op("%>")(query),
+        ))
+        .order_by(score.desc())
+        .limit(limit)
+        .all()
+    )
+
+    return [
+        KnowledgeSearchResult(
+            id=entry.id,
+            term=entry.term,
+            definition=entry.definition,
+            trade_relevance=entry.trade_relevance,
+            region=entry.region,
+            variant=entry.variant,
+            category=entry.category,
+            score=round(float(entry_score), 4),
+        )
+        for entry, entry_score in rows
+        if entry_score >= min_score
+    ]
+
+
+def search_knowledge(
+    db: Session,
+    query: str,
+    limit: int = 10,
+    index: Optional[KnowledgeSearchIndex] = None,
+    min_score: float = DEFAULT_MIN_SCORE,
+) -> List[KnowledgeSearchResult]:
+    """
+    Search cultural knowledge with the best backend for the bound database.
+
+    PostgreSQL uses pg_trgm; any other backend uses the supplied in-process
+    index (built from the session when not provided).
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return search_knowledge_postgres(db, query, limit, min_score)
+
+    if index is None:
+        index = KnowledgeSearchIndex.from_session(db)
+    return index.search(query, limit, min_score)
@@ -0,0 +1,203 @@
+"""
+ANISA Lot Verification Cache
+Per-lot cultural verification timelines and aggregate weights for PANX.
+
+Timelines are loaded from the database in one indexed query and kept in a
+process-local LRU of recently active lots. Writes update cached lots
+incrementally so hot lots are answered without touching the database.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from database import CulturalVerification
+
+
+@dataclass
+class LotVerificationEntry:
+    """A single cultural verification in a lot timeline"""
+    id: int
+    panx_event_id: Optional[str]
+    validators: List[str]
+    cultural_weights: Dict[str, float]
+    consensus_adjustment: float
+    verification_status: str
+    created_at: Optional[datetime]
+    verified_at: Optional[datetime] = None
+
+    @classmethod
+    def from_row(cls, row: CulturalVerification) -> "LotVerificationEntry":
+        """Build an entry from a database row."""
+        return cls(
+            id=row.id,
+            panx_event_id=row.panx_event_id,
+            validators=list(row.validators or []),
+            cultural_weights=dict(row.cultural_weights or {}),
+            consensus_adjustment=row.consensus_adjustment if row.consensus_adjustment is not None else 1.0,
+            verification_status=row.verification_status or "pending",
+            created_at=row.created_at,
+            verified_at=row.verified_at,
+        )
+
+
+@dataclass
+class LotTimeline:
+    """Ordered verification history of a lot with running aggregates"""
+    lot_id: str
+    entries: List[LotVerificationEntry] = field(default_factory=list)
+    weight_sums: Dict[str, float] = field(default_factory=dict)
+    weight_counts: Dict[str, int] = field(default_factory=dict)
+    adjustment_sum: float = 0.0
+    status_counts: Dict[str, int] = field(default_factory=dict)
+    loaded_at: float = field(default_factory=time.monotonic)
+
+    @classmethod
+    def from_entries(cls, lot_id: str, entries: Iterable[LotVerificationEntry]) -> "LotTimeline":
+        """Build a timeline from entries ordered by creation time."""
+        timeline = cls(lot_id=lot_id)
+        for entry in entries:
+            timeline.apply(entry)
+        return timeline
+
+    def apply(self, entry: LotVerificationEntry) -> None:
+        """Fold a new verification into the timeline and aggregates."""
+        self.entries.append(entry)
+        for validator, weight in entry.cultural_weights.items():
+            self.weight_sums[validator] = self.weight_sums.get(validator, 0.0) + weight
+            self.weight_counts[validator] = self.weight_counts.get(validator, 0) + 1
+        self.adjustment_sum += entry.consensus_adjustment
+        self.status_counts[entry.verification_status] = self.status_counts.get(entry.verification_status, 0) + 1
+
+    @property
+    def verification_count(self) -> int:
+        return len(self.entries)
+
+    def aggregate_weights(self) -> Dict[str, float]:
+        """Mean cultural weight per validator across the lot history."""
+        return {
+            validator: total / self.weight_counts[validator]
+            for validator, total in self.weight_sums.items()
+        }
+
+    def mean_consensus_adjustment(self) -> float:
+        """Mean consensus adjustment across the lot history."""
+        if not self.entries:
+            return 1.0
+        return self.adjustment_sum / len(self.entries)
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate view used by the API."""
+        return {
+            "lot_id": self.lot_id,
+            "verification_count": self.verification_count,
+            "aggregate_weights": self.aggregate_weights(),
+            "mean_consensus_adjustment": self.mean_consensus_adjustment(),
+            "status_counts": dict(self.status_counts),
+            "first_verified_at": self.entries[0].created_at if self.entries else None,
+            "last_verified_at": self.entries[-1].created_at if self.entries else None,
+        }
+
+
+def load_lot_timeline(db: Session, lot_id: str) -> LotTimeline:
+    """Load a lot's full verification timeline (served by idx_lot_created)."""
+    rows = (
+        db.query(CulturalVerification)
+        .filter(CulturalVerification.lot_id == lot_id)
+        .order_by(CulturalVerification.created_at, CulturalVerification.id)
+        .all()
+    )
+    return LotTimeline.from_entries(lot_id, (LotVerificationEntry.from_row(r) for r in rows))
+
+
+class LotVerificationCache:
+    """
+    Thread-safe LRU of recently active lot timelines.
+
+    The cache is per process: with several uvicorn workers a lot written
+    through one worker is refreshed in the others once ``ttl_seconds``
+    expires. Lots whose history grows past ``max_entries_per_lot`` are
+    evicted and served from the database.
+    """
+
+    def __init__(self, max_lots: int = 1024, ttl_seconds: float = 30.0, max_entries_per_lot: int = 1000):
+        self.max_lots = max_lots
+        self.ttl_seconds = ttl_seconds
+        self.max_entries_per_lot = max_entries_per_lot
+        self._lots: "OrderedDict[str, LotTimeline]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._lots)
+
+    def _expired(self, timeline: LotTimeline) -> bool:
+        return self.ttl_seconds > 0 and time.monotonic() - timeline.loaded_at > self.ttl_seconds
+
+    def get(self, lot_id: str) -> Optional[LotTimeline]:
+        """Return a cached timeline and mark the lot as recently used."""
+        with self._lock:
+            timeline = self._lots.get(lot_id)
+            if timeline is None or self._expired(timeline):
+                if timeline is not None:
+                    del self._lots[lot_id]
+                self.misses += 1
+                return None
+            self._lots.move_to_end(lot_id)
+            self.hits += 1
+            return timeline
+
+    def put(self, timeline: LotTimeline) -> None:
+        """Cache a freshly loaded timeline, evicting the least recently used lot."""
+        if timeline.verification_count > self.max_entries_per_lot:
+            return
+        with self._lock:
+            self._lots[timeline.lot_id] = timeline
+            self._lots.move_to_end(timeline.lot_id)
+            while len(self._lots) > self.max_lots:
+                self._lots.popitem(last=False)
+
+    def record(self, lot_id: str, entry: LotVerificationEntry) -> None:
+        """Apply a new verification to a cached lot; uncached lots load on next read."""
+        with self._lock:
+            timeline = self._lots.get(lot_id)
+            if timeline is None:
+                return
+            timeline.apply(entry)
+            if timeline.verification_count > self.max_entries_per_lot:
+                del self._lots[lot_id]
+            else:
+                self._lots.move_to_end(lot_id)
+
+    def get_or_load(self, db: Session, lot_id: str) -> LotTimeline:
+        """Return the cached timeline or load it with a single query."""
+        timeline = self.get(lot_id)
+        if timeline is None:
+            timeline = load_lot_timeline(db, lot_id)
+            self.put(timeline)
+        return timeline
+
+    def invalidate(self, lot_id: Optional[str] = None) -> None:
+        """Drop one lot, or every lot when no id is given."""
+        with self._lock:
+            if lot_id is None:
+                self._lots.clear()
+            else:
+                self._lots.pop(lot_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache occupancy and hit ratio."""
+        lookups = self.hits + self.misses
+        return {
+            "lots": len(self._lots),
+            "max_lots": self.max_lots,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+        }
@@ -0,0 +1,212 @@
+"""
+ANISA Model Registry
+Versioned model artifacts on local disk with an atomic JSON manifest.
+
+Layout::
+
+    <root>/manifest.json
+    <root>/<model name>/<version>/...   (artifact files, e.g. .npy + meta.json)
+
+Artifacts are immutable once registered. Two kinds are loadable: ``linear``
+detectors load their arrays memory-mapped, so every worker process on a
+host shares one copy of the weights through the page cache; ``onnx``
+export directories (see ``training.automl.onnx_export``) load the int8
+graph if present into an ONNX Runtime session per process.
+"""
+
+import fcntl
+import json
+import logging
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+DEFAULT_MODEL_NAME = "cultural-detector"
+
+# Representative texts run through a freshly loaded model before it is
+# swapped in, so page faults and first-call overheads are not paid by requests.
+WARMUP_TEXTS = [
+    "We need to consult with the community before making any decisions about mining operations.",
+    "Let's build relationships first before discussing business terms.",
+    "We can find a creative solution with limited resources.",
+    "Family ties and traditional authority matter in this negotiation.",
+    "Regulatory compliance and certification are required before export.",
+    "We should reach group consensus on sustainability before proceeding.",
+]
+
+
+def _load_linear(path: str):
+    from services.detection import LinearCulturalDetector
+    return LinearCulturalDetector.load(path, mmap=True)
+
+
+def _load_onnx(path: str):
+    from training.automl.onnx_export import ONNXCulturalDetector
+    return ONNXCulturalDetector.load(path)
+
+
+LOADERS: Dict[str, Callable[[str], Any]] = {"linear": _load_linear, "onnx": _load_onnx}
+
+
+def register_loader(kind: str, loader: Callable[[str], Any]) -> None:
+    """Register a loader for another artifact kind."""
+    LOADERS[kind] = loader
+
+
+class ModelRegistry:
+    """
+    Local registry of versioned model artifacts.
+
+    The manifest is rewritten atomically under an exclusive file lock, so
+    several processes can register and activate versions concurrently;
+    readers re-read it only when its modification time changes.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.root / MANIFEST_NAME
+        self._manifest: Dict[str, Any] = {"models": {}}
+        self._manifest_mtime: Optional[float] = None
+
+    @contextmanager
+    def _locked(self):
+        with open(self.root / ".manifest.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def manifest(self) -> Dict[str, Any]:
+        """Current manifest, re-read from disk only if it changed."""
+        try:
+            mtime = self.manifest_path.stat().st_mtime
+        except FileNotFoundError:
+            return {"models": {}}
+        if mtime != self._manifest_mtime:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                self._manifest = json.load(f)
+            self._manifest_mtime = mtime
+        return self._manifest
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        tmp_path = self.manifest_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    def _read_for_update(self) -> Dict[str, Any]:
+        self._manifest_mtime = None
+        return json.loads(json.dumps(self.manifest()))
+
+    def versions(self, name: str = DEFAULT_MODEL_NAME) -> List[str]:
+        """Registered versions of a model, oldest first."""
+        entry = self.manifest()["models"].get(name, {})
+        return sorted(entry.get("versions", {}), key=lambda v: entry["versions"][v]["created_at"])
+
+    def active_version(self, name: str = DEFAULT_MODEL_NAME) -> Optional[str]:
+        return self.manifest()["models"].get(name, {}).get("active")
+
+    def info(self, name: str = DEFAULT_MODEL_NAME, version: Optional[str] = None) -> Dict[str, Any]:
+        """Manifest entry for a version (the active one by default)."""
+        entry = self.manifest()["models"].get(name)
+        version = version or (entry or {}).get("active")
+        if not entry or version not in entry.get("versions", {}):
+            raise KeyError(f"Model {name} has no version {version}")
+        return {"name": name, "version": version, **entry["versions"][version]}
+
+    def path(self, name: str = DEFAULT_MODEL_NAME, version: Optional[str] = None) -> Path:
+        return self.root / self.info(name, version)["path"]
+
+    def register(
+        self,
+        source_dir: str,
+        name: str = DEFAULT_MODEL_NAME,
+        version: Optional[str] = None,
+        kind: str = "linear",
+        metrics: Optional[Dict[str, Any]] = None,
+        activate: bool = False,
+    ) -> str:
+        """
+        Copy an artifact directory into the registry as a new version.
+
+        Args:
+            source_dir: Directory holding the saved model
+            name: Model name
+            version: Version label; defaults to a UTC timestamp
+            kind: Loader kind (see ``LOADERS``)
+            metrics: Evaluation metrics stored in the manifest
+            activate: Make this the active version
+
+        Returns:
+            The registered version
+        """
+        if kind not in LOADERS:
+            raise ValueError(f"Unknown model kind: {kind}")
+        version = version or datetime.utcnow().strftime("v%Y%m%d%H%M%S")
+        relative = Path(name) / version
+        target = self.root / relative
+        if target.exists():
+            raise ValueError(f"Model {name} version {version} already exists")
+
+        # Copy next to the target and rename, so a version appears complete or not at all
+        staging = target.with_name(f".{version}.staging")
+        shutil.rmtree(staging, ignore_errors=True)
+        shutil.copytree(source_dir, staging)
+        os.replace(staging, target)
+
+        with self._locked():
+            manifest = self._read_for_update()
+            entry = manifest["models"].setdefault(name, {"active": None, "versions": {}})
+            entry["versions"][version] = {
+                "path": str(relative),
+                "kind": kind,
+                "created_at": datetime.utcnow().isoformat(),
+                "metrics": metrics or {},
+            }
+            if activate or entry["active"] is None:
+                entry["active"] = version
+            self._write_manifest(manifest)
+        logger.info(f"Registered model {name} version {version}")
+        return version
+
+    def activate(self, version: str, name: str = DEFAULT_MODEL_NAME) -> None:
+        """Point the manifest's active version at ``version``."""
+        with self._locked():
+            manifest = self._read_for_update()
+            entry = manifest["models"].get(name)
+            if not entry or version not in entry["versions"]:
+                raise KeyError(f"Model {name} has no version {version}")
+            entry["active"] = version
+            self._write_manifest(manifest)
+        logger.info(f"Activated model {name} version {version}")
+
+    def load(self, name: str = DEFAULT_MODEL_NAME, version: Optional[str] = None) -> Any:
+        """Load a version (the active one by default) with its kind's loader."""
+        info = self.info(name, version)
+        return LOADERS[info["kind"]](str(self.root / info["path"]))
+
+
+def load_and_warm(registry: ModelRegistry, name: str, version: Optional[str] = None) -> Dict[str, Any]:
+    """Load a model version and run warm-up inference; safe to call off the event loop."""
+    info = registry.info(name, version)
+    started = time.perf_counter()
+    model = registry.load(name, info["version"])
+    if hasattr(model, "predict_variants"):
+        model.predict_variants(WARMUP_TEXTS)
+        model.predict_regions(WARMUP_TEXTS)
+    return {
+        "model": model,
+        "version": info["version"],
+        "load_ms": (time.perf_counter() - started) * 1000,
+    }
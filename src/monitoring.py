@@ -0,0 +1,167 @@
+"""
+ANISA Prometheus Instrumentation
+Pipeline stage, cache, queue, database pool and event-loop metrics.
+
+Every label set is bounded: stages come from ``PIPELINE_STAGES``, caches and
+queues are registered by name, and HTTP metrics (see ``api_v2``) are
+labelled with route templates rather than raw paths.
+
+In-process statistics (cascade tiers, cache hits, queue depths, pool
+occupancy) are copied into regular metrics by ``RuntimeMetrics`` on a timer
+and before each scrape, instead of being read by a scrape-time collector.
+That keeps them correct when several uvicorn workers share a
+``PROMETHEUS_MULTIPROC_DIR``: counters advance by deltas and are summed over
+all workers, gauges are summed over live workers, and ``render_latest``
+aggregates the per-process files on whichever worker serves the scrape.
+The directory must exist, and be emptied, before the workers start.
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import suppress
+from typing import Any, Callable, ContextManager, Dict, Optional, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram
+from prometheus_client import generate_latest, multiprocess
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+MULTIPROCESS_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+stage_duration = Histogram(
+    'anisa_stage_duration_seconds', 'ANISACore pipeline stage duration', ['stage'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+event_loop_lag = Histogram(
+    'anisa_event_loop_lag_seconds', 'Delay of a scheduled event-loop wake-up past its due time',
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+detection_tier = Counter('anisa_detection_tier', 'Texts handled per detection cascade tier', ['head', 'tier'])
+cache_lookups = Counter('anisa_cache_lookups', 'Cache lookups by result', ['cache', 'result'])
+queue_depth = Gauge('anisa_queue_depth', 'Items waiting in in-process queues', ['queue'], multiprocess_mode='livesum')
+db_pool_connections = Gauge(
+    'anisa_db_pool_connections', 'Database connections by pool state', ['state'], multiprocess_mode='livesum'
+)
+
+
+def stage_timer(stage: str) -> ContextManager[Any]:
+    """Stage hook for ``ANISACore.add_stage_hook`` feeding ``anisa_stage_duration_seconds``."""
+    return stage_duration.labels(stage=stage).time()
+
+
+def instrument_engine(engine) -> None:
+    """Track checked-out connections of an engine's pool (any pool class)."""
+    in_use = db_pool_connections.labels(state="in_use")
+    event.listen(engine, "checkout", lambda *args: in_use.inc())
+    event.listen(engine, "checkin", lambda *args: in_use.dec())
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """Exposition of this process, or of all workers in multiprocess mode."""
+    if MULTIPROCESS_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: Optional[int] = None) -> None:
+    """Drop a stopped worker's live gauges in multiprocess mode."""
+    if MULTIPROCESS_DIR:
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+class RuntimeMetrics:
+    """
+    Periodically copies in-process statistics into Prometheus metrics and
+    probes event-loop lag.
+
+    Args:
+        core: ``ANISACore`` providing the detection cascade and batcher
+        engine: SQLAlchemy engine whose pool size and idle connections are reported
+        caches: Named caches exposing ``stats()`` with ``hits`` and ``misses``
+        queues: Named callables returning a queue's current depth
+        probe_interval: Seconds between event-loop lag probes
+        sample_interval: Seconds between statistics samples
+    """
+
+    def __init__(
+        self,
+        core,
+        engine=None,
+        caches: Optional[Dict[str, Any]] = None,
+        queues: Optional[Dict[str, Callable[[], int]]] = None,
+        probe_interval: float = 0.25,
+        sample_interval: float = 5.0,
+    ):
+        self.core = core
+        self.engine = engine
+        self.caches = caches or {}
+        self.queues = queues or {}
+        self.probe_interval = probe_interval
+        self.sample_interval = sample_interval
+        self._totals: Dict[Tuple[Counter, Tuple[str, ...]], float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _advance(self, counter: Counter, labels: Tuple[str, ...], total: float) -> None:
+        # Sources keep running totals; counters only ever move forward by the difference
+        key = (counter, labels)
+        previous = self._totals.get(key, 0)
+        if total > previous:
+            counter.labels(*labels).inc(total - previous)
+        self._totals[key] = total
+
+    def sample(self) -> None:
+        """Copy current statistics into the metrics."""
+        cascade = self.core.auth_service.cascade
+        if cascade is not None:
+            for head, counts in cascade.stats().items():
+                for tier in cascade.TIERS:
+                    self._advance(detection_tier, (head, tier), counts[tier])
+
+        for name, cache in self.caches.items():
+            stats = cache.stats()
+            self._advance(cache_lookups, (name, "hit"), stats["hits"])
+            self._advance(cache_lookups, (name, "miss"), stats["misses"])
+
+        batcher = self.core.detection_batcher
+        queue_depth.labels(queue="detection_batch").set(batcher.queue_depth if batcher is not None else 0)
+        for name, depth in self.queues.items():
+            queue_depth.labels(queue=name).set(depth())
+
+        pool = self.engine.pool if self.engine is not None else None
+        if isinstance(pool, QueuePool):
+            # Other pools (NullPool on PostgreSQL) keep no idle connections and only report in_use
+            db_pool_connections.labels(state="size").set(pool.size())
+            db_pool_connections.labels(state="idle").set(pool.checkedin())
+            db_pool_connections.labels(state="overflow").set(max(pool.overflow(), 0))
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_sample = loop.time()
+        while True:
+            due = loop.time() + self.probe_interval
+            await asyncio.sleep(self.probe_interval)
+            now = loop.time()
+            event_loop_lag.observe(max(now - due, 0.0))
+            if now >= next_sample:
+                next_sample = now + self.sample_interval
+                try:
+                    self.sample()
+                except Exception as e:
+                    logger.error(f"Runtime metrics sample failed: {e}")
+
+    def start(self) -> None:
+        """Start sampling on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
@@ -0,0 +1,324 @@
+"""
+ANISA Profiling
+Deterministic and sampling profiles of the query pipeline or one API endpoint.
+
+Each run writes, under the output directory:
+
+- ``<name>.pstats``: cProfile statistics (``python -m pstats``, snakeviz)
+- ``<name>.collapsed``: sampled stacks in collapsed format, one
+  ``frame;frame;frame count`` line per stack (flamegraph.pl, speedscope)
+- ``<name>-top.txt``: the top-N hot functions from both profilers
+
+Endpoints are driven in-process through an ASGI test client on the same
+thread and event loop as the profilers, so handler code is captured.
+"""
+
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROFILERS = ("cprofile", "sampling", "both")
+
+
+def _frame_label(code) -> str:
+    path = Path(code.co_filename)
+    location = "/".join(path.parts[-2:]) if len(path.parts) > 1 else code.co_filename
+    return f"{code.co_name} ({location}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler sampling stacks from a background thread.
+
+    Sampling costs the profiled code almost nothing, so timings stay close to
+    production; ``interval_ms`` trades resolution for overhead. Only the
+    thread that starts the profiler (the event loop) is sampled unless
+    ``all_threads`` is set, since idle executor threads would otherwise
+    dominate the profile.
+    """
+
+    def __init__(self, interval_ms: float = 1.0, all_threads: bool = False):
+        self.interval = interval_ms / 1000.0
+        self.all_threads = all_threads
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._target: Optional[int] = None
+
+    def _sample(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.is_set():
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or (not self.all_threads and thread_id != self._target):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, name="anisa-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "SamplingProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def write_collapsed(self, path: str) -> Path:
+        """Write stacks in collapsed (folded) format."""
+        output = Path(path)
+        with open(output, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return output
+
+    def top(self, n: int = 25) -> List[Dict[str, Any]]:
+        """Functions by self samples, with inclusive (total) samples."""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+        all_samples = sum(self.stacks.values()) or 1
+        return [
+            {
+                "function": frame,
+                "self_pct": round(100.0 * count / all_samples, 2),
+                "total_pct": round(100.0 * total[frame] / all_samples, 2),
+            }
+            for frame, count in own.most_common(n)
+        ]
+
+
+class PipelineWorkload:
+    """Queries run through ``ANISACore.process_cultural_query``."""
+
+    def __init__(self, core, texts: Sequence[str]):
+        self.core = core
+        self.texts = texts
+        self.failures = 0
+
+    async def setup(self) -> None:
+        await self.core.start_batching()
+
+    async def run_once(self, i: int) -> None:
+        await self.core.process_cultural_query(self.texts[i % len(self.texts)])
+
+    async def teardown(self) -> None:
+        await self.core.stop_batching()
+
+
+class EndpointWorkload:
+    """
+    Requests to one endpoint of a FastAPI app through an in-process ASGI client.
+
+    Without an explicit ``body``, POST requests send ``{text_key: text}``
+    cycling through ``texts``.
+    """
+
+    def __init__(
+        self,
+        app,
+        path: str,
+        method: str = "POST",
+        body: Optional[Dict[str, Any]] = None,
+        texts: Sequence[str] = (),
+        text_key: str = "text",
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self.app = app
+        self.path = path
+        self.method = method.upper()
+        self.body = body
+        self.texts = texts
+        self.text_key = text_key
+        self.headers = headers or {}
+        self.failures = 0
+        self.statuses: Counter = Counter()
+        self._client = None
+
+    async def setup(self) -> None:
+        import httpx
+
+        await self.app.router.startup()
+        self._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=self.app), base_url="http://anisa")
+
+    async def run_once(self, i: int) -> None:
+        body = self.body
+        if body is None and self.method != "GET" and self.texts:
+            body = {self.text_key: self.texts[i % len(self.texts)]}
+        response = await self._client.request(self.method, self.path, json=body, headers=self.headers)
+        self.statuses[response.status_code] += 1
+        if response.status_code >= 400:
+            self.failures += 1
+
+    async def teardown(self) -> None:
+        await self._client.aclose()
+        await self.app.router.shutdown()
+
+
+def load_app(name: str):
+    """The v1 (``api``) or v2 (``api_v2``) FastAPI app."""
+    if name == "v1":
+        from api import app
+    elif name == "v2":
+        from api_v2 import app
+    else:
+        raise ValueError(f"Unknown app: {name} (expected v1 or v2)")
+    return app
+
+
+@dataclass
+class ProfileConfig:
+    """Settings for a profiling run."""
+    output_dir: str = "profiles"
+    name: str = "pipeline"
+    profiler: str = "both"  # cprofile | sampling | both
+    count: int = 500
+    warmup: int = 20
+    top: int = 25
+    sort: str = "cumulative"  # pstats sort key for the cProfile summary
+    interval_ms: float = 1.0
+    sampling_seconds: float = 2.0  # minimum sampled run time, so fast workloads still collect samples
+    all_threads: bool = False  # also sample executor and background threads
+
+
+@dataclass
+class ProfileResult:
+    """Files written and headline numbers of a profiling run."""
+    files: Dict[str, str] = field(default_factory=dict)
+    seconds: Dict[str, float] = field(default_factory=dict)
+    iterations: Dict[str, int] = field(default_factory=dict)
+    failures: int = 0
+    top_sampled: List[Dict[str, Any]] = field(default_factory=list)
+
+
+async def _drive(workload, start: int, count: int, min_seconds: float = 0.0) -> Tuple[int, float]:
+    """Run at least ``count`` iterations and ``min_seconds``; returns (iterations, seconds)."""
+    started = time.perf_counter()
+    i = start
+    while i < start + count or time.perf_counter() - started < min_seconds:
+        await workload.run_once(i)
+        i += 1
+    return i - start, time.perf_counter() - started
+
+
+async def _profile(workload, config: ProfileConfig, result: "ProfileResult") -> Tuple[Optional[cProfile.Profile], Optional[SamplingProfiler]]:
+    deterministic = sampler = None
+    await workload.setup()
+    try:
+        offset, _ = await _drive(workload, 0, config.warmup)
+        if config.profiler in ("cprofile", "both"):
+            deterministic = cProfile.Profile()
+            deterministic.enable()
+            try:
+                iterations, seconds = await _drive(workload, offset, config.count)
+            finally:
+                deterministic.disable()
+            result.iterations["cprofile"], result.seconds["cprofile"] = iterations, round(seconds, 4)
+            offset += iterations
+        if config.profiler in ("sampling", "both"):
+            sampler = SamplingProfiler(config.interval_ms, config.all_threads)
+            with sampler:
+                iterations, seconds = await _drive(workload, offset, config.count, config.sampling_seconds)
+            result.iterations["sampling"], result.seconds["sampling"] = iterations, round(seconds, 4)
+    finally:
+        await workload.teardown()
+    return deterministic, sampler
+
+
+async def run_profile(workload, config: ProfileConfig) -> ProfileResult:
+    """
+    Profile a workload and write pstats, collapsed stacks and a top-N summary.
+
+    With ``profiler="both"`` the workload runs twice, once per profiler, so
+    cProfile's overhead does not distort the sampled profile. The sampled
+    run lasts at least ``sampling_seconds``.
+
+    Args:
+        workload: ``PipelineWorkload`` or ``EndpointWorkload``
+        config: Profiling settings
+
+    Returns:
+        Paths of the written files and run timings
+    """
+    if config.profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler: {config.profiler} (expected one of {PROFILERS})")
+    output_dir = Path(config.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    result = ProfileResult()
+    deterministic, sampler = await _profile(workload, config, result)
+    result.failures = workload.failures
+
+    summary = io.StringIO()
+    summary.write(f"ANISA profile '{config.name}'\n")
+    if deterministic is not None:
+        pstats_path = output_dir / f"{config.name}.pstats"
+        deterministic.dump_stats(str(pstats_path))
+        result.files["pstats"] = str(pstats_path)
+        summary.write(
+            f"\n== cProfile: {result.iterations['cprofile']} iterations in {result.seconds['cprofile']:.2f}s, "
+            f"top {config.top} by {config.sort} ==\n"
+        )
+        pstats.Stats(deterministic, stream=summary).strip_dirs().sort_stats(config.sort).print_stats(config.top)
+    if sampler is not None:
+        collapsed_path = sampler.write_collapsed(str(output_dir / f"{config.name}.collapsed"))
+        result.files["collapsed"] = str(collapsed_path)
+        result.top_sampled = sampler.top(config.top)
+        summary.write(
+            f"\n== Sampling: {result.iterations['sampling']} iterations in {result.seconds['sampling']:.2f}s, "
+            f"{sampler.samples} samples every {config.interval_ms}ms, top {config.top} by self time ==\n"
+        )
+        summary.write(f"{'self %':>8} {'total %':>8}  function\n")
+        for row in result.top_sampled:
+            summary.write(f"{row['self_pct']:>8.2f} {row['total_pct']:>8.2f}  {row['function']}\n")
+
+    top_path = output_dir / f"{config.name}-top.txt"
+    top_path.write_text(summary.getvalue(), encoding="utf-8")
+    result.files["top"] = str(top_path)
+    return result
+
+
+def parse_body(value: Optional[str]) -> Optional[Dict[str, Any]]:
+    """JSON request body from a string or ``@path``."""
+    if not value:
+        return None
+    if value.startswith("@"):
+        with open(value[1:], "r", encoding="utf-8") as f:
+            return json.load(f)
+    return json.loads(value)
+
+
+def api_key_headers() -> Dict[str, str]:
+    """``X-API-Key`` header from ``ANISA_API_KEY`` when the API requires one."""
+    key = os.getenv("ANISA_API_KEY")
+    return {"X-API-Key": key} if key else {}
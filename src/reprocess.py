@@ -0,0 +1,216 @@
+"""
+ANISA Historical Reprocessing
+Re-scores stored analyses after marker lexicon updates.
+
+Rows of ``anisa_cultural_contexts`` are read in keyset chunks, scored by the
+current engine across a process pool, and bulk-updated with the current
+``LEXICON_VERSION``. Progress is checkpointed after every committed chunk so
+an interrupted run resumes where it stopped.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from database import CulturalContext as DBContext, SessionLocal
+from models import ComplianceLevel, TradeContext
+from services import LEXICON_VERSION
+from worker_pool import init_worker, worker_core
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReprocessConfig:
+    """Settings for a reprocessing run."""
+    chunk_size: int = 1000
+    workers: int = max(1, (os.cpu_count() or 2) - 1)
+    max_in_flight: int = 0  # chunks queued ahead of the writer; 0 = 2 x workers
+    max_rows_per_second: float = 0.0  # 0 = unthrottled
+    checkpoint_path: str = "reprocess_checkpoint.json"
+    lexicon_version: str = LEXICON_VERSION
+    only_stale: bool = True
+    restart: bool = False
+
+
+@dataclass
+class ReprocessCheckpoint:
+    """Resumable progress of a reprocessing run."""
+    lexicon_version: str
+    last_id: int = 0
+    processed: int = 0
+    changed: int = 0
+    started_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    updated_at: Optional[str] = None
+    completed: bool = False
+
+    @classmethod
+    def load(cls, path: str, lexicon_version: str) -> "ReprocessCheckpoint":
+        """Load a checkpoint for this lexicon version, or start fresh."""
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("lexicon_version") == lexicon_version:
+                return cls(**data)
+            logger.info(f"Ignoring checkpoint for lexicon {data.get('lexicon_version')}")
+        return cls(lexicon_version=lexicon_version)
+
+    def save(self, path: str) -> None:
+        """Write the checkpoint atomically."""
+        self.updated_at = datetime.utcnow().isoformat()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f, indent=2)
+        os.replace(tmp_path, path)
+
+
+async def _score_rows(rows: List[Tuple[int, str]]) -> List[Dict[str, Any]]:
+    core = worker_core()
+    results = []
+    for row_id, text in rows:
+        context = await core.detect_cultural_context(text, TradeContext.COMPLIANCE, ComplianceLevel.BASIC)
+        auth = await core.auth_service.authenticate_cultural_context(text, context)
+        results.append({
+            "id": row_id,
+            "region": context.region.value,
+            "variant": context.variant.value,
+            "confidence_score": auth.confidence_score,
+            "cultural_markers": auth.cultural_markers,
+        })
+    return results
+
+
+def score_chunk(rows: List[Tuple[int, str]]) -> List[Dict[str, Any]]:
+    """Score one chunk of (id, text) rows in a worker process."""
+    return asyncio.run(_score_rows(rows))
+
+
+class ReprocessJob:
+    """
+    Keyset-chunked, parallel, checkpointed re-scoring of stored analyses.
+
+    The parent process reads chunks and writes results; workers only score.
+    Chunks are committed strictly in id order so the checkpoint's ``last_id``
+    always marks a fully processed prefix of the table.
+    """
+
+    def __init__(self, config: Optional[ReprocessConfig] = None, session_factory=None):
+        self.config = config or ReprocessConfig()
+        self.session_factory = session_factory or SessionLocal
+        self._stop = False
+
+    def stop(self) -> None:
+        """Ask the run to finish the in-flight chunks and exit."""
+        self._stop = True
+
+    def _next_chunk(self, db: Session, after_id: int) -> List[Tuple[int, str, str, str]]:
+        """Next chunk of (id, text, region, variant) rows after ``after_id``."""
+        stmt = (
+            select(DBContext.id, DBContext.text, DBContext.region, DBContext.variant)
+            .where(DBContext.id > after_id)
+            .order_by(DBContext.id)
+            .limit(self.config.chunk_size)
+        )
+        if self.config.only_stale:
+            stmt = stmt.where(or_(
+                DBContext.lexicon_version.is_(None),
+                DBContext.lexicon_version != self.config.lexicon_version,
+            ))
+        return [tuple(row) for row in db.execute(stmt)]
+
+    def _apply(self, db: Session, results: List[Dict[str, Any]], previous: Dict[int, Tuple[str, str]]) -> int:
+        """Bulk-update one chunk; returns how many rows changed region/variant."""
+        now = datetime.utcnow()
+        for result in results:
+            result["lexicon_version"] = self.config.lexicon_version
+            result["updated_at"] = now
+        db.execute(update(DBContext), results)
+        db.commit()
+        return sum(1 for r in results if previous.get(r["id"]) != (r["region"], r["variant"]))
+
+    def _throttle(self, started: float, processed: int) -> None:
+        rate = self.config.max_rows_per_second
+        if rate > 0:
+            ahead = processed / rate - (time.monotonic() - started)
+            if ahead > 0:
+                time.sleep(ahead)
+
+    def run(self) -> ReprocessCheckpoint:
+        """Run (or resume) reprocessing until no stale rows remain."""
+        config = self.config
+        if config.restart and os.path.exists(config.checkpoint_path):
+            os.remove(config.checkpoint_path)
+        checkpoint = ReprocessCheckpoint.load(config.checkpoint_path, config.lexicon_version)
+        if checkpoint.completed:
+            # A finished run only resumes if interrupted; otherwise start over
+            checkpoint = ReprocessCheckpoint(lexicon_version=config.lexicon_version)
+
+        max_in_flight = config.max_in_flight or 2 * config.workers
+        started = time.monotonic()
+        session_processed = 0
+        read_cursor = checkpoint.last_id
+        exhausted = False
+        in_flight: Deque[Tuple[int, Dict[int, Tuple[str, str]], Future]] = deque()
+
+        logger.info(
+            f"Reprocessing contexts to lexicon {config.lexicon_version} from id > {checkpoint.last_id} "
+            f"with {config.workers} workers"
+        )
+
+        db = self.session_factory()
+        try:
+            with ProcessPoolExecutor(max_workers=config.workers, initializer=init_worker) as pool:
+                while True:
+                    # Keep the pool fed with chunks read ahead of the writer
+                    while not exhausted and not self._stop and len(in_flight) < max_in_flight:
+                        rows = self._next_chunk(db, read_cursor)
+                        if not rows:
+                            exhausted = True
+                            break
+                        read_cursor = rows[-1][0]
+                        previous = {row_id: (region, variant) for row_id, _, region, variant in rows}
+                        texts = [(row_id, text) for row_id, text, _, _ in rows]
+                        in_flight.append((read_cursor, previous, pool.submit(score_chunk, texts)))
+
+                    if not in_flight:
+                        break
+
+                    # Commit strictly in submission order so last_id stays contiguous
+                    last_id, previous, future = in_flight.popleft()
+                    results = future.result()
+                    checkpoint.changed += self._apply(db, results, previous)
+                    checkpoint.processed += len(results)
+                    checkpoint.last_id = last_id
+                    checkpoint.save(config.checkpoint_path)
+
+                    session_processed += len(results)
+                    elapsed = time.monotonic() - started
+                    logger.info(
+                        f"Reprocessed {checkpoint.processed} rows (last id {last_id}, "
+                        f"{session_processed / max(elapsed, 1e-9):.0f} rows/s, {checkpoint.changed} changed)"
+                    )
+                    self._throttle(started, session_processed)
+
+                    if self._stop:
+                        for _, _, pending in in_flight:
+                            pending.cancel()
+                        in_flight.clear()
+                        break
+        finally:
+            db.close()
+
+        checkpoint.completed = exhausted and not self._stop
+        checkpoint.save(config.checkpoint_path)
+        return checkpoint
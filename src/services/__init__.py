@@ -2,12 +2,15 @@
 ANISA Services Package
 """
 
-from .authentication import CulturalAuthenticationService
+from .authentication import CulturalAuthenticationService, LEXICON_VERSION
 from .language import NativeLanguageService
 from .intelligence import IntelligenceService
+from .detection import LinearCulturalDetector
 
 __all__ = [
     "CulturalAuthenticationService",
     "NativeLanguageService", 
-    "IntelligenceService"
+    "IntelligenceService",
+    "LinearCulturalDetector",
+    "LEXICON_VERSION"
 ]
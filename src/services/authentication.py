@@ -3,12 +3,21 @@ Cultural Authentication Service for GTCX Ecosystem
 Provides cultural context authentication and region/trade context detection.
 """
 
+import logging
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from models import (
     CulturalContext, CulturalAuthentication, CulturalRegion, CulturalVariant,
     TradeContext, ComplianceLevel, GTCEcosystemComponent, CulturalComplianceFactor
 )
+from config import ANISAConfig
+
+logger = logging.getLogger(__name__)
+
+
+# Version of the marker and keyword lexicons below. Bump whenever they change
+# so stored analyses can be identified as stale and reprocessed.
+LEXICON_VERSION = "2025.09.1"
 
 
 class CulturalAuthenticationService:
@@ -17,8 +26,16 @@ class CulturalAuthenticationService:
     with enhanced GTCX ecosystem integration.
     """
     
-    def __init__(self):
-        """Initialize the cultural authentication service."""
+    def __init__(self, config: Optional[ANISAConfig] = None, detector=None):
+        """
+        Initialize the cultural authentication service.
+        
+        Args:
+            config: ANISA configuration; selects the detection backend
+            detector: Optional learned detector overriding the configured one
+        """
+        self.config = config or ANISAConfig()
+        
         # Enhanced cultural markers for GTCX trade contexts
         self.cultural_markers = {
             CulturalVariant.UBUNTU: [
@@ -141,6 +158,44 @@ class CulturalAuthenticationService:
                 "social responsibility", "community", "shared values", "cooperation"
             ]
         }
+        
+        self._init_detection(detector)
+    
+    def _init_detection(self, detector) -> None:
+        """Set up the learned detector and, for the cascade backend, the keyword/model cascade."""
+        backend = self.config.detector_backend
+        self.detector = detector
+        self.cascade = None
+        if self.detector is None and backend in ("linear", "cascade"):
+            from services.detection import load_detector
+            self.detector = load_detector(self.config.detector_model_path)
+            if self.detector is None:
+                logger.warning(f"Learned detector unavailable for backend '{backend}'; ambiguous texts use keywords")
+        if backend == "cascade":
+            from services.detection import CascadeDetector
+            self.cascade = CascadeDetector(
+                keyword_scorers={"variant": self.score_cultural_variants, "region": self.score_cultural_regions},
+                defaults={"variant": CulturalVariant.UBUNTU, "region": CulturalRegion.WEST_AFRICA},
+                model=self.detector,
+                margin=self.config.cascade_margin,
+                min_score=self.config.cascade_min_score,
+            )
+    
+    def score_cultural_regions(self, text: str) -> Dict[CulturalRegion, int]:
+        """Keyword match counts per cultural region."""
+        text_lower = text.lower()
+        return {
+            region: sum(1 for keyword in keywords if keyword in text_lower)
+            for region, keywords in self.regional_keywords.items()
+        }
+    
+    def score_cultural_variants(self, text: str) -> Dict[CulturalVariant, int]:
+        """Keyword match counts per cultural variant."""
+        text_lower = text.lower()
+        return {
+            variant: sum(1 for marker in markers if marker in text_lower)
+            for variant, markers in self.cultural_markers.items()
+        }
     
     def detect_cultural_region(self, text: str) -> CulturalRegion:
         """
@@ -152,13 +207,13 @@ class CulturalAuthenticationService:
         Returns:
             Detected cultural region
         """
-        text_lower = text.lower()
+        if self.cascade is not None:
+            return self.cascade.detect("region", [text])[0]
+        if self.detector is not None:
+            return self.detector.predict_regions([text])[0][0]
         
         # Count matches for each region
-        region_scores = {}
-        for region, keywords in self.regional_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-            region_scores[region] = score
+        region_scores = self.score_cultural_regions(text)
         
         # Return region with highest score, default to WEST_AFRICA for GTCX focus
         if max(region_scores.values()) == 0:
@@ -176,13 +231,13 @@ class CulturalAuthenticationService:
         Returns:
             Detected cultural variant
         """
-        text_lower = text.lower()
+        if self.cascade is not None:
+            return self.cascade.detect("variant", [text])[0]
+        if self.detector is not None:
+            return self.detector.predict_variants([text])[0][0]
         
         # Count matches for each variant
-        variant_scores = {}
-        for variant, markers in self.cultural_markers.items():
-            score = sum(1 for marker in markers if marker in text_lower)
-            variant_scores[variant] = score
+        variant_scores = self.score_cultural_variants(text)
         
         # Return variant with highest score, default to UBUNTU for GTCX focus
         if max(variant_scores.values()) == 0:
@@ -190,6 +245,43 @@ class CulturalAuthenticationService:
         
         return max(variant_scores, key=variant_scores.get)
     
+    def detect_region_and_variant_batch(self, texts: List[str]) -> List[Tuple[CulturalRegion, CulturalVariant]]:
+        """
+        Detect region and variant for a batch of texts.
+        
+        Learned backends score the whole batch in one vectorized call;
+        the keyword backend falls back to per-text detection.
+        
+        Args:
+            texts: Texts to analyze
+            
+        Returns:
+            (region, variant) per text, in input order
+        """
+        # One detector reference per batch, so a hot swap never mixes versions
+        detector = self.detector
+        if self.cascade is not None:
+            return list(zip(
+                self.cascade.detect("region", texts, model=detector),
+                self.cascade.detect("variant", texts, model=detector),
+            ))
+        if detector is not None:
+            regions = [label for label, _ in detector.predict_regions(texts)]
+            variants = [label for label, _ in detector.predict_variants(texts)]
+            return list(zip(regions, variants))
+        return [(self.detect_cultural_region(text), self.detect_cultural_variant(text)) for text in texts]
+    
+    def set_detector(self, detector) -> None:
+        """Swap in a new learned detector; in-flight batches keep the one they started with."""
+        self.detector = detector
+        if self.cascade is not None:
+            self.cascade.model = detector
+    
+    @property
+    def model_backed(self) -> bool:
+        """Whether detection runs through a learned model that benefits from batching."""
+        return self.detector is not None
+    
     def detect_trade_context(self, text: str) -> TradeContext:
         """
         Detect trade context from text with GTCX-specific markers.
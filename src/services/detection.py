@@ -0,0 +1,297 @@
+"""
+Learned Cultural Detection for GTCX Ecosystem
+Hashed TF-IDF features and linear classifiers scored with pure numpy.
+
+Models are trained by ``training.automl.linear_training`` and stored as
+plain ``.npy`` arrays plus ``meta.json`` so they load memory-mapped and
+need neither scikit-learn nor scipy at serving time.
+"""
+
+import json
+import logging
+import re
+import threading
+import zlib
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models import CulturalRegion, CulturalVariant
+
+logger = logging.getLogger(__name__)
+
+MODEL_FORMAT = 1
+HEADS = {"variant": CulturalVariant, "region": CulturalRegion}
+
+_TOKEN = re.compile(r"[^\W_]+(?:['-][^\W_]+)*", re.UNICODE)
+
+
+class HashedFeaturizer:
+    """
+    Word n-gram feature hashing with deterministic buckets.
+
+    Tokens are hashed with crc32 (cached, since vocabularies are small and
+    repetitive); n-grams combine token hashes arithmetically in numpy across
+    the whole batch. The same hashing runs at training and inference time,
+    so the model only stores weights for buckets seen during training.
+    """
+
+    MAX_CACHED_TOKENS = 500_000
+
+    def __init__(self, n_features: int = 2 ** 20, ngram_max: int = 2):
+        self.n_features = n_features
+        self.ngram_max = ngram_max
+        self._token_hashes: Dict[str, int] = {}
+
+    def _token_ids(self, text: str) -> List[int]:
+        cache = self._token_hashes
+        tokens = _TOKEN.findall(text.lower())
+        ids = list(map(cache.get, tokens))
+        if None in ids:
+            if len(cache) >= self.MAX_CACHED_TOKENS:
+                cache.clear()
+            for i, token in enumerate(tokens):
+                if ids[i] is None:
+                    ids[i] = cache[token] = zlib.crc32(token.encode("utf-8"))
+        return ids
+
+    def counts(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """CSR ``(indptr, indices, counts)`` of raw bucket counts, indices sorted per row."""
+        hashes: List[int] = []
+        lengths = np.empty(len(texts), dtype=np.int64)
+        for i, text in enumerate(texts):
+            ids = self._token_ids(text or "")
+            hashes.extend(ids)
+            lengths[i] = len(ids)
+        tokens = np.asarray(hashes, dtype=np.uint64)
+        token_rows = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+
+        grams, gram_rows = [tokens], [token_rows]
+        combined = tokens
+        with np.errstate(over="ignore"):
+            for n in range(2, self.ngram_max + 1):
+                # n-gram hash from the (n-1)-gram hash and the next token, within one text
+                combined = combined[:-1] * np.uint64(1_000_003) + tokens[n - 1:]
+                same_row = token_rows[:len(combined)] == token_rows[n - 1:]
+                grams.append(combined[same_row])
+                gram_rows.append(token_rows[:len(combined)][same_row])
+        buckets = (np.concatenate(grams) % np.uint64(self.n_features)).astype(np.int64)
+        rows = np.concatenate(gram_rows)
+
+        # One unique over (row, bucket) keys counts and sorts the whole batch
+        keys, counts = np.unique(rows * self.n_features + buckets, return_counts=True)
+        indptr = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // self.n_features, minlength=len(texts)), out=indptr[1:])
+        return indptr, keys % self.n_features, counts.astype(np.float32)
+
+
+def tfidf_rows(indptr: np.ndarray, columns: np.ndarray, counts: np.ndarray, idf: np.ndarray) -> np.ndarray:
+    """Sublinear TF times IDF, L2-normalised per row (CSR values for ``columns``)."""
+    values = (1.0 + np.log(counts)) * idf[columns]
+    row_ids = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    norms = np.sqrt(np.bincount(row_ids, weights=values * values, minlength=len(indptr) - 1))
+    return (values / np.maximum(norms[row_ids], 1e-12)).astype(np.float32)
+
+
+class LinearCulturalDetector:
+    """
+    Linear variant and region classifiers over hashed TF-IDF features.
+
+    Weights are stored only for the ``vocab`` buckets seen in training;
+    inference maps hashed buckets onto rows with ``searchsorted`` and
+    sums weight rows per text with ``np.add.reduceat``.
+    """
+
+    def __init__(
+        self,
+        featurizer: HashedFeaturizer,
+        vocab: np.ndarray,
+        idf: np.ndarray,
+        coef: Dict[str, np.ndarray],
+        intercept: Dict[str, np.ndarray],
+        labels: Dict[str, List[str]],
+    ):
+        self.featurizer = featurizer
+        self.vocab = vocab
+        self.idf = idf
+        self.coef = coef
+        self.intercept = intercept
+        self.labels = labels
+        self._enums = {
+            head: [HEADS[head](label) for label in head_labels]
+            for head, head_labels in labels.items()
+        }
+
+    def features(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """CSR TF-IDF rows over vocabulary columns; unseen buckets are dropped."""
+        indptr, buckets, counts = self.featurizer.counts(texts)
+        columns = np.searchsorted(self.vocab, buckets)
+        columns = np.minimum(columns, len(self.vocab) - 1)
+        known = self.vocab[columns] == buckets
+        row_ids = np.repeat(np.arange(len(texts)), np.diff(indptr))[known]
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(row_ids, minlength=len(texts)))))
+        columns = columns[known]
+        return indptr, columns, tfidf_rows(indptr, columns, counts[known], self.idf)
+
+    def decision_function(self, head: str, texts: Sequence[str]) -> np.ndarray:
+        """Raw linear scores, shape ``(len(texts), n_classes)``."""
+        indptr, columns, values = self.features(texts)
+        coef = self.coef[head]
+        scores = np.tile(self.intercept[head], (len(texts), 1)).astype(np.float32)
+        if len(columns):
+            contributions = coef[columns] * values[:, None]
+            starts = indptr[:-1]
+            nonempty = starts < indptr[1:]
+            scores[nonempty] += np.add.reduceat(contributions, starts[nonempty], axis=0)
+        return scores
+
+    def predict_proba(self, head: str, texts: Sequence[str]) -> np.ndarray:
+        scores = self.decision_function(head, texts)
+        scores = np.exp(scores - scores.max(axis=1, keepdims=True))
+        return scores / scores.sum(axis=1, keepdims=True)
+
+    def _predict(self, head: str, texts: Sequence[str]) -> List[Tuple[object, float]]:
+        if not texts:
+            return []
+        probs = self.predict_proba(head, texts)
+        best = probs.argmax(axis=1)
+        return [(self._enums[head][k], float(probs[i, k])) for i, k in enumerate(best)]
+
+    def predict_variants(self, texts: Sequence[str]) -> List[Tuple[CulturalVariant, float]]:
+        """Most likely cultural variant and its probability for each text."""
+        return self._predict("variant", texts)
+
+    def predict_regions(self, texts: Sequence[str]) -> List[Tuple[CulturalRegion, float]]:
+        """Most likely cultural region and its probability for each text."""
+        return self._predict("region", texts)
+
+    def save(self, path: str) -> Path:
+        """Write ``meta.json`` and one ``.npy`` file per array."""
+        directory = Path(path)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "vocab.npy", self.vocab)
+        np.save(directory / "idf.npy", self.idf)
+        for head in self.labels:
+            np.save(directory / f"{head}_coef.npy", np.ascontiguousarray(self.coef[head], dtype=np.float32))
+            np.save(directory / f"{head}_intercept.npy", self.intercept[head].astype(np.float32))
+        meta = {
+            "format": MODEL_FORMAT,
+            "n_features": self.featurizer.n_features,
+            "ngram_max": self.featurizer.ngram_max,
+            "labels": self.labels,
+        }
+        with open(directory / "meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        return directory
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "LinearCulturalDetector":
+        """Load a saved model; arrays are memory-mapped unless ``mmap`` is False."""
+        directory = Path(path)
+        with open(directory / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != MODEL_FORMAT:
+            raise ValueError(f"Unsupported detector model format: {meta.get('format')}")
+        mmap_mode = "r" if mmap else None
+        labels = meta["labels"]
+        return cls(
+            featurizer=HashedFeaturizer(meta["n_features"], meta["ngram_max"]),
+            vocab=np.load(directory / "vocab.npy", mmap_mode=mmap_mode),
+            idf=np.load(directory / "idf.npy", mmap_mode=mmap_mode),
+            coef={head: np.load(directory / f"{head}_coef.npy", mmap_mode=mmap_mode) for head in labels},
+            intercept={head: np.load(directory / f"{head}_intercept.npy") for head in labels},
+            labels=labels,
+        )
+
+
+class CascadeDetector:
+    """
+    Keyword fast path with a learned model for ambiguous texts.
+
+    A keyword decision is accepted when the best score reaches ``min_score``
+    and leads the runner-up by at least ``margin``; ties and zero scores go
+    to the model in one batch. Without a model, ambiguous texts keep the
+    plain keyword decision (argmax, or the default when nothing matched).
+    Per-head counters record how much traffic each tier handles.
+    """
+
+    TIERS = ("keyword", "model", "fallback")
+
+    def __init__(
+        self,
+        keyword_scorers: Dict[str, Callable[[str], Dict[Enum, int]]],
+        defaults: Dict[str, Enum],
+        model: Optional[Any] = None,
+        margin: int = 1,
+        min_score: int = 1,
+    ):
+        self.keyword_scorers = keyword_scorers
+        self.defaults = defaults
+        self.model = model
+        self.margin = margin
+        self.min_score = min_score
+        self._lock = threading.Lock()
+        self._counts = {head: dict.fromkeys(self.TIERS, 0) for head in keyword_scorers}
+
+    def _keyword_decision(self, head: str, text: str) -> Tuple[Enum, bool]:
+        """Keyword winner and whether it is confident enough to accept."""
+        scores = self.keyword_scorers[head](text)
+        ranked = sorted(scores.values(), reverse=True)
+        best = ranked[0]
+        runner_up = ranked[1] if len(ranked) > 1 else 0
+        if best == 0:
+            return self.defaults[head], False
+        winner = max(scores, key=scores.get)
+        return winner, best >= self.min_score and best - runner_up >= self.margin
+
+    def detect(self, head: str, texts: Sequence[str], model: Optional[Any] = None) -> List[Enum]:
+        """Detect ``head`` ("variant" or "region") for a batch of texts.
+
+        ``model`` overrides the configured model for this call.
+        """
+        model = model if model is not None else self.model
+        results: List[Enum] = []
+        ambiguous: List[int] = []
+        for i, text in enumerate(texts):
+            winner, confident = self._keyword_decision(head, text)
+            results.append(winner)
+            if not confident:
+                ambiguous.append(i)
+
+        routed_to_model = 0
+        if ambiguous and model is not None:
+            predict = getattr(model, f"predict_{head}s")
+            for i, (label, _) in zip(ambiguous, predict([texts[i] for i in ambiguous])):
+                results[i] = label
+            routed_to_model = len(ambiguous)
+
+        with self._lock:
+            counts = self._counts[head]
+            counts["keyword"] += len(texts) - len(ambiguous)
+            counts["model"] += routed_to_model
+            counts["fallback"] += len(ambiguous) - routed_to_model
+        return results
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-head tier counts and the share of traffic reaching the model."""
+        with self._lock:
+            snapshot = {head: dict(counts) for head, counts in self._counts.items()}
+        for counts in snapshot.values():
+            total = sum(counts.values())
+            counts["model_ratio"] = counts["model"] / total if total else 0.0
+        return snapshot
+
+
+def load_detector(path: Optional[str]) -> Optional[LinearCulturalDetector]:
+    """Load a detector, logging and returning None if it is missing or invalid."""
+    if not path:
+        return None
+    try:
+        detector = LinearCulturalDetector.load(path)
+        logger.info(f"Loaded linear cultural detector from {path}")
+        return detector
+    except Exception as e:
+        logger.warning(f"Could not load linear cultural detector from {path}: {e}")
+        return None
@@ -0,0 +1,390 @@
+"""
+ANISA Tracing
+Lightweight spans for requests, pipeline stages and dependencies.
+
+The current span lives in a ``contextvars`` variable, so spans opened in a
+request handler, the ``ANISACore`` stages it runs (via ``Tracer.stage``,
+a stage hook), SQLAlchemy flushes and Cortex calls all join the same trace,
+including code run in the threadpool. Every span carries the request ID of
+its trace, so a slow request found in the logs can be followed to the stage
+or dependency that took the time.
+
+Traces are sampled when their root span starts. With ``slow_ms`` set,
+unsampled traces are still recorded and exported when the root turns out
+to be slower than the threshold. Finished traces go to a file exporter:
+
+- ``jsonl``: one span per line
+- ``otlp``: one OTLP/JSON ``ExportTraceServiceRequest`` per line, the format
+  written by the OpenTelemetry Collector file exporter and read by its
+  ``otlpjsonfile`` receiver
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+TRACE_EXPORTERS = ("none", "jsonl", "otlp")
+
+# OTLP enum values
+_OTLP_KINDS = {"internal": 1, "server": 2, "client": 3}
+_OTLP_STATUS = {"ok": 1, "error": 2}
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("anisa_current_span", default=None)
+
+
+@dataclass
+class Trace:
+    """Spans of one request, exported together when the root span ends."""
+    trace_id: str
+    request_id: str
+    sampled: bool
+    recording: bool
+    spans: List["Span"] = field(default_factory=list)
+    finished: bool = False
+
+
+@dataclass
+class Span:
+    """A timed operation within a trace."""
+    name: str
+    trace: Trace
+    span_id: str
+    parent_id: Optional[str]
+    kind: str = "internal"  # internal | server | client
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    start_ns: int = 0
+    end_ns: Optional[int] = None
+    status: str = "ok"  # ok | error
+    error: Optional[str] = None
+    _started: float = 0.0
+
+    @property
+    def duration_ms(self) -> float:
+        if self.end_ns is None:
+            return 0.0
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, error: Any) -> None:
+        self.status = "error"
+        self.error = str(error)
+
+    def traceparent(self) -> str:
+        """W3C ``traceparent`` header value for outgoing calls."""
+        return f"00-{self.trace.trace_id}-{self.span_id}-{'01' if self.trace.sampled else '00'}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "request_id": self.trace.request_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+def current_span() -> Optional[Span]:
+    """The active span in this context, if any."""
+    return _current_span.get()
+
+
+# Route path templates keyed by endpoint function
+_route_templates: Dict[Any, str] = {}
+
+
+def route_template(request) -> str:
+    """Path template of the route that handled a request, e.g. /api/v2/export/{export_id}"""
+    endpoint = request.scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    template = _route_templates.get(endpoint)
+    if template is None:
+        template = next(
+            (route.path for route in request.app.router.routes if getattr(route, "endpoint", None) is endpoint),
+            "unmatched"
+        )
+        _route_templates[endpoint] = template
+    return template
+
+
+def _trace_id_for(request_id: str) -> str:
+    # UUID request IDs (the default) double as trace IDs so both can be grepped
+    try:
+        return uuid.UUID(request_id).hex
+    except ValueError:
+        return uuid.uuid4().hex
+
+
+class FileSpanExporter:
+    """Append finished traces to a local file, one JSON document per line."""
+
+    def __init__(self, path: str):
+        self.path = Path(path.format(pid=os.getpid()))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def encode(self, spans: Sequence[Span]) -> List[str]:
+        return [json.dumps(span.to_dict(), default=str) for span in spans]
+
+    def export(self, spans: Sequence[Span]) -> None:
+        data = "".join(f"{line}\n" for line in self.encode(spans))
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(data)
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class JsonlSpanExporter(FileSpanExporter):
+    """One span per line."""
+
+
+class OtlpFileSpanExporter(FileSpanExporter):
+    """One OTLP/JSON ``ExportTraceServiceRequest`` per trace and line."""
+
+    def __init__(self, path: str, service_name: str = "anisa"):
+        super().__init__(path)
+        self.service_name = service_name
+
+    @staticmethod
+    def _value(value: Any) -> Dict[str, Any]:
+        if isinstance(value, bool):
+            return {"boolValue": value}
+        if isinstance(value, int):
+            return {"intValue": str(value)}
+        if isinstance(value, float):
+            return {"doubleValue": value}
+        return {"stringValue": str(value)}
+
+    def _attributes(self, attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [{"key": key, "value": self._value(value)} for key, value in attributes.items() if value is not None]
+
+    def _span(self, span: Span) -> Dict[str, Any]:
+        status = {"code": _OTLP_STATUS[span.status]}
+        if span.error:
+            status["message"] = span.error
+        encoded = {
+            "traceId": span.trace.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": _OTLP_KINDS.get(span.kind, 1),
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": self._attributes({**span.attributes, "anisa.request_id": span.trace.request_id}),
+            "status": status,
+        }
+        if span.parent_id:
+            encoded["parentSpanId"] = span.parent_id
+        return encoded
+
+    def encode(self, spans: Sequence[Span]) -> List[str]:
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": self._attributes({"service.name": self.service_name})},
+                "scopeSpans": [{"scope": {"name": "anisa"}, "spans": [self._span(span) for span in spans]}],
+            }]
+        }
+        return [json.dumps(request)]
+
+
+class Tracer:
+    """
+    Creates spans and exports finished traces.
+
+    Without an exporter every method is a cheap no-op, so instrumentation
+    can stay in place when tracing is off.
+
+    Args:
+        exporter: ``FileSpanExporter`` receiving finished traces
+        sample_rate: Fraction of traces exported
+        slow_ms: Also export unsampled traces whose root took at least this
+            long, and log their slowest span; 0 disables
+    """
+
+    def __init__(self, exporter: Optional[FileSpanExporter] = None, sample_rate: float = 1.0, slow_ms: float = 0.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.exported_traces = 0
+
+    @classmethod
+    def from_config(cls, config) -> "Tracer":
+        """Tracer for ``config.trace_exporter``; disabled for ``none``."""
+        kind = config.trace_exporter.lower()
+        if kind not in TRACE_EXPORTERS:
+            raise ValueError(f"Unknown trace exporter '{config.trace_exporter}' (expected one of {TRACE_EXPORTERS})")
+        if kind == "none":
+            return cls()
+        exporter = JsonlSpanExporter(config.trace_path) if kind == "jsonl" else OtlpFileSpanExporter(config.trace_path)
+        logger.info(f"Tracing to {exporter.path} ({kind}, sample rate {config.trace_sample_rate})")
+        return cls(exporter, sample_rate=config.trace_sample_rate, slow_ms=config.trace_slow_ms)
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def start_span(
+        self,
+        name: str,
+        kind: str = "internal",
+        request_id: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Span]:
+        """
+        Start a span under the current one, or a new trace without one.
+
+        The span is not made current; use ``span`` for that. ``request_id``
+        only applies to new traces.
+        """
+        if self.exporter is None:
+            return None
+        parent = _current_span.get()
+        if parent is not None and not parent.trace.finished:
+            trace = parent.trace
+            parent_id = parent.span_id
+        else:
+            request_id = request_id or (parent.trace.request_id if parent is not None else str(uuid.uuid4()))
+            sampled = random.random() < self.sample_rate
+            trace = Trace(_trace_id_for(request_id), request_id, sampled, recording=sampled or self.slow_ms > 0)
+            parent_id = None
+        span = Span(
+            name,
+            trace,
+            uuid.uuid4().hex[:16],
+            parent_id,
+            kind=kind,
+            attributes=dict(attributes or {}),
+            start_ns=time.time_ns(),
+            _started=time.perf_counter(),
+        )
+        if trace.recording:
+            trace.spans.append(span)
+        return span
+
+    def end_span(self, span: Optional[Span]) -> None:
+        """End a span; ending a root span finishes and exports its trace."""
+        if span is None or span.end_ns is not None:
+            return
+        span.end_ns = span.start_ns + int((time.perf_counter() - span._started) * 1e9)
+        if span.parent_id is not None:
+            return
+        trace = span.trace
+        trace.finished = True
+        slow = self.slow_ms > 0 and span.duration_ms >= self.slow_ms
+        if slow:
+            self._log_slow(span)
+        if not trace.recording or not (trace.sampled or slow):
+            return
+        finished = [child for child in trace.spans if child.end_ns is not None]
+        try:
+            self.exporter.export(finished)
+            self.exported_traces += 1
+        except Exception as e:
+            logger.error(f"Failed to export trace {trace.trace_id}: {e}")
+
+    def _log_slow(self, root: Span) -> None:
+        children = [child for child in root.trace.spans if child is not root and child.end_ns is not None]
+        slowest = max(children, key=lambda child: child.duration_ms, default=None)
+        detail = f", slowest span {slowest.name} {slowest.duration_ms:.1f}ms" if slowest else ""
+        logger.warning(
+            f"Slow trace {root.trace.trace_id} for request {root.trace.request_id}: "
+            f"{root.name} took {root.duration_ms:.1f}ms{detail}"
+        )
+
+    def span(self, name: str, kind: str = "internal", request_id: Optional[str] = None, **attributes) -> ContextManager[Optional[Span]]:
+        """Context manager running its block as the current span."""
+        if self.exporter is None:
+            return nullcontext()
+        return self._span(name, kind, request_id, attributes)
+
+    @contextmanager
+    def _span(self, name: str, kind: str, request_id: Optional[str], attributes: Dict[str, Any]) -> Iterator[Span]:
+        span = self.start_span(name, kind, request_id, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span)
+
+    def stage(self, stage: str) -> ContextManager[Optional[Span]]:
+        """Stage hook for ``ANISACore.add_stage_hook``."""
+        return self.span(f"stage.{stage}", **{"anisa.stage": stage})
+
+    async def trace_request(self, request, call_next, request_id: str):
+        """Run an HTTP request under a server span named after its route.
+
+        For use in FastAPI/Starlette ``http`` middleware. Returns the
+        response and the route template, so callers can label metrics
+        without resolving the route again.
+        """
+        with self.span(f"{request.method} {request.url.path}", kind="server", request_id=request_id) as span:
+            response = await call_next(request)
+            route = route_template(request)
+            if span is not None:
+                span.name = f"{request.method} {route}"
+                span.set_attribute("http.method", request.method)
+                span.set_attribute("http.route", route)
+                span.set_attribute("http.status_code", response.status_code)
+                if response.status_code >= 500:
+                    span.set_error(f"HTTP {response.status_code}")
+        return response, route
+
+    def instrument_sessions(self, session_factory) -> None:
+        """Record a ``db.flush`` span for every flush of sessions from a factory."""
+        if self.exporter is None:
+            return
+        from sqlalchemy import event
+
+        def before_flush(session, flush_context, instances) -> None:
+            session.info["trace_flush_span"] = self.start_span("db.flush", kind="client", attributes={
+                "db.new": len(session.new),
+                "db.dirty": len(session.dirty),
+                "db.deleted": len(session.deleted),
+            })
+
+        def after_flush_postexec(session, flush_context) -> None:
+            self.end_span(session.info.pop("trace_flush_span", None))
+
+        def after_soft_rollback(session, previous_transaction) -> None:
+            # A failed flush rolls back without reaching after_flush_postexec
+            span = session.info.pop("trace_flush_span", None)
+            if span is not None:
+                span.set_error("flush rolled back")
+                self.end_span(span)
+
+        event.listen(session_factory, "before_flush", before_flush)
+        event.listen(session_factory, "after_flush_postexec", after_flush_postexec)
+        event.listen(session_factory, "after_soft_rollback", after_soft_rollback)
+
+    def close(self) -> None:
+        if self.exporter is not None:
+            self.exporter.close()
@@ -3,9 +3,18 @@
 ANISA Hugging Face Training (minimal quick-start)
 """
 
+import hashlib
+import json
 import logging
+import os
+import shutil
+import time
+import uuid
 from dataclasses import dataclass
-from typing import Dict, Any, List
+from pathlib import Path
+from typing import Callable, Dict, Any, Iterator, List, Optional, Sequence
+
+import numpy as np
 
 try:
     from transformers import (
@@ -15,7 +24,7 @@ try:
         Trainer,
         DataCollatorWithPadding,
     )
-    from datasets import Dataset, DatasetDict
+    from datasets import Dataset, DatasetDict, load_from_disk
     import evaluate
     import torch
     HF_AVAILABLE = True
@@ -25,6 +34,22 @@ except Exception:  # pragma: no cover
 
 logger = logging.getLogger(__name__)
 
+# Bump when the cached tokenized columns change
+TOKENIZED_CACHE_FORMAT = 3
+
+
+def _labelled_jsonl_examples(paths: Sequence[str], label_map: Dict[str, int], data_hash: str = "") -> Iterator[Dict[str, Any]]:
+    """Generator for ``Dataset.from_generator``: stream labelled rows from JSONL shards.
+
+    ``data_hash`` is unused here; it makes the ``datasets`` fingerprint depend
+    on shard contents rather than only on their paths.
+    """
+    from training.data.streaming import iter_jsonl
+
+    for ex in iter_jsonl(paths):
+        if ex.get("text") and ex.get("cultural_context") in label_map:
+            yield {"text": ex["text"], "label": label_map[ex["cultural_context"]]}
+
 
 @dataclass
 class HFConfig:
@@ -35,6 +60,66 @@ class HFConfig:
     batch_size: int = 8
     num_epochs: int = 1  # keep very low for quick start
     output_dir: str = "./models/anisa-quick-start"
+    cache_dir: str = "./training_data/cache"  # tokenized datasets, reused across runs
+    use_cache: bool = True
+    num_proc: Optional[int] = None  # tokenization processes; None = all CPUs
+    device: Optional[str] = None  # None = cuda when available, else cpu
+    torch_threads: Optional[int] = None  # intra-op threads; None = all CPUs
+    torch_interop_threads: Optional[int] = None  # inter-op threads; None = torch default
+    dataloader_workers: int = 2
+    prefetch_factor: int = 4  # batches prefetched per DataLoader worker
+    gradient_accumulation_steps: int = 1
+    length_bucketing: bool = True
+    bucket_size_multiplier: int = 50  # batches per length-sorted pool
+
+
+class LengthBucketSampler:
+    """
+    Batch sampler grouping examples of similar length.
+
+    Each epoch the indices are shuffled, cut into pools of
+    ``batch_size * bucket_size_multiplier``, sorted by length within each pool
+    and split into batches; the batch order is then shuffled. Batches stay
+    random across epochs while padding per batch is close to minimal.
+    """
+
+    def __init__(
+        self,
+        lengths: Sequence[int],
+        batch_size: int,
+        bucket_size_multiplier: int = 50,
+        shuffle: bool = True,
+        seed: int = 42,
+    ):
+        self.lengths = np.asarray(lengths)
+        self.batch_size = batch_size
+        self.pool_size = batch_size * max(1, bucket_size_multiplier)
+        self.shuffle = shuffle
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch = epoch
+
+    def __len__(self) -> int:
+        return -(-len(self.lengths) // self.batch_size)
+
+    def __iter__(self) -> Iterator[List[int]]:
+        rng = np.random.default_rng(self.seed + self.epoch)
+        if self.shuffle:
+            indices = rng.permutation(len(self.lengths))
+        else:
+            indices = np.arange(len(self.lengths))
+
+        batches = []
+        for start in range(0, len(indices), self.pool_size):
+            pool = indices[start:start + self.pool_size]
+            pool = pool[np.argsort(self.lengths[pool], kind="stable")]
+            batches.extend(pool[i:i + self.batch_size].tolist() for i in range(0, len(pool), self.batch_size))
+
+        if self.shuffle:
+            rng.shuffle(batches)
+        return iter(batches)
 
 
 class HFCulturalTrainer:
@@ -62,7 +147,7 @@ class HFCulturalTrainer:
         }
         self.inv_label_map = {v: k for k, v in self.label_map.items()}
 
-    def prepare_dataset(self, examples: List[Dict[str, Any]]) -> DatasetDict:
+    def prepare_dataset(self, examples: List[Dict[str, Any]]) -> "DatasetDict":
         # map labels
         data = [
             {
@@ -73,21 +158,111 @@ class HFCulturalTrainer:
             if ex.get("text") and ex.get("cultural_context") in self.label_map
         ]
 
-        full_ds = Dataset.from_list(data)
+        digest = hashlib.sha256()
+        for row in data:
+            digest.update(json.dumps(row, ensure_ascii=False).encode("utf-8"))
+        return self._cached(digest.hexdigest(), lambda: Dataset.from_list(data))
+
+    def prepare_dataset_from_jsonl(self, paths: Sequence[str]) -> "DatasetDict":
+        """Build the dataset from JSONL shards without holding them in memory.
+
+        Rows are streamed into an on-disk Arrow cache that ``datasets``
+        memory-maps, so corpus size is bounded by disk rather than RAM.
+        """
+        paths = [str(p) for p in paths]
+        digest = hashlib.sha256()
+        for path in paths:
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+        data_hash = digest.hexdigest()
+
+        return self._cached(data_hash, lambda: Dataset.from_generator(
+            _labelled_jsonl_examples,
+            gen_kwargs={"paths": paths, "label_map": self.label_map, "data_hash": data_hash},
+        ))
+
+    def _cache_path(self, data_hash: str) -> Path:
+        """Cache location keyed by tokenizer, max_length, labels and data."""
+        key = json.dumps({
+            "tokenizer": self.tokenizer.name_or_path,
+            "tokenizer_class": type(self.tokenizer).__name__,
+            "vocab_size": len(self.tokenizer),
+            "max_length": self.config.max_length,
+            "label_map": self.label_map,
+            "data": data_hash,
+            "format": TOKENIZED_CACHE_FORMAT,
+        }, sort_keys=True)
+        return Path(self.config.cache_dir) / f"tokenized-{hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]}"
+
+    def _cached(self, data_hash: str, build) -> "DatasetDict":
+        """Load the tokenized dataset from the on-disk cache or build and store it.
+
+        ``load_from_disk`` memory-maps the Arrow files, so a cache hit costs
+        neither tokenization nor resident memory.
+        """
+        path = self._cache_path(data_hash)
+        if self.config.use_cache and path.exists():
+            logger.info("Loading tokenized dataset from cache %s", path)
+            return load_from_disk(str(path))
+
+        dataset = self._split_and_tokenize(build())
+        if self.config.use_cache:
+            # Parallel search trials can build the same entry at once, so each
+            # writes a private directory and the first one renamed into place wins.
+            tmp_path = path.with_name(f"{path.name}.tmp-{os.getpid()}-{uuid.uuid4().hex[:8]}")
+            try:
+                if path.exists():
+                    logger.info("Tokenized dataset was cached concurrently at %s", path)
+                else:
+                    dataset.save_to_disk(str(tmp_path))
+                    try:
+                        os.replace(tmp_path, path)
+                        logger.info("Cached tokenized dataset at %s", path)
+                    except OSError:
+                        # Renaming onto a non-empty directory fails: another process won
+                        if not path.exists():
+                            raise
+            finally:
+                shutil.rmtree(tmp_path, ignore_errors=True)
+            # Reopen memory-mapped from the cache instead of the build-time copies
+            dataset = load_from_disk(str(path))
+        return dataset
+
+    def _split_and_tokenize(self, full_ds: "Dataset") -> "DatasetDict":
         split = full_ds.train_test_split(test_size=0.3, seed=42)
+        num_proc = self.config.num_proc or os.cpu_count() or 1
 
+        # No padding here: DataCollatorWithPadding pads each batch to its own
+        # longest sequence, which is far less work than padding the corpus.
         def tokenize(batch):
-            return self.tokenizer(
+            encoded = self.tokenizer(
                 batch["text"],
                 truncation=True,
-                padding=True,
                 max_length=self.config.max_length,
             )
+            encoded["length"] = [len(ids) for ids in encoded["input_ids"]]
+            return encoded
 
-        train_ds = split["train"].map(tokenize, batched=True)
-        val_ds = split["test"].map(tokenize, batched=True)
+        def tokenize_split(ds: "Dataset") -> "Dataset":
+            return ds.map(
+                tokenize,
+                batched=True,
+                num_proc=min(num_proc, max(1, len(ds))),
+            )
 
-        return DatasetDict(train=train_ds, validation=val_ds)
+        return DatasetDict(train=tokenize_split(split["train"]), validation=tokenize_split(split["test"]))
+
+    def save(self, output_dir: Optional[str] = None) -> Path:
+        """Save model, tokenizer and label names for export and serving."""
+        path = Path(output_dir or self.config.output_dir)
+        path.mkdir(parents=True, exist_ok=True)
+        self.model.save_pretrained(str(path))
+        self.tokenizer.save_pretrained(str(path))
+        with open(path / "labels.json", "w", encoding="utf-8") as f:
+            json.dump({"labels": [self.inv_label_map[i] for i in range(len(self.inv_label_map))]}, f, indent=2)
+        logger.info("Saved model artifacts to %s", path)
+        return path
 
     def _compute_metrics(self, eval_pred):
         logits, labels = eval_pred
@@ -95,14 +270,82 @@ class HFCulturalTrainer:
         metric = evaluate.load("accuracy")
         return metric.compute(predictions=preds, references=labels)
 
-    def train(self, dataset: DatasetDict) -> Dict[str, Any]:
+    def _configure_threads(self) -> None:
         import torch
+
+        torch.set_num_threads(self.config.torch_threads or os.cpu_count() or 1)
+        if self.config.torch_interop_threads:
+            try:
+                torch.set_num_interop_threads(self.config.torch_interop_threads)
+            except RuntimeError:
+                # Only settable before the first inter-op parallel work in the process
+                logger.warning("Inter-op threads already initialised; keeping %d", torch.get_num_interop_threads())
+
+    def _loader(self, ds: "Dataset", lengths: Sequence[int], shuffle: bool, collator):
         from torch.utils.data import DataLoader
+
+        config = self.config
+        if config.length_bucketing:
+            sampler_args = {"batch_sampler": LengthBucketSampler(
+                lengths, config.batch_size, config.bucket_size_multiplier, shuffle=shuffle,
+            )}
+        else:
+            sampler_args = {"batch_size": config.batch_size, "shuffle": shuffle}
+        workers = config.dataloader_workers
+        return DataLoader(
+            ds,
+            collate_fn=collator,
+            num_workers=workers,
+            prefetch_factor=config.prefetch_factor if workers > 0 else None,
+            persistent_workers=workers > 0,
+            **sampler_args,
+        )
+
+    def _evaluate(self, loader, device) -> float:
+        """Validation accuracy over ``loader``."""
+        import torch
+
+        self.model.eval()
+        correct = 0
+        total = 0
+        with torch.no_grad():
+            for batch in loader:
+                batch = {k: v.to(device) for k, v in batch.items()}
+                outputs = self.model(input_ids=batch["input_ids"], attention_mask=batch["attention_mask"], labels=batch["labels"]) if "labels" in batch else self.model(**batch)
+                logits = outputs.logits
+                preds = torch.argmax(logits, dim=-1)
+                correct += (preds == batch["labels"]).sum().item()
+                total += batch["labels"].numel()
+        return (correct / total) if total > 0 else 0.0
+
+    def train(
+        self,
+        dataset: "DatasetDict",
+        on_epoch_end: Optional[Callable[[int, float], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Fine-tune the model and report validation accuracy.
+
+        Args:
+            dataset: Tokenized train/validation splits
+            on_epoch_end: Called with (epoch, validation accuracy) after every
+                epoch but the last; may raise to stop training early
+
+        Returns:
+            Validation accuracy and training throughput
+        """
+        import torch
         from torch.optim import AdamW
 
-        device = torch.device("cpu")
+        config = self.config
+        self._configure_threads()
+        device = torch.device(config.device or ("cuda" if torch.cuda.is_available() else "cpu"))
         self.model.to(device)
 
+        # Lengths drive bucketing; read them before dropping the column
+        train_lengths = dataset["train"]["length"]
+        val_lengths = dataset["validation"]["length"]
+
         # set torch format
         columns = ["input_ids", "attention_mask", "label"]
         train_ds = dataset["train"].remove_columns([c for c in dataset["train"].column_names if c not in columns])
@@ -111,34 +354,39 @@ class HFCulturalTrainer:
         val_ds.set_format(type="torch")
 
         collator = DataCollatorWithPadding(tokenizer=self.tokenizer)
-        train_loader = DataLoader(train_ds, batch_size=self.config.batch_size, shuffle=True, collate_fn=collator)
-        val_loader = DataLoader(val_ds, batch_size=self.config.batch_size, shuffle=False, collate_fn=collator)
+        train_loader = self._loader(train_ds, train_lengths, True, collator)
+        val_loader = self._loader(val_ds, val_lengths, False, collator)
 
-        optimizer = AdamW(self.model.parameters(), lr=self.config.learning_rate)
+        logger.info(
+            "Training on %s with %d intra-op / %d inter-op threads, %d loader workers",
+            device, torch.get_num_threads(), torch.get_num_interop_threads(), config.dataloader_workers,
+        )
+
+        accumulation = max(1, config.gradient_accumulation_steps)
+        optimizer = AdamW(self.model.parameters(), lr=config.learning_rate)
+        samples_per_second = 0.0
         self.model.train()
-        for _ in range(self.config.num_epochs):
-            for batch in train_loader:
+        for epoch in range(config.num_epochs):
+            if config.length_bucketing:
+                train_loader.batch_sampler.set_epoch(epoch)
+            started = time.perf_counter()
+            samples = 0
+            optimizer.zero_grad()
+            for step, batch in enumerate(train_loader, 1):
                 batch = {k: v.to(device) for k, v in batch.items()}
                 outputs = self.model(input_ids=batch["input_ids"], attention_mask=batch["attention_mask"], labels=batch["labels"]) if "labels" in batch else self.model(**batch)
-                loss = outputs.loss
-                optimizer.zero_grad()
-                loss.backward()
-                optimizer.step()
+                (outputs.loss / accumulation).backward()
+                if step % accumulation == 0 or step == len(train_loader):
+                    optimizer.step()
+                    optimizer.zero_grad()
+                samples += batch["input_ids"].shape[0]
+            elapsed = time.perf_counter() - started
+            samples_per_second = samples / elapsed if elapsed > 0 else 0.0
+            logger.info("Epoch %d: %d samples in %.1fs (%.1f samples/sec)", epoch + 1, samples, elapsed, samples_per_second)
+            if on_epoch_end is not None and epoch + 1 < config.num_epochs:
+                on_epoch_end(epoch, self._evaluate(val_loader, device))
+                self.model.train()
 
         # evaluation
-        self.model.eval()
-        correct = 0
-        total = 0
-        with torch.no_grad():
-            for batch in val_loader:
-                batch = {k: v.to(device) for k, v in batch.items()}
-                outputs = self.model(input_ids=batch["input_ids"], attention_mask=batch["attention_mask"], labels=batch["labels"]) if "labels" in batch else self.model(**batch)
-                logits = outputs.logits
-                preds = torch.argmax(logits, dim=-1)
-                correct += (preds == batch["labels"]).sum().item()
-                total += batch["labels"].numel()
-
-        accuracy = (correct / total) if total > 0 else 0.0
-        return {"accuracy": accuracy}
-
-
+        accuracy = self._evaluate(val_loader, device)
+        return {"accuracy": accuracy, "train_samples_per_second": round(samples_per_second, 2)}
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+ANISA Linear Detector Training
+
+Fits hashed TF-IDF + logistic regression classifiers for the 7 cultural
+variants and 7 cultural regions, and saves them in the numpy format served
+by ``services.detection.LinearCulturalDetector``.
+"""
+
+import argparse
+import json
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from scipy.sparse import csr_matrix
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import accuracy_score, f1_score
+    SKLEARN_AVAILABLE = True
+except Exception:  # pragma: no cover
+    SKLEARN_AVAILABLE = False
+
+from services.detection import HEADS, HashedFeaturizer, LinearCulturalDetector, tfidf_rows
+
+
+logger = logging.getLogger(__name__)
+
+# Training record field for each detector head
+LABEL_FIELDS = {"variant": "cultural_context", "region": "region"}
+
+
+@dataclass
+class LinearTrainingConfig:
+    n_features: int = 2 ** 20
+    ngram_max: int = 2
+    min_df: int = 1
+    C: float = 4.0
+    max_iter: int = 300
+    test_size: float = 0.2
+    seed: int = 42
+    output_dir: str = "./models/anisa-linear-detector"
+
+
+def _valid_labels(head: str) -> set:
+    return {member.value for member in HEADS[head]}
+
+
+def train_linear_detector(
+    records: Iterable[Dict[str, Any]],
+    config: Optional[LinearTrainingConfig] = None,
+) -> Tuple[LinearCulturalDetector, Dict[str, Any]]:
+    """
+    Fit variant and region classifiers on training records.
+
+    Args:
+        records: Dicts with ``text``, ``cultural_context`` and ``region`` keys
+        config: Training configuration
+
+    Returns:
+        The fitted detector and held-out metrics per head
+    """
+    if not SKLEARN_AVAILABLE:
+        raise ImportError("scikit-learn not available. Install: pip install scikit-learn")
+    config = config or LinearTrainingConfig()
+    featurizer = HashedFeaturizer(config.n_features, config.ngram_max)
+
+    texts: List[str] = []
+    targets: Dict[str, List[Optional[str]]] = {head: [] for head in HEADS}
+    valid = {head: _valid_labels(head) for head in HEADS}
+    for record in records:
+        text = record.get("text")
+        if not text:
+            continue
+        texts.append(text)
+        for head, field in LABEL_FIELDS.items():
+            label = record.get(field)
+            targets[head].append(label if label in valid[head] else None)
+    if not texts:
+        raise ValueError("No training records with text")
+
+    started = time.perf_counter()
+    indptr, buckets, counts = featurizer.counts(texts)
+
+    # Vocabulary = hashed buckets meeting min_df; IDF as in scikit-learn (smooth_idf)
+    vocab, inverse = np.unique(buckets, return_inverse=True)
+    df = np.bincount(inverse, minlength=len(vocab))
+    keep = df >= config.min_df
+    vocab, df = vocab[keep], df[keep]
+    remap = np.cumsum(keep) - 1
+    kept = keep[inverse]
+    columns = remap[inverse][kept]
+    row_ids = np.repeat(np.arange(len(texts)), np.diff(indptr))[kept]
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(row_ids, minlength=len(texts)))))
+    idf = (np.log((1 + len(texts)) / (1 + df)) + 1.0).astype(np.float32)
+    values = tfidf_rows(indptr, columns, counts[kept], idf)
+    X = csr_matrix((values, columns, indptr), shape=(len(texts), len(vocab)))
+
+    rng = np.random.default_rng(config.seed)
+    order = rng.permutation(len(texts))
+    n_test = int(len(texts) * config.test_size)
+    test_idx, train_idx = order[:n_test], order[n_test:]
+
+    coef: Dict[str, np.ndarray] = {}
+    intercept: Dict[str, np.ndarray] = {}
+    labels: Dict[str, List[str]] = {}
+    metrics: Dict[str, Any] = {"examples": len(texts), "vocab_size": int(len(vocab))}
+    for head in HEADS:
+        y = np.asarray(targets[head], dtype=object)
+        labelled = np.asarray([label is not None for label in y])
+        fit_idx = train_idx[labelled[train_idx]]
+        if len(set(y[fit_idx])) < 2:
+            raise ValueError(f"Need at least two {head} classes to train, got {sorted(set(y[fit_idx]))}")
+
+        model = LogisticRegression(C=config.C, max_iter=config.max_iter, random_state=config.seed)
+        model.fit(X[fit_idx], y[fit_idx].astype(str))
+        labels[head] = [str(c) for c in model.classes_]
+        if len(labels[head]) == 2:
+            # Binary sklearn models keep one weight column; expand to two-class softmax form
+            coef[head] = np.hstack([-model.coef_.T / 2, model.coef_.T / 2]).astype(np.float32)
+            intercept[head] = np.array([-model.intercept_[0] / 2, model.intercept_[0] / 2], dtype=np.float32)
+        else:
+            coef[head] = model.coef_.T.astype(np.float32)
+            intercept[head] = model.intercept_.astype(np.float32)
+
+        eval_idx = test_idx[labelled[test_idx]]
+        if len(eval_idx):
+            predicted = model.predict(X[eval_idx])
+            metrics[head] = {
+                "accuracy": float(accuracy_score(y[eval_idx].astype(str), predicted)),
+                "macro_f1": float(f1_score(y[eval_idx].astype(str), predicted, average="macro")),
+                "test_examples": int(len(eval_idx)),
+            }
+
+    detector = LinearCulturalDetector(featurizer, vocab.astype(np.int64), idf, coef, intercept, labels)
+    metrics["train_seconds"] = round(time.perf_counter() - started, 3)
+    logger.info("Trained linear detector on %d texts (%d features): %s", len(texts), len(vocab), metrics)
+    return detector, metrics
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train the ANISA linear cultural detector")
+    parser.add_argument("data", nargs="+", help="JSONL shards or directories of training records")
+    parser.add_argument("--output-dir", default=LinearTrainingConfig.output_dir)
+    parser.add_argument("--C", type=float, default=LinearTrainingConfig.C)
+    parser.add_argument("--ngram-max", type=int, default=LinearTrainingConfig.ngram_max)
+    parser.add_argument("--min-df", type=int, default=LinearTrainingConfig.min_df)
+    args = parser.parse_args()
+
+    from training.data.streaming import iter_jsonl
+
+    logging.basicConfig(level=logging.INFO)
+    config = LinearTrainingConfig(output_dir=args.output_dir, C=args.C, ngram_max=args.ngram_max, min_df=args.min_df)
+    detector, metrics = train_linear_detector(iter_jsonl(args.data), config)
+    path = detector.save(config.output_dir)
+    with open(Path(path) / "metrics.json", "w", encoding="utf-8") as f:
+        json.dump(metrics, f, indent=2)
+    print(f"Saved linear detector to {path}")
+
+
+if __name__ == "__main__":
+    main()
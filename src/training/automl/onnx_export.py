@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+ANISA ONNX Export
+
+Exports classifiers trained by ``HFCulturalTrainer`` to ONNX, quantizes them
+to int8 with dynamic quantization, and serves them through ONNX Runtime for
+CPU inference. Includes an fp32 vs int8 latency/accuracy benchmark. Export
+directories can be registered in the model registry with ``kind="onnx"``
+and hot-swapped in as the cultural detector.
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import onnxruntime as ort
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoTokenizer
+    ONNX_AVAILABLE = True
+except Exception:  # pragma: no cover
+    ONNX_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+FP32_MODEL = "model.onnx"
+INT8_MODEL = "model.int8.onnx"
+LABELS_FILE = "labels.json"
+EXPORT_INFO_FILE = "export.json"
+
+
+def _require_onnx() -> None:
+    if not ONNX_AVAILABLE:
+        raise ImportError(
+            "ONNX Runtime not available. Install: pip install onnx onnxruntime 'transformers==4.*'"
+        )
+
+
+@dataclass
+class ONNXExportConfig:
+    model_dir: str = "./models/anisa-quick-start"
+    output_dir: str = "./models/anisa-quick-start-onnx"
+    opset: int = 17
+    max_length: int = 256
+    quantize: bool = True
+    per_channel: bool = False
+
+
+def export_onnx(config: ONNXExportConfig) -> Path:
+    """Export a saved HF sequence classifier to ONNX with dynamic batch/sequence axes.
+
+    The tokenizer and ``labels.json`` are copied next to the graph so the
+    output directory is self-contained for serving.
+    """
+    _require_onnx()
+    import torch
+    from transformers import AutoModelForSequenceClassification
+
+    output_dir = Path(config.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    model = AutoModelForSequenceClassification.from_pretrained(config.model_dir)
+    model.eval()
+    tokenizer = AutoTokenizer.from_pretrained(config.model_dir)
+    dummy = tokenizer(["community consensus before trade"], return_tensors="pt")
+
+    path = output_dir / FP32_MODEL
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (dummy["input_ids"], dummy["attention_mask"]),
+            str(path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "logits": {0: "batch"},
+            },
+            opset_version=config.opset,
+            do_constant_folding=True,
+        )
+
+    tokenizer.save_pretrained(str(output_dir))
+    labels_path = Path(config.model_dir) / LABELS_FILE
+    if labels_path.exists():
+        shutil.copy(labels_path, output_dir / LABELS_FILE)
+    else:
+        labels = [model.config.id2label[i] for i in range(model.config.num_labels)]
+        with open(output_dir / LABELS_FILE, "w", encoding="utf-8") as f:
+            json.dump({"labels": labels}, f, indent=2)
+    with open(output_dir / EXPORT_INFO_FILE, "w", encoding="utf-8") as f:
+        json.dump({"max_length": config.max_length, "opset": config.opset}, f, indent=2)
+
+    logger.info("Exported ONNX model to %s", path)
+    return path
+
+
+def quantize_onnx(fp32_path: Path, per_channel: bool = False) -> Path:
+    """Dynamically quantize weights to int8 (activations quantized at run time)."""
+    _require_onnx()
+    int8_path = Path(fp32_path).with_name(INT8_MODEL)
+    quantize_dynamic(
+        str(fp32_path),
+        str(int8_path),
+        weight_type=QuantType.QInt8,
+        per_channel=per_channel,
+    )
+    fp32_mb = os.path.getsize(fp32_path) / 1e6
+    int8_mb = os.path.getsize(int8_path) / 1e6
+    logger.info("Quantized %s (%.1f MB) -> %s (%.1f MB)", fp32_path.name, fp32_mb, int8_path.name, int8_mb)
+    return int8_path
+
+
+def export_and_quantize(config: Optional[ONNXExportConfig] = None) -> Dict[str, Path]:
+    """Export fp32 ONNX and, if configured, its int8 counterpart."""
+    config = config or ONNXExportConfig()
+    paths = {"fp32": export_onnx(config)}
+    if config.quantize:
+        paths["int8"] = quantize_onnx(paths["fp32"], config.per_channel)
+    return paths
+
+
+class ONNXCulturalClassifier:
+    """
+    Lightweight ONNX Runtime wrapper for cultural variant classification.
+
+    Batches are formed from length-sorted texts so each batch pads only to
+    its own longest sequence; results are returned in input order.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        tokenizer_dir: Optional[str] = None,
+        max_length: int = 256,
+        intra_op_threads: Optional[int] = None,
+    ):
+        _require_onnx()
+        self.model_path = Path(model_path)
+        model_dir = Path(tokenizer_dir) if tokenizer_dir else self.model_path.parent
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(str(self.model_path), options, providers=["CPUExecutionProvider"])
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_dir))
+        self.max_length = max_length
+        with open(model_dir / LABELS_FILE, "r", encoding="utf-8") as f:
+            self.labels: List[str] = json.load(f)["labels"]
+
+    def predict_proba(self, texts: Sequence[str], batch_size: int = 32) -> np.ndarray:
+        """Class probabilities, shape ``(len(texts), num_labels)``."""
+        probs = np.empty((len(texts), len(self.labels)), dtype=np.float32)
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        for start in range(0, len(order), batch_size):
+            idx = order[start:start + batch_size]
+            encoded = self.tokenizer(
+                [texts[i] for i in idx],
+                truncation=True,
+                max_length=self.max_length,
+                padding="longest",
+                return_tensors="np",
+            )
+            logits = self.session.run(
+                ["logits"],
+                {
+                    "input_ids": encoded["input_ids"].astype(np.int64),
+                    "attention_mask": encoded["attention_mask"].astype(np.int64),
+                },
+            )[0]
+            exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+            probs[idx] = exp / exp.sum(axis=1, keepdims=True)
+        return probs
+
+    def predict(self, texts: Sequence[str], batch_size: int = 32) -> List[Dict[str, Any]]:
+        """Predicted label and confidence for each text."""
+        if not texts:
+            return []
+        probs = self.predict_proba(texts, batch_size)
+        best = probs.argmax(axis=1)
+        return [
+            {"label": self.labels[k], "confidence": float(probs[i, k])}
+            for i, k in enumerate(best)
+        ]
+
+
+class ONNXCulturalDetector:
+    """
+    Cultural detector backed by an exported variant classifier.
+
+    Implements the ``predict_variants``/``predict_regions`` interface of
+    ``LinearCulturalDetector`` so the authentication service can use it.
+    The classifier only predicts variants; each region is the home region
+    of the predicted variant (``REGION_VARIANTS``), with its probability.
+    """
+
+    def __init__(self, classifier: ONNXCulturalClassifier, batch_size: int = 32):
+        from models import CulturalRegion, CulturalVariant
+        from training.data.synthetic import REGION_VARIANTS
+
+        self.classifier = classifier
+        self.batch_size = batch_size
+        self._variants = [CulturalVariant(label) for label in classifier.labels]
+        self._regions = {CulturalVariant(v): CulturalRegion(r) for r, v in REGION_VARIANTS.items()}
+
+    @classmethod
+    def load(cls, path: str, quantized: bool = True, intra_op_threads: Optional[int] = None) -> "ONNXCulturalDetector":
+        """Load an export directory, preferring the int8 graph when present.
+
+        Texts are truncated to the ``max_length`` recorded at export time.
+        """
+        model_dir = Path(path)
+        model_path = model_dir / INT8_MODEL
+        if not quantized or not model_path.exists():
+            model_path = model_dir / FP32_MODEL
+        max_length = ONNXExportConfig.max_length
+        if (model_dir / EXPORT_INFO_FILE).exists():
+            with open(model_dir / EXPORT_INFO_FILE, "r", encoding="utf-8") as f:
+                max_length = json.load(f).get("max_length", max_length)
+        return cls(ONNXCulturalClassifier(str(model_path), max_length=max_length, intra_op_threads=intra_op_threads))
+
+    def predict_variants(self, texts: Sequence[str]) -> List[Tuple[Any, float]]:
+        """Most likely cultural variant and its probability for each text."""
+        if not texts:
+            return []
+        probs = self.classifier.predict_proba(texts, self.batch_size)
+        best = probs.argmax(axis=1)
+        return [(self._variants[k], float(probs[i, k])) for i, k in enumerate(best)]
+
+    def predict_regions(self, texts: Sequence[str]) -> List[Tuple[Any, float]]:
+        """Home region of the most likely variant and its probability for each text."""
+        return [(self._regions[variant], p) for variant, p in self.predict_variants(texts)]
+
+
+@dataclass
+class BenchmarkResult:
+    model: str
+    accuracy: float
+    latency_ms: Dict[str, float] = field(default_factory=dict)  # single-text p50/p95/p99
+    batch_throughput: float = 0.0  # texts/sec at the benchmark batch size
+    size_mb: float = 0.0
+
+
+def benchmark_model(
+    classifier: ONNXCulturalClassifier,
+    texts: Sequence[str],
+    labels: Sequence[str],
+    name: str,
+    batch_size: int = 32,
+    warmup: int = 10,
+    max_single: int = 500,
+) -> BenchmarkResult:
+    """Measure accuracy, single-text latency percentiles and batched throughput."""
+    for text in texts[:warmup]:
+        classifier.predict([text])
+
+    timings = []
+    for text in texts[:max_single]:
+        started = time.perf_counter()
+        classifier.predict([text])
+        timings.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    predictions = classifier.predict(texts, batch_size=batch_size)
+    elapsed = time.perf_counter() - started
+
+    correct = sum(1 for p, label in zip(predictions, labels) if p["label"] == label)
+    return BenchmarkResult(
+        model=name,
+        accuracy=correct / len(labels) if labels else 0.0,
+        latency_ms={
+            "p50": float(np.percentile(timings, 50)),
+            "p95": float(np.percentile(timings, 95)),
+            "p99": float(np.percentile(timings, 99)),
+        },
+        batch_throughput=len(texts) / elapsed if elapsed > 0 else 0.0,
+        size_mb=os.path.getsize(classifier.model_path) / 1e6,
+    )
+
+
+def compare_fp32_int8(
+    output_dir: str,
+    texts: Sequence[str],
+    labels: Sequence[str],
+    batch_size: int = 32,
+    intra_op_threads: Optional[int] = None,
+    max_length: int = ONNXExportConfig.max_length,
+) -> List[BenchmarkResult]:
+    """Benchmark the fp32 and int8 graphs in ``output_dir`` on a labelled split.
+
+    ``max_length`` should be the length the model was trained and exported
+    with, so both graphs see the sequences they will see in serving.
+    """
+    results = []
+    for name, filename in (("fp32", FP32_MODEL), ("int8", INT8_MODEL)):
+        path = Path(output_dir) / filename
+        if not path.exists():
+            continue
+        classifier = ONNXCulturalClassifier(str(path), max_length=max_length, intra_op_threads=intra_op_threads)
+        result = benchmark_model(classifier, texts, labels, name, batch_size=batch_size)
+        logger.info(
+            "%s: accuracy %.3f, p50 %.2fms, p95 %.2fms, %.0f texts/sec batched, %.1f MB",
+            name, result.accuracy, result.latency_ms["p50"], result.latency_ms["p95"],
+            result.batch_throughput, result.size_mb,
+        )
+        results.append(result)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export an ANISA classifier to ONNX (fp32 + int8)")
+    parser.add_argument("--model-dir", default=ONNXExportConfig.model_dir)
+    parser.add_argument("--output-dir", default=ONNXExportConfig.output_dir)
+    parser.add_argument("--opset", type=int, default=ONNXExportConfig.opset)
+    parser.add_argument("--max-length", type=int, default=ONNXExportConfig.max_length,
+                        help="Tokenizer max_length the model was trained with")
+    parser.add_argument("--no-quantize", action="store_true")
+    parser.add_argument("--eval-jsonl", help="JSONL shards with text/cultural_context for the benchmark")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    export_and_quantize(ONNXExportConfig(
+        model_dir=args.model_dir,
+        output_dir=args.output_dir,
+        opset=args.opset,
+        max_length=args.max_length,
+        quantize=not args.no_quantize,
+    ))
+    if args.eval_jsonl:
+        from training.data.streaming import iter_jsonl
+        rows = [r for r in iter_jsonl(args.eval_jsonl) if r.get("text") and r.get("cultural_context")]
+        compare_fp32_int8(args.output_dir, [r["text"] for r in rows], [r["cultural_context"] for r in rows],
+                          max_length=args.max_length)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+ANISA Hyperparameter Search
+
+Runs training trials in a process pool with a fixed CPU thread budget per
+trial. Trials report intermediate validation accuracy; a median stopping
+rule shared across workers prunes those falling behind earlier trials at
+the same step. Every trial's parameters, metrics and wall-clock/CPU cost
+are appended to a JSONL results file as it finishes.
+"""
+
+import argparse
+import json
+import logging
+import math
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from threadpoolctl import threadpool_limits
+    THREADPOOLCTL_AVAILABLE = True
+except Exception:  # pragma: no cover
+    THREADPOOLCTL_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+# Environment variables read by BLAS/OpenMP runtimes and tokenizers
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "RAYON_NUM_THREADS",
+)
+
+# Objective signature: (params, report) -> final metrics; report(step, value)
+Objective = Callable[[Dict[str, Any], Callable[[int, float], None]], Dict[str, Any]]
+
+
+@dataclass
+class Choice:
+    values: Sequence[Any]
+
+    def sample(self, rng: np.random.Generator) -> Any:
+        value = self.values[int(rng.integers(len(self.values)))]
+        return value.item() if isinstance(value, np.generic) else value
+
+
+@dataclass
+class Uniform:
+    low: float
+    high: float
+
+    def sample(self, rng: np.random.Generator) -> float:
+        return float(rng.uniform(self.low, self.high))
+
+
+@dataclass
+class LogUniform:
+    low: float
+    high: float
+
+    def sample(self, rng: np.random.Generator) -> float:
+        return float(math.exp(rng.uniform(math.log(self.low), math.log(self.high))))
+
+
+# Default search spaces, biased towards models that are cheap to serve on CPU
+LINEAR_SPACE = {
+    "C": LogUniform(0.25, 32.0),
+    "ngram_max": Choice([1, 2, 3]),
+    "min_df": Choice([1, 2, 3]),
+    "n_features": Choice([2 ** 16, 2 ** 18, 2 ** 20]),
+}
+
+HF_SPACE = {
+    "model_name": Choice([
+        "prajjwal1/bert-tiny",
+        "google/bert_uncased_L-4_H-256_A-4",
+        "distilbert-base-uncased",
+    ]),
+    "learning_rate": LogUniform(1e-5, 2e-4),
+    "batch_size": Choice([8, 16, 32]),
+    "max_length": Choice([64, 128, 256]),
+    "num_epochs": Choice([2, 3, 4]),
+}
+
+
+class TrialPruned(Exception):
+    """Raised from ``report`` to stop a trial early."""
+
+
+@dataclass
+class SearchConfig:
+    n_trials: int = 32
+    workers: Optional[int] = None  # None = CPUs // threads_per_trial
+    threads_per_trial: int = 1
+    prune: bool = True
+    min_trials_before_pruning: int = 4  # reports needed at a step before pruning there
+    warmup_steps: int = 0  # steps below this are never pruned
+    seed: int = 42
+    results_path: str = "./training_data/search/results.jsonl"
+
+
+class MedianPruner:
+    """
+    Median stopping rule over intermediate values shared between processes.
+
+    ``history`` and ``lock`` are ``multiprocessing.Manager`` proxies, so
+    every worker sees the values reported by all earlier trials.
+    """
+
+    def __init__(self, history, lock, min_trials: int = 4, warmup_steps: int = 0):
+        self.history = history
+        self.lock = lock
+        self.min_trials = min_trials
+        self.warmup_steps = warmup_steps
+
+    def should_prune(self, step: int, value: float) -> bool:
+        """Record ``value`` at ``step`` and decide whether the trial should stop."""
+        with self.lock:
+            seen = list(self.history.get(step, []))
+            self.history[step] = seen + [value]
+        if step < self.warmup_steps or len(seen) < self.min_trials:
+            return False
+        return value < float(np.median(seen))
+
+
+@dataclass
+class TrialReporter:
+    """Callable handed to objectives for intermediate results."""
+    trial: int
+    pruner: Optional[MedianPruner] = None
+    intermediate: List[Tuple[int, float]] = field(default_factory=list)
+
+    def __call__(self, step: int, value: float) -> None:
+        self.intermediate.append((step, float(value)))
+        if self.pruner is not None and self.pruner.should_prune(step, float(value)):
+            raise TrialPruned(f"Trial {self.trial} pruned at step {step} ({value:.4f} below median)")
+
+
+def limit_threads(threads: int) -> None:
+    """Cap BLAS, OpenMP and torch threads in the current process."""
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    if THREADPOOLCTL_AVAILABLE:
+        threadpool_limits(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except Exception:
+        pass
+
+
+def trial_threads() -> int:
+    """Thread budget of the current trial process."""
+    return int(os.environ.get("OMP_NUM_THREADS", "1"))
+
+
+def _run_trial(
+    objective: Objective,
+    trial: int,
+    params: Dict[str, Any],
+    pruner: Optional[MedianPruner],
+) -> Dict[str, Any]:
+    reporter = TrialReporter(trial, pruner)
+    started_at = datetime.utcnow().isoformat()
+    wall_started, cpu_started = time.perf_counter(), time.process_time()
+    record: Dict[str, Any] = {"trial": trial, "params": params, "started_at": started_at}
+    try:
+        record["metrics"] = objective(params, reporter)
+        record["status"] = "complete"
+    except TrialPruned as e:
+        record["status"] = "pruned"
+        record["reason"] = str(e)
+    except Exception as e:
+        record["status"] = "failed"
+        record["error"] = f"{type(e).__name__}: {e}"
+        logger.debug(traceback.format_exc())
+    record["intermediate"] = reporter.intermediate
+    record["wall_seconds"] = round(time.perf_counter() - wall_started, 3)
+    record["cpu_seconds"] = round(time.process_time() - cpu_started, 3)
+    record["threads"] = trial_threads()
+    return record
+
+
+def sample_params(space: Dict[str, Any], rng: np.random.Generator) -> Dict[str, Any]:
+    """Draw one configuration; plain values in ``space`` are kept fixed."""
+    return {name: spec.sample(rng) if hasattr(spec, "sample") else spec for name, spec in space.items()}
+
+
+def run_search(
+    objective: Objective,
+    space: Dict[str, Any],
+    config: Optional[SearchConfig] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Run random-search trials in parallel with median pruning.
+
+    Args:
+        objective: Picklable top-level callable ``(params, report) -> metrics``
+        space: Parameter name to ``Choice``/``Uniform``/``LogUniform`` or a fixed value
+        config: Search configuration
+
+    Returns:
+        One record per trial, in completion order
+    """
+    config = config or SearchConfig()
+    threads = max(1, config.threads_per_trial)
+    workers = config.workers or max(1, (os.cpu_count() or 1) // threads)
+    rng = np.random.default_rng(config.seed)
+    results_path = Path(config.results_path)
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Fresh interpreters, so thread limits apply before BLAS/torch spin up pools
+    context = multiprocessing.get_context("spawn")
+    records: List[Dict[str, Any]] = []
+    with context.Manager() as manager:
+        pruner = None
+        if config.prune:
+            pruner = MedianPruner(
+                manager.dict(), manager.Lock(), config.min_trials_before_pruning, config.warmup_steps,
+            )
+        logger.info(f"Searching {config.n_trials} trials on {workers} workers x {threads} threads")
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=limit_threads, initargs=(threads,)) as pool, \
+                open(results_path, "a", encoding="utf-8") as results:
+            pending: Dict[Future, int] = {}
+            submitted = 0
+            while submitted < config.n_trials or pending:
+                # Keep one trial per worker in flight so later trials see earlier reports
+                while submitted < config.n_trials and len(pending) < workers:
+                    params = sample_params(space, rng)
+                    pending[pool.submit(_run_trial, objective, submitted, params, pruner)] = submitted
+                    submitted += 1
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    trial = pending.pop(future)
+                    try:
+                        record = future.result()
+                    except Exception as e:
+                        record = {"trial": trial, "status": "failed", "error": f"{type(e).__name__}: {e}"}
+                    record["finished_at"] = datetime.utcnow().isoformat()
+                    results.write(json.dumps(record) + "\n")
+                    results.flush()
+                    records.append(record)
+                    logger.info(
+                        f"Trial {trial} {record['status']} in {record.get('wall_seconds', 0):.1f}s: "
+                        f"{record.get('metrics') or record.get('reason') or record.get('error')}"
+                    )
+    return records
+
+
+def best_trial(records: Sequence[Dict[str, Any]], metric: str = "accuracy") -> Optional[Dict[str, Any]]:
+    """Completed trial with the highest ``metric``; cheaper trials win ties."""
+    complete = [r for r in records if r.get("status") == "complete" and metric in r.get("metrics", {})]
+    if not complete:
+        return None
+    return max(complete, key=lambda r: (r["metrics"][metric], -r.get("wall_seconds", 0.0)))
+
+
+@lru_cache(maxsize=4)
+def _load_records(paths: Tuple[str, ...], validation_fraction: float, seed: int):
+    from training.data.streaming import iter_jsonl
+
+    records = [r for r in iter_jsonl(list(paths)) if r.get("text")]
+    order = np.random.default_rng(seed).permutation(len(records))
+    n_val = max(1, int(len(records) * validation_fraction))
+    return [records[i] for i in order[n_val:]], [records[i] for i in order[:n_val]]
+
+
+def linear_objective(
+    params: Dict[str, Any],
+    report: Callable[[int, float], None],
+    data: Sequence[str],
+    fractions: Sequence[float] = (0.25, 0.5, 1.0),
+    validation_fraction: float = 0.2,
+    seed: int = 42,
+) -> Dict[str, Any]:
+    """
+    Train the linear detector on growing slices of the training data.
+
+    Variant accuracy on a fixed validation split is reported after each
+    slice but the last, so weak configurations stop on a fraction of the data.
+    """
+    from training.automl.linear_training import LABEL_FIELDS, LinearTrainingConfig, train_linear_detector
+
+    train, validation = _load_records(tuple(data), validation_fraction, seed)
+    texts = [r["text"] for r in validation]
+    config = LinearTrainingConfig(test_size=0.0, seed=seed, **params)
+
+    def accuracy(detector, head: str) -> float:
+        predicted = getattr(detector, f"predict_{head}s")(texts)
+        expected = [r.get(LABEL_FIELDS[head]) for r in validation]
+        return float(np.mean([label.value == truth for (label, _), truth in zip(predicted, expected)]))
+
+    for step, fraction in enumerate(fractions):
+        detector, _ = train_linear_detector(train[:max(1, int(len(train) * fraction))], config)
+        if step < len(fractions) - 1:
+            report(step, accuracy(detector, "variant"))
+
+    variant_accuracy = accuracy(detector, "variant")
+    # Timed after a first pass, so token hashes are cached as in serving
+    started = time.perf_counter()
+    detector.predict_variants(texts)
+    us_per_text = (time.perf_counter() - started) / len(texts) * 1e6
+    weights = [detector.vocab, detector.idf, *detector.coef.values()]
+    return {
+        "accuracy": variant_accuracy,
+        "region_accuracy": accuracy(detector, "region"),
+        "vocab_size": int(len(detector.vocab)),
+        "model_mb": round(sum(array.nbytes for array in weights) / 2 ** 20, 3),
+        "us_per_text": round(us_per_text, 2),
+    }
+
+
+def hf_objective(params: Dict[str, Any], report: Callable[[int, float], None], data: Sequence[str]) -> Dict[str, Any]:
+    """Fine-tune a transformer classifier, reporting validation accuracy per epoch."""
+    from training.automl.huggingface_training import HFConfig, HFCulturalTrainer
+
+    config = HFConfig(
+        **params,
+        torch_threads=trial_threads(),
+        dataloader_workers=0,  # loader processes would exceed the trial's CPU budget
+        num_proc=1,
+        output_dir=f"./models/search/{os.getpid()}",
+    )
+    trainer = HFCulturalTrainer(config)
+    dataset = trainer.prepare_dataset_from_jsonl(list(data))
+    return trainer.train(dataset, on_epoch_end=report)
+
+
+OBJECTIVES = {
+    "linear": (linear_objective, LINEAR_SPACE),
+    "hf": (hf_objective, HF_SPACE),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Hyperparameter search for ANISA detectors")
+    parser.add_argument("data", nargs="+", help="JSONL shards or directories of training records")
+    parser.add_argument("--backend", choices=sorted(OBJECTIVES), default="linear")
+    parser.add_argument("--trials", type=int, default=SearchConfig.n_trials)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threads-per-trial", type=int, default=SearchConfig.threads_per_trial)
+    parser.add_argument("--results", default=SearchConfig.results_path)
+    parser.add_argument("--no-prune", action="store_true")
+    parser.add_argument("--seed", type=int, default=SearchConfig.seed)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    objective, space = OBJECTIVES[args.backend]
+    config = SearchConfig(
+        n_trials=args.trials,
+        workers=args.workers,
+        threads_per_trial=args.threads_per_trial,
+        prune=not args.no_prune,
+        seed=args.seed,
+        results_path=args.results,
+    )
+    records = run_search(partial(objective, data=tuple(args.data)), space, config)
+    best = best_trial(records)
+    counts = {status: sum(r["status"] == status for r in records) for status in ("complete", "pruned", "failed")}
+    print(f"Trials: {counts}; results in {config.results_path}")
+    if best:
+        print(f"Best trial {best['trial']}: {best['metrics']} with {best['params']}")
+
+
+if __name__ == "__main__":
+    main()
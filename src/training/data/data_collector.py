@@ -2,7 +2,8 @@
 """
 ANISA Training Data Collector
 
-Collects seed cultural training examples for quick-start fine-tuning.
+Collects seed cultural training examples for quick-start fine-tuning and
+streams larger corpora (database, request logs, exports) to sharded JSONL.
 """
 
 import json
@@ -10,7 +11,14 @@ import logging
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import Iterable, Iterator, List, Sequence, Union
+
+from training.data.streaming import (
+    JsonlShardWriter,
+    iter_database_examples,
+    iter_jsonl,
+    iter_request_log_examples,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -32,6 +40,9 @@ class CulturalDataCollector:
         (self.data_dir / "raw").mkdir(parents=True, exist_ok=True)
 
     def collect_initial_training_data(self) -> List[CulturalTrainingExample]:
+        return list(self.iter_initial_training_data())
+
+    def iter_initial_training_data(self) -> Iterator[CulturalTrainingExample]:
         now = datetime.utcnow().isoformat()
         examples: List[CulturalTrainingExample] = [
             # Ubuntu (West Africa)
@@ -114,7 +125,15 @@ class CulturalDataCollector:
                 created_at=now,
             ),
         ]
-        return examples
+        yield from examples
+
+    def iter_database_data(self, session_factory=None, chunk_size: int = 5000) -> Iterator[dict]:
+        """Stream stored analyses from the database as training examples."""
+        return iter_database_examples(session_factory, chunk_size=chunk_size)
+
+    def iter_request_log_data(self, log_paths: Union[str, Path, Sequence[Union[str, Path]]]) -> Iterator[dict]:
+        """Stream examples from stored JSONL request logs, keyword-labelled where unlabelled."""
+        return iter_request_log_examples(log_paths)
 
     def save_training_data(self, examples: List[CulturalTrainingExample], filename: str = "initial_training_data") -> Path:
         out_path = self.data_dir / "raw" / f"{filename}.json"
@@ -123,6 +142,36 @@ class CulturalDataCollector:
         logger.info("Saved %d examples to %s", len(examples), out_path)
         return out_path
 
+    def stream_training_data(
+        self,
+        examples: Iterable[Union[CulturalTrainingExample, dict]],
+        name: str = "training_data",
+        max_records_per_shard: int = 100_000,
+        compress: bool = False,
+    ) -> List[Path]:
+        """Write examples to sharded JSONL under ``raw/<name>/`` in constant memory.
+
+        Args:
+            examples: Any iterable of examples; consumed lazily.
+            name: Dataset directory name under ``raw/``.
+            max_records_per_shard: Records per shard file.
+            compress: Gzip the shards.
+
+        Returns:
+            Paths of the written shards, in order.
+        """
+        with JsonlShardWriter(
+            self.data_dir / "raw" / name,
+            max_records_per_shard=max_records_per_shard,
+            compress=compress,
+        ) as writer:
+            writer.write_all(examples)
+        return writer.paths
+
+    def iter_training_data(self, name: str = "training_data") -> Iterator[dict]:
+        """Stream examples back from the shards written by ``stream_training_data``."""
+        return iter_jsonl(self.data_dir / "raw" / name)
+
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+ANISA Near-Duplicate Removal
+
+MinHash signatures over character shingles with banded locality-sensitive
+hashing. Records are deduplicated in a single streaming pass over sharded
+JSONL: signatures are computed across a process pool, and the first record
+of every near-duplicate cluster is kept in input order.
+"""
+
+import logging
+import os
+import re
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from training.data.streaming import JsonlShardWriter, iter_jsonl
+
+
+logger = logging.getLogger(__name__)
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+# np.trapezoid replaces np.trapz, which NumPy 2 no longer provides
+_trapezoid = getattr(np, "trapezoid", None) or np.trapz
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class DedupConfig:
+    threshold: float = 0.85  # estimated Jaccard similarity treated as duplicate
+    num_perm: int = 128
+    shingle_size: int = 5
+    seed: int = 1
+    workers: int = max(1, (os.cpu_count() or 2) - 1)
+    batch_size: int = 2000  # records per signature task
+    text_field: str = "text"
+    verify: bool = True  # confirm LSH candidates against stored signatures
+
+
+@dataclass
+class DedupStats:
+    seen: int = 0
+    kept: int = 0
+    dropped: int = 0
+    seconds: float = 0.0
+
+    @property
+    def drop_ratio(self) -> float:
+        return self.dropped / self.seen if self.seen else 0.0
+
+
+def shingle_hashes(text: str, k: int = 5) -> np.ndarray:
+    """32-bit hashes of the normalised character k-shingles of ``text``."""
+    norm = _WHITESPACE.sub(" ", text.lower()).strip()
+    if len(norm) <= k:
+        shingles = {norm}
+    else:
+        shingles = {norm[i:i + k] for i in range(len(norm) - k + 1)}
+    # crc32 rather than hash(): signatures must agree across worker processes
+    return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+@lru_cache(maxsize=8)
+def _permutations(num_perm: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+    b = rng.randint(0, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash_signature(text: str, num_perm: int = 128, shingle_size: int = 5, seed: int = 1) -> np.ndarray:
+    """MinHash signature (``uint32[num_perm]``) of one text."""
+    a, b = _permutations(num_perm, seed)
+    hashes = shingle_hashes(text, shingle_size)
+    with np.errstate(over="ignore"):
+        permuted = (np.outer(a, hashes) + b[:, None]) % MERSENNE_PRIME & MAX_HASH
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def signature_batch(texts: Sequence[str], num_perm: int, shingle_size: int, seed: int) -> np.ndarray:
+    """Signatures for a batch of texts; runs in worker processes."""
+    out = np.empty((len(texts), num_perm), dtype=np.uint32)
+    for i, text in enumerate(texts):
+        out[i] = minhash_signature(text or "", num_perm, shingle_size, seed)
+    return out
+
+
+def optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """Choose (bands, rows) minimising false positives plus false negatives at ``threshold``."""
+    def collision(s, bands, rows):
+        return 1.0 - (1.0 - s ** rows) ** bands
+
+    below = np.linspace(0.0, threshold, 101)
+    above = np.linspace(threshold, 1.0, 101)
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            false_pos = _trapezoid(collision(below, bands, rows), below)
+            false_neg = _trapezoid(1.0 - collision(above, bands, rows), above)
+            if false_pos + false_neg < best_error:
+                best, best_error = (bands, rows), false_pos + false_neg
+    return best
+
+
+class MinHashLSH:
+    """
+    Banded LSH index over kept signatures.
+
+    ``insert_if_new`` returns the id of a matching kept record, or inserts
+    the signature and returns ``None``.
+    """
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 128, verify: bool = True):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.verify = verify
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+        self._tables: List[Dict[int, int]] = [{} for _ in range(self.bands)]
+        self._signatures = np.empty((1024, num_perm), dtype=np.uint32) if verify else None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _band_keys(self, signature: np.ndarray) -> List[int]:
+        r = self.rows
+        return [hash(signature[i * r:(i + 1) * r].tobytes()) for i in range(self.bands)]
+
+    def insert_if_new(self, signature: np.ndarray) -> Optional[int]:
+        keys = self._band_keys(signature)
+        checked = set()
+        for table, key in zip(self._tables, keys):
+            match = table.get(key)
+            if match is None or match in checked:
+                continue
+            if not self.verify:
+                return match
+            checked.add(match)
+            if np.mean(self._signatures[match] == signature) >= self.threshold:
+                return match
+
+        doc_id = self._size
+        if self.verify:
+            if doc_id == len(self._signatures):
+                self._signatures = np.resize(self._signatures, (2 * doc_id, self.num_perm))
+            self._signatures[doc_id] = signature
+        for table, key in zip(self._tables, keys):
+            table.setdefault(key, doc_id)
+        self._size += 1
+        return None
+
+
+class NearDuplicateFilter:
+    """Streaming MinHash LSH deduplication of training records."""
+
+    def __init__(self, config: Optional[DedupConfig] = None):
+        self.config = config or DedupConfig()
+        self.stats = DedupStats()
+
+    def _batches(self, records: Iterable[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        batch: List[Dict[str, Any]] = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= self.config.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _signed_batches(self, records: Iterable[Dict[str, Any]]) -> Iterator[Tuple[List[Dict[str, Any]], np.ndarray]]:
+        """Yield (records, signatures) in input order, computing signatures in parallel."""
+        config = self.config
+        args = (config.num_perm, config.shingle_size, config.seed)
+        field = config.text_field
+
+        if config.workers <= 1:
+            for batch in self._batches(records):
+                yield batch, signature_batch([r.get(field) for r in batch], *args)
+            return
+
+        in_flight: Deque[Tuple[List[Dict[str, Any]], Future]] = deque()
+        with ProcessPoolExecutor(max_workers=config.workers) as pool:
+            for batch in self._batches(records):
+                in_flight.append((batch, pool.submit(signature_batch, [r.get(field) for r in batch], *args)))
+                # Bound read-ahead so memory stays flat on large corpora
+                if len(in_flight) >= 2 * config.workers:
+                    done, future = in_flight.popleft()
+                    yield done, future.result()
+            while in_flight:
+                done, future = in_flight.popleft()
+                yield done, future.result()
+
+    def filter(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield the first record of every near-duplicate cluster, in input order."""
+        config = self.config
+        index = MinHashLSH(config.threshold, config.num_perm, config.verify)
+        started = time.monotonic()
+        for batch, signatures in self._signed_batches(records):
+            for record, signature in zip(batch, signatures):
+                self.stats.seen += 1
+                if index.insert_if_new(signature) is None:
+                    self.stats.kept += 1
+                    yield record
+                else:
+                    self.stats.dropped += 1
+        self.stats.seconds = time.monotonic() - started
+        logger.info(
+            "Deduplicated %d records: kept %d, dropped %d (%.1f%%) in %.1fs",
+            self.stats.seen, self.stats.kept, self.stats.dropped, 100 * self.stats.drop_ratio, self.stats.seconds,
+        )
+
+    def dedup_shards(
+        self,
+        source: Union[str, Path, Sequence[Union[str, Path]]],
+        output_dir: Union[str, Path],
+        max_records_per_shard: int = 100_000,
+        compress: bool = False,
+    ) -> List[Path]:
+        """Deduplicate JSONL shards into a new sharded output directory."""
+        with JsonlShardWriter(output_dir, max_records_per_shard=max_records_per_shard, compress=compress) as writer:
+            writer.write_all(self.filter(iter_jsonl(source)))
+        return writer.paths
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+ANISA Analysis Exporter
+
+Streams stored cultural analyses into partitioned, compressed Parquet files
+for training-set construction and analytics. Rows are read through
+server-side cursors and written in bounded-size row groups, so memory stays
+flat regardless of table size.
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as pa_dataset
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except Exception:  # pragma: no cover
+    PYARROW_AVAILABLE = False
+
+from database import CulturalContext, CulturalInsight
+
+
+logger = logging.getLogger(__name__)
+
+EXPORT_TABLES = ("contexts", "insights")
+HIVE_NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+# Each distinct value holds an open Parquet writer until its table ends, so
+# only low-cardinality columns may become partition directories.
+PARTITION_COLUMNS = ("region", "variant", "language", "trade_context", "event_type")
+
+
+def _table_specs() -> Dict[str, Tuple[Any, "pa.Schema", Tuple[str, ...]]]:
+    """Source table, Arrow schema and JSON-encoded columns per export."""
+    return {
+        "contexts": (
+            CulturalContext.__table__,
+            pa.schema([
+                ("id", pa.int64()),
+                ("text", pa.string()),
+                ("language", pa.string()),
+                ("region", pa.string()),
+                ("variant", pa.string()),
+                ("confidence_score", pa.float32()),
+                ("cultural_markers", pa.string()),
+                ("trade_context", pa.string()),
+                ("lexicon_version", pa.string()),
+                ("created_at", pa.timestamp("us")),
+                ("updated_at", pa.timestamp("us")),
+            ]),
+            ("cultural_markers",),
+        ),
+        "insights": (
+            CulturalInsight.__table__,
+            pa.schema([
+                ("id", pa.int64()),
+                ("context_id", pa.int64()),
+                ("event_type", pa.string()),
+                ("cultural_factors", pa.string()),
+                ("compliance_factors", pa.string()),
+                ("communication_style", pa.string()),
+                ("decision_patterns", pa.string()),
+                ("recommendations", pa.string()),
+                ("trade_implications", pa.string()),
+                ("risk_factors", pa.string()),
+                ("authenticity_score", pa.float32()),
+                ("relevance_score", pa.float32()),
+                ("created_at", pa.timestamp("us")),
+            ]),
+            (
+                "cultural_factors", "compliance_factors", "communication_style", "decision_patterns",
+                "recommendations", "trade_implications", "risk_factors",
+            ),
+        ),
+    }
+
+
+@dataclass
+class ExportConfig:
+    output_dir: str = "exports"
+    tables: Sequence[str] = EXPORT_TABLES
+    partition_by: Sequence[str] = ("region", "event_type")
+    compression: str = "zstd"
+    row_group_size: int = 50_000
+    max_rows_per_file: int = 1_000_000
+    fetch_size: int = 10_000
+
+
+@dataclass
+class ExportResult:
+    table: str
+    rows: int = 0
+    files: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+
+class _PartitionWriter:
+    """Buffers rows for one partition and flushes them as row groups."""
+
+    def __init__(self, directory: Path, schema: "pa.Schema", config: ExportConfig):
+        self.directory = directory
+        self.schema = schema
+        self.config = config
+        self.buffer: Dict[str, List[Any]] = {name: [] for name in schema.names}
+        self.buffered = 0
+        self.file_rows = 0
+        self.part = 0
+        self.writer: Optional["pq.ParquetWriter"] = None
+        self.files: List[str] = []
+
+    def append(self, row: Dict[str, Any]) -> None:
+        for name in self.schema.names:
+            self.buffer[name].append(row.get(name))
+        self.buffered += 1
+        if self.buffered >= self.config.row_group_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.buffered:
+            return
+        if self.writer is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / f"part-{self.part:05d}.parquet"
+            self.writer = pq.ParquetWriter(str(path), self.schema, compression=self.config.compression)
+            self.files.append(str(path))
+        batch = pa.Table.from_pydict(self.buffer, schema=self.schema)
+        self.writer.write_table(batch, row_group_size=self.config.row_group_size)
+        self.file_rows += self.buffered
+        self.buffer = {name: [] for name in self.schema.names}
+        self.buffered = 0
+        if self.file_rows >= self.config.max_rows_per_file:
+            self.close()
+            self.part += 1
+            self.file_rows = 0
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+class AnalysisExporter:
+    """Export ANISA analysis tables to partitioned Parquet datasets."""
+
+    def __init__(self, config: Optional[ExportConfig] = None):
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow not available. Install: pip install pyarrow")
+        self.config = config or ExportConfig()
+        self._validate()
+
+    def _validate(self) -> None:
+        """Reject unknown tables and columns outside ``PARTITION_COLUMNS``."""
+        unknown_tables = [t for t in self.config.tables if t not in _table_specs()]
+        if unknown_tables:
+            raise ValueError(f"Unknown export tables: {unknown_tables}")
+        unknown_columns = [c for c in self.config.partition_by if c not in PARTITION_COLUMNS]
+        if unknown_columns:
+            raise ValueError(
+                f"Unsupported partition columns: {unknown_columns} (choose from {list(PARTITION_COLUMNS)})"
+            )
+
+    def _partition_dir(self, root: Path, row: Dict[str, Any], columns: Sequence[str]) -> Path:
+        path = root
+        for column in columns:
+            value = row.get(column)
+            segment = quote(str(value), safe="") if value not in (None, "") else HIVE_NULL_PARTITION
+            path = path / f"{column}={segment}"
+        return path
+
+    def _stream_rows(self, db: Session, table) -> Iterator[Dict[str, Any]]:
+        """Yield rows via a server-side cursor in fetch_size chunks."""
+        stmt = select(table).order_by(table.c.id)
+        result = db.execute(stmt.execution_options(stream_results=True, yield_per=self.config.fetch_size))
+        for partition in result.mappings().partitions(self.config.fetch_size):
+            for row in partition:
+                yield row
+
+    def export_table(self, db: Session, table_name: str) -> ExportResult:
+        """Export one table (``contexts`` or ``insights``)."""
+        specs = _table_specs()
+        if table_name not in specs:
+            raise ValueError(f"Unknown export table: {table_name}")
+        table, schema, json_columns = specs[table_name]
+
+        # Partition columns present in this table become Hive directories
+        # and are dropped from the file schema. Columns of other exported
+        # tables (e.g. event_type for contexts) do not apply here.
+        partition_columns = [c for c in self.config.partition_by if c in schema.names]
+        file_schema = pa.schema([f for f in schema if f.name not in partition_columns])
+
+        started = datetime.utcnow()
+        root = Path(self.config.output_dir) / table_name
+        writers: Dict[Path, _PartitionWriter] = {}
+        result = ExportResult(table=table_name)
+
+        try:
+            for source_row in self._stream_rows(db, table):
+                row = dict(source_row)
+                for column in json_columns:
+                    if row.get(column) is not None:
+                        row[column] = json.dumps(row[column], ensure_ascii=False)
+                directory = self._partition_dir(root, row, partition_columns)
+                writer = writers.get(directory)
+                if writer is None:
+                    writer = writers[directory] = _PartitionWriter(directory, file_schema, self.config)
+                writer.append(row)
+                result.rows += 1
+        except BaseException:
+            self._close_writers(writers, result)
+            raise
+        error = self._close_writers(writers, result)
+        if error is not None:
+            raise error
+
+        result.seconds = (datetime.utcnow() - started).total_seconds()
+        logger.info("Exported %d %s rows to %d files in %.1fs", result.rows, table_name, len(result.files), result.seconds)
+        return result
+
+    @staticmethod
+    def _close_writers(writers: Dict[Path, _PartitionWriter], result: ExportResult) -> Optional[Exception]:
+        """Flush and close every writer, returning the first flush error."""
+        error: Optional[Exception] = None
+        for writer in writers.values():
+            try:
+                writer.flush()
+            except Exception as exc:
+                logger.error("Failed to flush %s: %s", writer.directory, exc)
+                error = error or exc
+            finally:
+                writer.close()
+            result.files.extend(writer.files)
+        return error
+
+    def export(self, db: Session) -> List[ExportResult]:
+        """Export every configured table."""
+        return [self.export_table(db, name) for name in self.config.tables]
+
+
+def iter_training_examples(export_dir: str, batch_size: int = 10_000) -> Iterator[Dict[str, Any]]:
+    """Stream exported contexts as training examples for ``HFCulturalTrainer``.
+
+    Yields dicts with ``text``, ``cultural_context``, ``region`` and
+    ``trade_context`` keys, reading Parquet in record batches.
+    """
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow not available. Install: pip install pyarrow")
+    dataset = pa_dataset.dataset(str(Path(export_dir) / "contexts"), format="parquet", partitioning="hive")
+    columns = ["text", "variant", "region", "trade_context"]
+    for batch in dataset.to_batches(columns=columns, batch_size=batch_size):
+        data = batch.to_pydict()
+        for text, variant, region, trade_context in zip(data["text"], data["variant"], data["region"], data["trade_context"]):
+            yield {
+                "text": text,
+                "cultural_context": variant,
+                "region": region,
+                "trade_context": trade_context,
+            }
+
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+ANISA Streaming Training Data
+
+Constant-memory readers, writers and sources for training examples stored
+as sharded JSONL. Every stage works on iterators, so corpora larger than
+RAM flow from the database or request logs straight into shards.
+"""
+
+import gzip
+import io
+import json
+import logging
+from dataclasses import asdict, is_dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, Path]
+
+MANIFEST_NAME = "manifest.json"
+
+
+def _open_text(path: Path, mode: str) -> io.TextIOBase:
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class JsonlShardWriter:
+    """
+    Write records to numbered JSONL shards of bounded size.
+
+    Shards are named ``<prefix>-00000.jsonl`` (``.jsonl.gz`` when compressed)
+    and a ``manifest.json`` listing shards and record counts is written on
+    close. Use as a context manager.
+    """
+
+    def __init__(
+        self,
+        output_dir: PathLike,
+        prefix: str = "shard",
+        max_records_per_shard: int = 100_000,
+        compress: bool = False,
+    ):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.max_records_per_shard = max_records_per_shard
+        self.compress = compress
+        self.shards: List[Dict[str, Any]] = []
+        self.total = 0
+        self._handle: Optional[io.TextIOBase] = None
+        self._shard_records = 0
+        # Stale shards from an earlier, larger run would otherwise be re-read
+        for stale in self.output_dir.glob(f"{prefix}-*.jsonl*"):
+            stale.unlink()
+
+    def _next_shard(self) -> None:
+        self._close_shard()
+        suffix = ".jsonl.gz" if self.compress else ".jsonl"
+        path = self.output_dir / f"{self.prefix}-{len(self.shards):05d}{suffix}"
+        self._handle = _open_text(path, "w")
+        self.shards.append({"path": path.name, "records": 0})
+        self._shard_records = 0
+
+    def _close_shard(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+            self.shards[-1]["records"] = self._shard_records
+
+    def write(self, record: Any) -> None:
+        """Append one record (dict or dataclass)."""
+        if is_dataclass(record):
+            record = asdict(record)
+        if self._handle is None or self._shard_records >= self.max_records_per_shard:
+            self._next_shard()
+        self._handle.write(json.dumps(record, ensure_ascii=False, default=str))
+        self._handle.write("\n")
+        self._shard_records += 1
+        self.total += 1
+
+    def write_all(self, records: Iterable[Any]) -> int:
+        """Stream an iterable of records into shards."""
+        count = 0
+        for record in records:
+            self.write(record)
+            count += 1
+        return count
+
+    def close(self) -> List[Path]:
+        """Close the current shard and write the manifest."""
+        self._close_shard()
+        manifest = {
+            "created_at": datetime.utcnow().isoformat(),
+            "total_records": self.total,
+            "shards": self.shards,
+        }
+        with open(self.output_dir / f"{self.prefix}-{MANIFEST_NAME}", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        logger.info("Wrote %d records to %d shards in %s", self.total, len(self.shards), self.output_dir)
+        return self.paths
+
+    @property
+    def paths(self) -> List[Path]:
+        return [self.output_dir / shard["path"] for shard in self.shards]
+
+    def __enter__(self) -> "JsonlShardWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def resolve_shards(source: Union[PathLike, Sequence[PathLike]]) -> List[Path]:
+    """Expand a file, directory or list of either into ordered shard paths."""
+    sources = [source] if isinstance(source, (str, Path)) else list(source)
+    paths: List[Path] = []
+    for item in sources:
+        path = Path(item)
+        if path.is_dir():
+            paths.extend(sorted(p for p in path.iterdir() if p.name.endswith((".jsonl", ".jsonl.gz"))))
+        else:
+            paths.append(path)
+    return paths
+
+
+def iter_jsonl(source: Union[PathLike, Sequence[PathLike]]) -> Iterator[Dict[str, Any]]:
+    """Stream records from JSONL shards one line at a time."""
+    for path in resolve_shards(source):
+        with _open_text(path, "r") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping malformed line %d in %s", line_no, path)
+
+
+def iter_database_examples(session_factory=None, chunk_size: int = 5000) -> Iterator[Dict[str, Any]]:
+    """Stream stored analyses from ``anisa_cultural_contexts`` as training examples.
+
+    Rows are read in keyset order, one chunk per short-lived query, so the
+    database never holds a long transaction open.
+    """
+    from sqlalchemy import select
+    from database import CulturalContext, SessionLocal
+
+    session_factory = session_factory or SessionLocal
+    last_id = 0
+    while True:
+        db = session_factory()
+        try:
+            rows = db.execute(
+                select(
+                    CulturalContext.id,
+                    CulturalContext.text,
+                    CulturalContext.variant,
+                    CulturalContext.region,
+                    CulturalContext.trade_context,
+                    CulturalContext.created_at,
+                )
+                .where(CulturalContext.id > last_id)
+                .order_by(CulturalContext.id)
+                .limit(chunk_size)
+            ).all()
+        finally:
+            db.close()
+        if not rows:
+            return
+        for row in rows:
+            yield {
+                "text": row.text,
+                "cultural_context": row.variant,
+                "region": row.region,
+                "trade_context": row.trade_context or "general",
+                "source": "database",
+                "created_at": row.created_at.isoformat() if row.created_at else None,
+            }
+        last_id = rows[-1].id
+
+
+def _request_text(record: Dict[str, Any]) -> Optional[str]:
+    """Find the query text in a logged request (flat or nested under body/json)."""
+    for key in ("text", "query", "query_text"):
+        if isinstance(record.get(key), str):
+            return record[key]
+    for key in ("body", "json", "payload"):
+        nested = record.get(key)
+        if isinstance(nested, dict):
+            text = _request_text(nested)
+            if text:
+                return text
+    return None
+
+
+def iter_request_log_examples(
+    source: Union[PathLike, Sequence[PathLike]],
+    labeler: Optional[Callable[[str], Dict[str, str]]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Stream training examples from stored JSONL request logs.
+
+    Records without region/variant labels are labelled with ``labeler``
+    (defaults to the keyword engine) so production traffic can be used as
+    weakly supervised training data.
+    """
+    if labeler is None:
+        labeler = keyword_labeler()
+    for record in iter_jsonl(source):
+        text = _request_text(record)
+        if not text:
+            continue
+        labels = {}
+        if not (record.get("cultural_context") and record.get("region")):
+            labels = labeler(text)
+        yield {
+            "text": text,
+            "cultural_context": record.get("cultural_context") or labels.get("cultural_context"),
+            "region": record.get("region") or labels.get("region"),
+            "trade_context": record.get("trade_context") or "general",
+            "source": "request_log",
+            "created_at": record.get("timestamp") or record.get("created_at"),
+        }
+
+
+def keyword_labeler() -> Callable[[str], Dict[str, str]]:
+    """Label texts with the keyword detectors of the authentication service."""
+    from services.authentication import CulturalAuthenticationService
+
+    service = CulturalAuthenticationService()
+
+    def label(text: str) -> Dict[str, str]:
+        return {
+            "cultural_context": service.detect_cultural_variant(text).value,
+            "region": service.detect_cultural_region(text).value,
+        }
+
+    return label
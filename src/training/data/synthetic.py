@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+ANISA Synthetic Corpus Generator
+
+Produces large, reproducible corpora of multilingual trade queries for
+benchmarks, load tests and cache-effectiveness tests.
+
+Queries mix region keywords, variant markers, compliance vocabulary and
+dialect tokens taken from the live ``CulturalAuthenticationService``
+lexicon, wrapped in per-language sentence frames. Length, language mix,
+duplicate rate (with Zipf-skewed popularity, as in real traffic) and the
+share of queries with no cultural signal are configurable. Every record
+carries the labels it was generated from.
+"""
+
+import argparse
+import logging
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from training.data.streaming import JsonlShardWriter
+
+logger = logging.getLogger(__name__)
+
+# Share of each supported language in the default mix
+DEFAULT_LANGUAGE_WEIGHTS = {"en": 0.55, "es": 0.12, "fr": 0.10, "ar": 0.08, "zh": 0.08, "hi": 0.07}
+
+DEFAULT_REGION_WEIGHTS = {
+    "west_africa": 0.30,
+    "south_asia": 0.15,
+    "east_asia": 0.15,
+    "latin_america": 0.15,
+    "middle_east": 0.10,
+    "north_america": 0.075,
+    "europe": 0.075,
+}
+
+# Variant usually expressed by queries from each region
+REGION_VARIANTS = {
+    "west_africa": "ubuntu",
+    "south_asia": "jugaad",
+    "east_asia": "guanxi",
+    "latin_america": "jeitinho",
+    "middle_east": "wasta",
+    "north_america": "individualism",
+    "europe": "collectivism",
+}
+
+COMMODITIES = ["gold", "coffee", "copper", "cotton", "cashew nuts", "tin ore", "timber", "shea butter"]
+
+# Phrases the language service recognises as West African dialects
+DIALECT_PHRASES = {
+    "pidgin": ["Una dey hear me?", "Dem wey dey work for site dey wait.", "Wetin una go do?"],
+    "yoruba": ["Ẹ ṣe gan ni.", "Ọ̀rọ̀ yìí wà fún gbogbo wa."],
+}
+
+# Frames for queries carrying a cultural signal; short frames are used for very short targets
+SIGNAL_FRAMES = {
+    "en": [
+        "How should {marker} shape our approach to {compliance} in {place}?",
+        "We need {compliance} before the {commodity} leaves {place}.",
+        "Our partners in {place} value {marker}. What does that mean for {compliance}?",
+        "Can {marker} help with {compliance} for {commodity} buyers in {place}?",
+    ],
+    "fr": [
+        "Comment {marker} influence-t-il {compliance} à {place} ?",
+        "Nous avons besoin de {compliance} avant que le {commodity} quitte {place}.",
+        "Nos partenaires à {place} tiennent à {marker}. Quel impact sur {compliance} ?",
+    ],
+    "es": [
+        "¿Cómo afecta {marker} a {compliance} en {place}?",
+        "Necesitamos {compliance} antes de que el {commodity} salga de {place}.",
+        "Nuestros socios en {place} valoran {marker}. ¿Qué implica para {compliance}?",
+    ],
+    "ar": [
+        "كيف يؤثر {marker} على {compliance} في {place}؟",
+        "نحتاج إلى {compliance} قبل شحن {commodity} من {place}.",
+    ],
+    "zh": [
+        "在{place}，{marker}如何影响{compliance}？",
+        "{commodity}离开{place}之前，我们需要{compliance}。",
+    ],
+    "hi": [
+        "{place} में {marker} {compliance} को कैसे प्रभावित करता है?",
+        "{place} से {commodity} भेजने से पहले हमें {compliance} चाहिए।",
+    ],
+}
+SHORT_FRAMES = {
+    "en": "{marker} in {place}?",
+    "fr": "{marker} à {place} ?",
+    "es": "¿{marker} en {place}?",
+    "ar": "{marker} في {place}؟",
+    "zh": "{place}的{marker}？",
+    "hi": "{place} में {marker}?",
+}
+
+# Neutral sentences; any that contain lexicon keywords are dropped at runtime
+FILLER = {
+    "en": [
+        "The truck arrived late after rain on the highway.",
+        "Please send the latest price list for the next quarter.",
+        "Which route is cheaper for heavy cargo this month?",
+        "How many kilograms can fit in one container?",
+        "Is the depot open on Saturday?",
+        "The invoice total looks higher than last time.",
+        "Our driver needs a map of the northern road.",
+        "Can the boat carry more than ten tonnes?",
+        "Prices rose again at the market today.",
+        "The scale at the gate was broken this morning.",
+    ],
+    "fr": [
+        "Le camion est arrivé en retard après la pluie.",
+        "Quel est le prix du transport cette semaine ?",
+        "Le bateau part demain matin du port.",
+        "Combien de kilos tiennent dans une caisse ?",
+        "La route du nord est fermée ce soir.",
+    ],
+    "es": [
+        "El camión llegó tarde por la lluvia.",
+        "¿Cuál es el precio del transporte esta semana?",
+        "El barco sale mañana temprano del puerto.",
+        "¿Cuántos kilos caben en una caja?",
+        "La carretera del norte está cerrada hoy.",
+    ],
+    "ar": [
+        "وصلت الشاحنة متأخرة بسبب المطر.",
+        "ما هو سعر النقل هذا الأسبوع؟",
+        "تغادر السفينة الميناء صباح الغد.",
+        "كم كيلوغرامًا يتسع الصندوق؟",
+    ],
+    "zh": [
+        "卡车因为下雨晚到了。",
+        "这周的运输价格是多少？",
+        "船明天早上离港。",
+        "一个箱子能装多少公斤？",
+    ],
+    "hi": [
+        "बारिश की वजह से ट्रक देर से पहुंचा।",
+        "इस हफ्ते परिवहन की कीमत क्या है?",
+        "नाव कल सुबह बंदरगाह से निकलेगी।",
+        "एक डिब्बे में कितने किलो आते हैं?",
+    ],
+}
+
+
+def _place_name(keyword: str) -> str:
+    return keyword.upper() if len(keyword) <= 3 else keyword.title()
+
+
+def parse_weights(value: str) -> Dict[str, float]:
+    """``key=weight,...`` into normalised weights."""
+    weights = {}
+    for part in value.split(","):
+        key, _, weight = part.partition("=")
+        weights[key.strip()] = float(weight or 1)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError(f"Weights must be positive: {value}")
+    return {key: weight / total for key, weight in weights.items()}
+
+
+@dataclass
+class SyntheticCorpusConfig:
+    """Settings for a synthetic corpus."""
+    count: int = 100_000
+    seed: int = 0
+    languages: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_LANGUAGE_WEIGHTS))
+    regions: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_REGION_WEIGHTS))
+    median_chars: int = 160  # log-normal length distribution in characters
+    length_sigma: float = 0.9
+    min_chars: int = 20
+    max_chars: int = 5000
+    duplicate_rate: float = 0.2  # share of records repeating an earlier query (which keeps its labels)
+    zipf_a: float = 1.3  # popularity skew of repeated queries
+    duplicate_pool: int = 10_000  # earliest unique queries eligible for repeats
+    no_signal_rate: float = 0.1  # share of unique queries without any lexicon keyword
+    variant_mismatch_rate: float = 0.1  # signal queries using another region's variant
+    dialect_rate: float = 0.15  # West African queries with a dialect phrase
+    extra_signal_rate: float = 0.3  # chance each padding sentence carries more signal
+
+
+class SyntheticCorpusGenerator:
+    """
+    Reproducible generator of labelled synthetic queries.
+
+    The same config and seed always produce the same records.
+    """
+
+    def __init__(self, config: Optional[SyntheticCorpusConfig] = None, auth_service=None):
+        self.config = config or SyntheticCorpusConfig()
+        if auth_service is None:
+            from services.authentication import CulturalAuthenticationService
+            auth_service = CulturalAuthenticationService()
+        unknown = set(self.config.languages) - set(SIGNAL_FRAMES)
+        if unknown:
+            raise ValueError(f"No sentence frames for languages: {sorted(unknown)}")
+        unknown = set(self.config.regions) - set(REGION_VARIANTS)
+        if unknown:
+            raise ValueError(f"No cultural variants for regions: {sorted(unknown)}")
+
+        self.region_keywords = {region.value: keywords for region, keywords in auth_service.regional_keywords.items()}
+        self.variant_markers = {variant.value: markers for variant, markers in auth_service.cultural_markers.items()}
+        self.compliance_markers = {
+            context.value: markers for context, markers in auth_service.compliance_markers.items()
+        }
+        markers = {
+            term for table in (self.variant_markers, self.compliance_markers) for terms in table.values() for term in terms
+        }
+        lexicon = markers | {term for terms in self.region_keywords.values() for term in terms}
+        # Places are region keywords that are neither markers nor shared between regions
+        shared = {
+            term for region, terms in self.region_keywords.items() for other, other_terms in self.region_keywords.items()
+            if other != region for term in set(terms) & set(other_terms)
+        }
+        self.places = {
+            region: [term for term in terms if term not in markers and term not in shared] or terms
+            for region, terms in self.region_keywords.items()
+        }
+        lexicon.update(token for phrases in DIALECT_PHRASES.values() for phrase in phrases for token in phrase.lower().split())
+        self.filler = {
+            language: [sentence for sentence in sentences if not any(term in sentence.lower() for term in lexicon)]
+            for language, sentences in FILLER.items()
+        }
+        empty = [language for language in self.config.languages if not self.filler.get(language)]
+        if empty:
+            raise ValueError(f"Every filler sentence contains a lexicon keyword for: {empty}")
+
+    def _pick(self, rng: np.random.Generator, items):
+        return items[int(rng.integers(len(items)))]
+
+    def _weighted(self, rng: np.random.Generator, weights: Dict[str, float]) -> str:
+        keys = list(weights)
+        return keys[int(rng.choice(len(keys), p=np.asarray([weights[k] for k in keys]) / sum(weights.values())))]
+
+    def _target_length(self, rng: np.random.Generator) -> int:
+        config = self.config
+        length = rng.lognormal(math.log(config.median_chars), config.length_sigma)
+        return int(min(max(length, config.min_chars), config.max_chars))
+
+    def _signal_sentence(self, rng, language: str, region: str, variant: str, trade_context: str, short: bool) -> str:
+        frame = SHORT_FRAMES[language] if short else self._pick(rng, SIGNAL_FRAMES[language])
+        return frame.format(
+            marker=self._pick(rng, self.variant_markers[variant]),
+            place=_place_name(self._pick(rng, self.places[region])),
+            compliance=self._pick(rng, self.compliance_markers[trade_context]),
+            commodity=self._pick(rng, COMMODITIES),
+        )
+
+    def _record(self, rng: np.random.Generator) -> Dict[str, Any]:
+        config = self.config
+        language = self._weighted(rng, config.languages)
+        target = self._target_length(rng)
+        joiner = "" if language == "zh" else " "
+        record: Dict[str, Any] = {
+            "language": language,
+            "region": None,
+            "variant": None,
+            "trade_context": None,
+            "dialect": None,
+            "has_signal": rng.random() >= config.no_signal_rate,
+        }
+
+        sentences: List[str] = []
+        if record["has_signal"]:
+            region = self._weighted(rng, config.regions)
+            variant = REGION_VARIANTS[region]
+            if rng.random() < config.variant_mismatch_rate:
+                variant = self._pick(rng, list(self.variant_markers))
+            trade_context = self._pick(rng, list(self.compliance_markers))
+            record.update(region=region, variant=variant, trade_context=trade_context)
+            sentences.append(self._signal_sentence(rng, language, region, variant, trade_context, short=target < 60))
+            if region == "west_africa" and rng.random() < config.dialect_rate:
+                record["dialect"] = self._pick(rng, list(DIALECT_PHRASES))
+                sentences.append(self._pick(rng, DIALECT_PHRASES[record["dialect"]]))
+
+        length = sum(len(s) for s in sentences) + len(joiner) * max(len(sentences) - 1, 0)
+        while length < target:
+            if record["has_signal"] and rng.random() < config.extra_signal_rate:
+                sentence = self._signal_sentence(
+                    rng, language, record["region"], record["variant"], record["trade_context"], short=False,
+                )
+            else:
+                filler = self.filler[language]
+                sentence = self._pick(rng, filler)
+                if len(filler) > 1 and sentences and sentence == sentences[-1]:
+                    sentence = filler[(filler.index(sentence) + 1) % len(filler)]
+            sentences.append(sentence)
+            length += len(sentence) + len(joiner)
+
+        text = joiner.join(sentences)
+        if len(text) > config.max_chars:
+            text = text[:config.max_chars].rstrip()
+        record["text"] = text
+        return record
+
+    def generate(self) -> Iterator[Dict[str, Any]]:
+        """Yield ``count`` records with ids, labels and duplicate links."""
+        config = self.config
+        rng = np.random.default_rng(config.seed)
+        pool: List[Dict[str, Any]] = []
+        for i in range(config.count):
+            if pool and rng.random() < config.duplicate_rate:
+                rank = int(rng.zipf(config.zipf_a)) - 1
+                original = pool[rank] if rank < len(pool) else self._pick(rng, pool)
+                yield {**original, "id": f"syn-{i:09d}", "duplicate_of": original["id"]}
+                continue
+            record = {"id": f"syn-{i:09d}", **self._record(rng), "duplicate_of": None}
+            if len(pool) < config.duplicate_pool:
+                pool.append(record)
+            yield record
+
+    def texts(self) -> List[str]:
+        """Just the query texts, in order."""
+        return [record["text"] for record in self.generate()]
+
+    def write(self, output_dir: str, max_records_per_shard: int = 100_000, compress: bool = False) -> List[Path]:
+        """
+        Write the corpus as sharded JSONL with a manifest.
+
+        Args:
+            output_dir: Directory for ``synthetic-00000.jsonl`` shards
+            max_records_per_shard: Records per shard
+            compress: Write gzip-compressed shards
+
+        Returns:
+            Shard paths
+        """
+        with JsonlShardWriter(output_dir, "synthetic", max_records_per_shard, compress) as writer:
+            writer.write_all(self.generate())
+        return writer.paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic ANISA query corpus")
+    parser.add_argument("--output", default="./training_data/synthetic", help="Shard directory")
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--languages", type=str, default=None, help="Language mix, e.g. en=0.7,fr=0.2,ar=0.1")
+    parser.add_argument("--regions", type=str, default=None, help="Region mix, e.g. west_africa=0.5,east_asia=0.5")
+    parser.add_argument("--median-chars", type=int, default=160)
+    parser.add_argument("--length-sigma", type=float, default=0.9)
+    parser.add_argument("--max-chars", type=int, default=5000)
+    parser.add_argument("--duplicate-rate", type=float, default=0.2)
+    parser.add_argument("--zipf-a", type=float, default=1.3, help="Popularity skew of duplicates (>1)")
+    parser.add_argument("--no-signal-rate", type=float, default=0.1)
+    parser.add_argument("--dialect-rate", type=float, default=0.15)
+    parser.add_argument("--shard-size", type=int, default=100_000)
+    parser.add_argument("--compress", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    config = SyntheticCorpusConfig(
+        count=args.count,
+        seed=args.seed,
+        median_chars=args.median_chars,
+        length_sigma=args.length_sigma,
+        max_chars=args.max_chars,
+        duplicate_rate=args.duplicate_rate,
+        zipf_a=args.zipf_a,
+        no_signal_rate=args.no_signal_rate,
+        dialect_rate=args.dialect_rate,
+    )
+    if args.languages:
+        config.languages = parse_weights(args.languages)
+    if args.regions:
+        config.regions = parse_weights(args.regions)
+    paths = SyntheticCorpusGenerator(config).write(args.output, args.shard_size, args.compress)
+    print(f"Wrote {config.count} synthetic queries to {len(paths)} shards in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+ANISA Pool Workers
+Per-process engine for the process-pool jobs (batch scoring, reprocessing).
+
+Each worker process builds one ``ANISACore`` when the pool starts it and
+reuses it for every work unit; the parent process owns interruption,
+checkpoints and output.
+"""
+
+import logging
+import signal
+
+# Worker-process state, created once per process
+_worker_core = None
+
+
+def _build_core() -> None:
+    global _worker_core
+    from core import ANISACore
+    from config import ANISAConfig
+    logging.getLogger("services").setLevel(logging.WARNING)
+    _worker_core = ANISACore(ANISAConfig.from_environment())
+
+
+def init_worker() -> None:
+    """Pool ``initializer``: build one ANISA engine per worker process."""
+    # The parent handles interruption; workers just score.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _build_core()
+
+
+def worker_core():
+    """This process's engine, built on first use when called outside a pool."""
+    if _worker_core is None:
+        _build_core()
+    return _worker_core
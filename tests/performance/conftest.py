@@ -0,0 +1,58 @@
+"""
+Shared fixtures for the pytest-benchmark suite.
+
+Run the suite twice and compare the best of both with the stored baseline:
+
+    pytest tests/performance --benchmark-json=run1.json
+    pytest tests/performance --benchmark-json=run2.json
+    python scripts/compare_benchmarks.py run1.json run2.json
+
+The baseline holds absolute timings from the CI runner; after a runner or
+Python change, regenerate it there from three or more runs with
+``--update-baseline``. The v2 API runs on an embedded SQLite database unless
+ANISA_DB_URL is set.
+"""
+
+import sys
+import os
+import asyncio
+import itertools
+import tempfile
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+# Must be set before `database` is first imported, which binds its engine
+os.environ.setdefault("ANISA_DB_URL", f"sqlite:///{tempfile.mkdtemp(prefix='anisa-bench-')}/anisa.db")
+# /api/v2/analyze forwards every analysis to Cortex; point it at a closed
+# local port so the forward fails fast instead of waiting on DNS
+os.environ.setdefault("CORTEX_URL", "http://127.0.0.1:9")
+
+import pytest
+
+from benchmark import BUILTIN_CORPUS
+
+SHORT_TEXT = BUILTIN_CORPUS[0]
+MEDIUM_TEXT = BUILTIN_CORPUS[-1]
+LONG_TEXT = " ".join(itertools.islice(itertools.cycle(BUILTIN_CORPUS), 100))[:5000]
+
+INPUTS = {"short": SHORT_TEXT, "medium": MEDIUM_TEXT, "long": LONG_TEXT}
+
+
+@pytest.fixture(params=list(INPUTS), ids=list(INPUTS))
+def text(request):
+    """Short, medium and 5000-character query texts."""
+    return INPUTS[request.param]
+
+
+@pytest.fixture(scope="session")
+def event_loop_runner():
+    """Run coroutines to completion on one loop shared by the whole session."""
+    loop = asyncio.new_event_loop()
+
+    def run(fn, *args, **kwargs):
+        return loop.run_until_complete(fn(*args, **kwargs))
+
+    run.loop = loop
+    yield run
+    loop.close()
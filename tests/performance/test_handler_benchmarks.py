@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+API Handler Benchmarks
+v1 and v2 endpoint timings through an in-process ASGI client.
+
+A handler that returns an error fails its benchmark instead of being timed,
+so error paths never end up in the baseline and a broken endpoint cannot
+silently drop out of it. Handler timings include the ASGI stack and
+database I/O, so they carry a wider regression tolerance than pure service
+calls.
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+httpx = pytest.importorskip("httpx")
+
+from conftest import INPUTS
+
+# Allowed relative slowdown for compare_benchmarks.py
+HANDLER_TOLERANCE = 0.75
+
+
+def _client(app, event_loop_runner):
+    try:
+        event_loop_runner(app.router.startup)
+    except Exception as e:
+        pytest.skip(f"App startup failed: {e}")
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://anisa")
+
+
+def _close(app, client, event_loop_runner):
+    event_loop_runner(client.aclose)
+    event_loop_runner(app.router.shutdown)
+
+
+@pytest.fixture(scope="module")
+def v1_client(event_loop_runner):
+    from api import app
+
+    client = _client(app, event_loop_runner)
+    yield client
+    _close(app, client, event_loop_runner)
+
+
+@pytest.fixture(scope="module")
+def v2_client(event_loop_runner):
+    from api_v2 import app
+
+    client = _client(app, event_loop_runner)
+    yield client
+    _close(app, client, event_loop_runner)
+
+
+def _bench(benchmark, event_loop_runner, client, method, path, **kwargs):
+    headers = {"X-API-Key": os.environ["ANISA_API_KEY"]} if os.getenv("ANISA_API_KEY") else {}
+    probe = event_loop_runner(client.request, method, path, headers=headers, **kwargs)
+    if probe.status_code >= 400:
+        pytest.fail(f"{method} {path} returns {probe.status_code}: {probe.text[:200]}")
+    benchmark.extra_info["tolerance"] = HANDLER_TOLERANCE
+    response = benchmark(event_loop_runner, client.request, method, path, headers=headers, **kwargs)
+    assert response.status_code < 400
+
+
+class TestV1Handlers:
+    """v1 API endpoints."""
+
+    def test_query(self, benchmark, v1_client, text, event_loop_runner):
+        benchmark.group = "v1 POST /api/v1/query"
+        _bench(benchmark, event_loop_runner, v1_client, "POST", "/api/v1/query", json={"text": text[:1000]})
+
+    def test_panx_analyze(self, benchmark, v1_client, text, event_loop_runner):
+        benchmark.group = "v1 POST /api/v1/panx/analyze"
+        _bench(benchmark, event_loop_runner, v1_client, "POST", "/api/v1/panx/analyze", json={"text": text[:2000]})
+
+
+class TestV2Handlers:
+    """v2 API endpoints."""
+
+    def test_analyze(self, benchmark, v2_client, text, event_loop_runner):
+        benchmark.group = "v2 POST /api/v2/analyze"
+        _bench(benchmark, event_loop_runner, v2_client, "POST", "/api/v2/analyze", json={"text": text})
+
+    def test_cultural_weights(self, benchmark, v2_client, event_loop_runner):
+        benchmark.group = "v2 POST /api/v2/panx/cultural_weights"
+        body = {
+            "event_type": "lot_verification",
+            "lot_id": "LOT-0001",
+            "validators": [f"validator-{i}" for i in range(5)],
+            "region": "west_africa",
+        }
+        _bench(benchmark, event_loop_runner, v2_client, "POST", "/api/v2/panx/cultural_weights", json=body)
+
+    def test_knowledge_search(self, benchmark, v2_client, event_loop_runner):
+        benchmark.group = "v2 GET /api/v2/knowledge/search"
+        query = INPUTS["short"].split()[-1].strip("?")
+        _bench(benchmark, event_loop_runner, v2_client, "GET", "/api/v2/knowledge/search", params={"q": query})
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Service Hot-Path Benchmarks
+Detection, authentication, language, intelligence and trade pipeline timings.
+"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from config import ANISAConfig
+from core import ANISACore
+from models import (
+    ComplianceLevel, CulturalRegion, GTCEcosystemComponent, GTCTradePhase, GTCTradeQuery, TradeContext,
+)
+
+
+@pytest.fixture(scope="module")
+def core():
+    return ANISACore(ANISAConfig())
+
+
+@pytest.fixture
+def context(core, text, event_loop_runner):
+    return event_loop_runner(core.detect_cultural_context, text, TradeContext.COMPLIANCE, ComplianceLevel.BASIC)
+
+
+class TestDetectionBenchmarks:
+    """Keyword region and variant detection."""
+
+    def test_detect_cultural_region(self, benchmark, core, text):
+        benchmark.group = "detect_cultural_region"
+        assert benchmark(core.auth_service.detect_cultural_region, text) in CulturalRegion
+
+    def test_detect_cultural_variant(self, benchmark, core, text):
+        benchmark.group = "detect_cultural_variant"
+        assert benchmark(core.auth_service.detect_cultural_variant, text) is not None
+
+
+class TestServiceBenchmarks:
+    """Per-stage service calls with a pre-detected context."""
+
+    def test_authenticate_cultural_context(self, benchmark, core, text, context, event_loop_runner):
+        benchmark.group = "authenticate_cultural_context"
+        result = benchmark(event_loop_runner, core.auth_service.authenticate_cultural_context, text, context)
+        assert 0.0 <= result.confidence_score <= 1.0
+
+    def test_process_native_language(self, benchmark, core, text, context, event_loop_runner):
+        benchmark.group = "process_native_language"
+        result = benchmark(event_loop_runner, core.language_service.process_native_language, text, context)
+        assert result is not None
+
+    def test_generate_intelligent_response(self, benchmark, core, text, context, event_loop_runner):
+        benchmark.group = "generate_intelligent_response"
+        auth = event_loop_runner(core.auth_service.authenticate_cultural_context, text, context)
+        understanding = event_loop_runner(core.language_service.process_native_language, text, context)
+        result = benchmark(
+            event_loop_runner, core.intelligence_service.generate_intelligent_response,
+            text, context, auth, understanding,
+        )
+        assert result.response_text
+
+
+class TestPipelineBenchmarks:
+    """End-to-end ANISACore entry points."""
+
+    def test_process_cultural_query(self, benchmark, core, text, event_loop_runner):
+        benchmark.group = "process_cultural_query"
+        assert benchmark(event_loop_runner, core.process_cultural_query, text).response_text
+
+    def test_process_gtcx_trade_query(self, benchmark, core, text, event_loop_runner):
+        benchmark.group = "process_gtcx_trade_query"
+        query = GTCTradeQuery(
+            query_text=text,
+            trade_phase=GTCTradePhase.COMPLIANCE_ASSESSMENT,
+            commodity_type="gold",
+            source_region=CulturalRegion.WEST_AFRICA,
+            destination_region=CulturalRegion.MIDDLE_EAST,
+            compliance_requirements=["OECD due diligence", "LBMA"],
+            cultural_considerations=["community consent"],
+            sovereignty_requirements={"data_residency": "local"},
+            community_stakeholders=["cooperative", "elders"],
+            gtcx_components=[GTCEcosystemComponent.PANX_ORACLE, GTCEcosystemComponent.GCI_COMPLIANCE],
+        )
+        assert benchmark(event_loop_runner, core.process_gtcx_trade_query, query).trade_recommendations is not None
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Allocation Tracking Tests
+Per-stage tracemalloc histograms, budgets and the core opt-in.
+"""
+
+import sys
+import os
+import asyncio
+import logging
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from allocations import BYTE_BUCKETS, AllocationTracker, Histogram
+from config import ANISAConfig
+from core import ANISACore
+
+
+class TestHistogram:
+    """Test the fixed-bucket histogram."""
+
+    def test_buckets_and_quantiles(self):
+        histogram = Histogram(BYTE_BUCKETS)
+        for value in [100] * 90 + [5000] * 9 + [10 ** 9]:
+            histogram.observe(value)
+
+        assert histogram.quantile(0.5) == 256
+        assert histogram.quantile(0.95) == 8192
+        assert histogram.summary()["max"] == 10 ** 9
+        assert histogram.buckets()[0] == [256, 90]
+        assert histogram.buckets()[-1] == ["+Inf", 100]
+
+
+class TestAllocationTracker:
+    """Test the stage hook."""
+
+    def test_records_stage_allocations(self):
+        with AllocationTracker() as tracker:
+            with tracker("build"):
+                kept = [object() for _ in range(5000)]
+            with tracker("noop"):
+                pass
+
+        summary = tracker.summary()["stages"]
+        assert summary["build"]["peak_bytes"]["max"] > 5000 * 16
+        assert summary["build"]["net_blocks"]["max"] >= 4000
+        assert summary["noop"]["peak_bytes"]["max"] < 4096
+        assert len(kept) == 5000
+
+    def test_logs_offenders_over_budget(self, caplog):
+        with AllocationTracker(budget_bytes=64 * 1024, top_lines=3) as tracker:
+            with caplog.at_level(logging.WARNING, logger="allocations"):
+                with tracker("small"):
+                    pass
+                with tracker("large"):
+                    blob = [bytearray(1024) for _ in range(200)]
+                del blob
+
+        assert tracker.offender_count == 1
+        offender = tracker.summary()["recent_offenders"][0]
+        assert offender["stage"] == "large"
+        assert any("test_allocations.py" in line for line in offender["top_lines"])
+        assert "Stage large allocated" in caplog.text
+
+    def test_core_opt_in(self):
+        assert ANISACore(ANISAConfig()).allocation_tracker is None
+
+        core = ANISACore(ANISAConfig(enable_allocation_tracking=True, allocation_budget_bytes=0))
+        try:
+            asyncio.run(core.process_cultural_query("We need to consult with the community elders."))
+            stages = core.get_performance_metrics()["allocations"]["stages"]
+            assert stages["context_detection"]["peak_bytes"]["count"] == 1
+            assert stages["intelligence"]["net_blocks"]["count"] == 1
+        finally:
+            core.allocation_tracker.stop()
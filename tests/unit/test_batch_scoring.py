@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Batch Scoring Tests
+Parallel JSONL scoring through the full pipeline.
+"""
+
+import sys
+import os
+import json
+import tempfile
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+# Must be set before `database` is first imported, which binds its engine
+os.environ.setdefault("ANISA_DB_URL", f"sqlite:///{tempfile.mkdtemp(prefix='anisa-test-')}/anisa.db")
+
+import pytest
+
+from batch_scoring import BatchConfig, BatchScoringJob, read_records
+
+
+QUERIES = [
+    "We need to consult with the community before mining",
+    "Build trust and relationships before the deal",
+    "Find a creative solution with limited resources",
+    "Use family connections to speed up the permit",
+]
+
+
+@pytest.fixture
+def input_path(tmp_path):
+    path = tmp_path / "input.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(18):
+            f.write(json.dumps({"id": i, "text": QUERIES[i % len(QUERIES)]}) + "\n")
+        f.write("{not json\n")
+        f.write(json.dumps({"id": 99}) + "\n")
+    return path
+
+
+def read_output(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+class TestReadRecords:
+    """Test input chunking."""
+
+    def test_chunks_and_marks_bad_lines(self, input_path):
+        chunks = list(read_records(str(input_path), chunk_size=8))
+        assert [len(c) for c in chunks] == [8, 8, 4]
+        assert "invalid JSON" in chunks[-1][2]["error"]
+
+
+class TestBatchScoringJob:
+    """Test parallel scoring and output ordering."""
+
+    def test_ordered_output_matches_input(self, input_path, tmp_path):
+        output = tmp_path / "out.jsonl"
+        config = BatchConfig(str(input_path), str(output), workers=2, chunk_size=4)
+        result = BatchScoringJob(config).run()
+
+        records = read_output(output)
+        assert result.processed == len(records) == 20
+        assert result.failed == 2
+        assert [r["id"] for r in records[:18]] == list(range(18))
+        assert records[0]["anisa"]["variant"] and 0.0 <= records[0]["anisa"]["authenticity_score"] <= 1.0
+        assert "missing 'text'" in records[-1]["error"]
+
+    def test_unordered_output_has_every_record(self, input_path, tmp_path):
+        output = tmp_path / "out.jsonl"
+        progress = []
+        config = BatchConfig(str(input_path), str(output), workers=2, chunk_size=3, ordered=False, progress_interval=0)
+        BatchScoringJob(config, on_progress=progress.append).run()
+
+        ids = sorted(r["id"] for r in read_output(output) if "id" in r)
+        assert ids == list(range(18)) + [99]
+        assert progress and progress[-1].processed == 20
+
+    def test_persist_stores_scored_records(self, input_path, tmp_path):
+        pytest.importorskip("sqlalchemy")
+        from sqlalchemy.orm import sessionmaker
+        from database import Base, CulturalContext, CulturalInsight, create_anisa_engine
+
+        engine = create_anisa_engine(f"sqlite:///{tmp_path / 'anisa.db'}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        config = BatchConfig(
+            str(input_path), str(tmp_path / "out.jsonl"), workers=2, chunk_size=4, persist=True, persist_batch_size=5,
+        )
+        BatchScoringJob(config, session_factory=session_factory).run()
+
+        with session_factory() as db:
+            contexts = db.query(CulturalContext).order_by(CulturalContext.id).all()
+            assert len(contexts) == 18
+            assert contexts[0].text == QUERIES[0]
+            assert contexts[0].lexicon_version is None
+            assert db.query(CulturalInsight).count() == 18
+            assert {i.context_id for i in db.query(CulturalInsight)} == {c.id for c in contexts}
+        engine.dispose()
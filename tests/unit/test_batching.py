@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Micro-Batching Tests
+Batch formation, result fan-out and error propagation.
+"""
+
+import sys
+import os
+import asyncio
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from batching import MicroBatcher
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestMicroBatcher:
+    """Test batching of concurrent submissions."""
+
+    def test_concurrent_requests_share_batches(self):
+        seen_batches = []
+
+        def infer(items):
+            seen_batches.append(len(items))
+            return [item * 2 for item in items]
+
+        async def scenario():
+            batcher = MicroBatcher(infer, max_batch_size=8, max_wait_ms=20)
+            await batcher.start()
+            results = await asyncio.gather(*(batcher.submit(i) for i in range(20)))
+            await batcher.stop()
+            return results, batcher.snapshot()
+
+        results, stats = run(scenario())
+        assert results == [i * 2 for i in range(20)]
+        assert max(seen_batches) == 8
+        assert stats["batches"] == len(seen_batches) < 20
+        assert stats["items"] == 20
+
+    def test_single_request_waits_at_most_max_wait(self):
+        async def scenario():
+            batcher = MicroBatcher(lambda items: items, max_batch_size=64, max_wait_ms=5)
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            result = await batcher.submit("x")
+            elapsed = loop.time() - started
+            await batcher.stop()
+            return result, elapsed
+
+        result, elapsed = run(scenario())
+        assert result == "x"
+        assert elapsed < 0.5
+
+    def test_errors_reach_every_waiter(self):
+        def infer(items):
+            raise ValueError("model failed")
+
+        async def scenario():
+            batcher = MicroBatcher(infer, max_batch_size=4, max_wait_ms=10)
+            await batcher.start()
+            results = await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+            await batcher.stop()
+            return results, batcher.stats.errors
+
+        results, errors = run(scenario())
+        assert all(isinstance(r, ValueError) for r in results)
+        assert errors >= 1
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Pipeline Benchmark Tests
+Stage hooks in ANISACore and the benchmark runner.
+"""
+
+import sys
+import os
+import asyncio
+from contextlib import contextmanager
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from benchmark import BenchConfig, StageTimer, latency_summary, run_benchmark
+from config import ANISAConfig
+from core import ANISACore
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestStageHooks:
+    """Test that pipeline stages are reported to hooks."""
+
+    def test_hooks_wrap_every_stage_in_order(self):
+        core = ANISACore(ANISAConfig())
+        events = []
+
+        def recorder(tag):
+            @contextmanager
+            def hook(stage):
+                events.append((tag, "enter", stage))
+                yield
+                events.append((tag, "exit", stage))
+            return hook
+
+        first, second = recorder("a"), recorder("b")
+        core.add_stage_hook(first)
+        core.add_stage_hook(second)
+        run(core.process_cultural_query("We need to consult with the community"))
+
+        stages = [stage for tag, kind, stage in events if tag == "a" and kind == "enter"]
+        assert stages == ["context_detection", "authentication", "native_language", "intelligence"]
+        assert events[:4] == [
+            ("a", "enter", "context_detection"), ("b", "enter", "context_detection"),
+            ("b", "exit", "context_detection"), ("a", "exit", "context_detection"),
+        ]
+
+        core.remove_stage_hook(first)
+        core.remove_stage_hook(second)
+        events.clear()
+        run(core.process_cultural_query("Build trust first"))
+        assert events == []
+
+
+class TestBenchmark:
+    """Test latency summaries and the benchmark runner."""
+
+    def test_latency_summary_percentiles(self):
+        summary = latency_summary([i / 1000 for i in range(1, 101)])
+        assert summary["count"] == 100
+        assert summary["p50_ms"] == 50.5
+        assert summary["max_ms"] == 100.0
+        assert latency_summary([]) == {"count": 0}
+
+    def test_stage_timer_records_durations(self):
+        timer = StageTimer()
+        with timer("authentication"):
+            pass
+        assert timer.summary()["authentication"]["count"] == 1
+
+    def test_run_benchmark_reports_stages(self):
+        core = ANISACore(ANISAConfig())
+        results = run(run_benchmark(core, ["Build trust first", "Community decides"], BenchConfig(count=20, warmup=2)))
+
+        assert results["queries"] == 20 and results["errors"] == 0
+        assert set(results["stages"]) == {"context_detection", "authentication", "native_language", "intelligence"}
+        assert all(s["count"] == 20 for s in results["stages"].values())
+        assert results["throughput_per_second"] > 0
+        assert not core._stage_hooks
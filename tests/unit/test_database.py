@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Database Tests
+Embedded SQLite (WAL) mode and batched inserts.
+"""
+
+import sys
+import io
+import os
+import tempfile
+import time
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+# Must be set before `database` is first imported, which binds its engine
+os.environ.setdefault("ANISA_DB_URL", f"sqlite:///{tempfile.mkdtemp(prefix='anisa-test-')}/anisa.db")
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import sessionmaker
+
+from database import KNOWLEDGE_TRGM_COLUMNS, SQLITE_PRAGMAS, Base, BatchWriter, CulturalContext, create_anisa_engine
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """SQLite engine on a file in a not-yet-existing directory."""
+    sqlite_engine = create_anisa_engine(f"sqlite:///{tmp_path / 'edge' / 'anisa.db'}")
+    yield sqlite_engine
+    sqlite_engine.dispose()
+
+
+def pragma(engine, name):
+    with engine.connect() as conn:
+        return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def make_context(i):
+    return CulturalContext(text=f"text {i}", region="west_africa", variant="ubuntu", confidence_score=0.5)
+
+
+class TestSQLiteEngine:
+    """Test the embedded SQLite engine."""
+
+    def test_creates_database_directory(self, engine, tmp_path):
+        Base.metadata.create_all(bind=engine)
+        assert (tmp_path / "edge" / "anisa.db").exists()
+
+    def test_wal_pragmas_applied(self, engine):
+        assert pragma(engine, "journal_mode") == "wal"
+        assert pragma(engine, "synchronous") == 1  # NORMAL
+        assert pragma(engine, "foreign_keys") == 1
+        assert pragma(engine, "temp_store") == 2  # MEMORY
+        assert pragma(engine, "busy_timeout") == SQLITE_PRAGMAS["busy_timeout"]
+        assert pragma(engine, "cache_size") == SQLITE_PRAGMAS["cache_size"]
+
+    def test_pragmas_applied_to_every_pooled_connection(self, engine):
+        with engine.connect() as first, engine.connect() as second:
+            for conn in (first, second):
+                assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+
+    def test_memory_database(self):
+        memory_engine = create_anisa_engine("sqlite:///:memory:")
+        try:
+            assert pragma(memory_engine, "foreign_keys") == 1
+        finally:
+            memory_engine.dispose()
+
+
+class TestBatchWriter:
+    """Test batched inserts."""
+
+    @pytest.fixture
+    def session_factory(self, engine):
+        Base.metadata.create_all(bind=engine)
+        return sessionmaker(bind=engine)
+
+    def count(self, session_factory):
+        with session_factory() as db:
+            return db.scalar(select(func.count()).select_from(CulturalContext))
+
+    def test_commits_full_batches(self, session_factory):
+        writer = BatchWriter(session_factory, batch_size=4, flush_interval=3600)
+        writer.add_all(make_context(i) for i in range(10))
+
+        assert writer.committed == 8
+        assert self.count(session_factory) == 8
+
+    def test_context_manager_flushes_tail(self, session_factory):
+        with BatchWriter(session_factory, batch_size=4, flush_interval=3600) as writer:
+            writer.add_all(make_context(i) for i in range(10))
+
+        assert writer.committed == 10
+        assert self.count(session_factory) == 10
+
+    def test_flush_interval(self, session_factory):
+        writer = BatchWriter(session_factory, batch_size=1000, flush_interval=0)
+        writer.add(make_context(0))
+
+        assert self.count(session_factory) == 1
+
+    def test_timer_flushes_quiet_writer(self, session_factory):
+        writer = BatchWriter(session_factory, batch_size=1000, flush_interval=0.05)
+        writer.add(make_context(0))
+
+        deadline = time.monotonic() + 5
+        while writer.committed == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert self.count(session_factory) == 1
+        assert writer.pending == 0
+
+    def test_failed_batch_is_rolled_back_and_kept(self, session_factory):
+        writer = BatchWriter(session_factory, batch_size=2, flush_interval=3600)
+        writer.add(make_context(0))
+        broken = CulturalContext(text=None, region="west_africa", variant="ubuntu", confidence_score=0.5)
+        with pytest.raises(Exception):
+            writer.add(broken)
+
+        assert self.count(session_factory) == 0
+        assert writer.pending == 2
+
+        broken.text = "fixed"
+        assert writer.flush() == 2
+        assert self.count(session_factory) == 2
+
+    def test_exit_on_error_keeps_original_exception(self, session_factory):
+        with pytest.raises(RuntimeError, match="scoring failed"):
+            with BatchWriter(session_factory, batch_size=1000, flush_interval=3600) as writer:
+                writer.add(CulturalContext(text=None, region="west_africa", variant="ubuntu", confidence_score=0.5))
+                raise RuntimeError("scoring failed")
+
+        assert writer.pending == 0
+        assert self.count(session_factory) == 0
+
+
+class TestMigrations:
+    """Test alembic revisions against databases created before them."""
+
+    @pytest.fixture
+    def alembic_config(self, tmp_path, monkeypatch):
+        alembic_command = pytest.importorskip("alembic.command")
+        from alembic.config import Config
+
+        root = os.path.join(os.path.dirname(__file__), '..', '..')
+        url = f"sqlite:///{tmp_path / 'deployed.db'}"
+        monkeypatch.setenv("ANISA_DB_URL", url)
+        # No ini file, so env.py leaves the test run's logging alone
+        config = Config()
+        config.set_main_option("script_location", os.path.join(root, "alembic"))
+        config.set_main_option("sqlalchemy.url", url)
+        return alembic_command, config, url
+
+    def test_adds_lexicon_version_to_existing_contexts(self, alembic_config):
+        alembic_command, config, url = alembic_config
+        deployed = create_anisa_engine(url)
+        with deployed.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE anisa_cultural_contexts (id INTEGER PRIMARY KEY, text TEXT NOT NULL, "
+                "language VARCHAR(10) NOT NULL, region VARCHAR(50) NOT NULL, variant VARCHAR(50) NOT NULL, "
+                "confidence_score FLOAT NOT NULL, cultural_markers JSON NOT NULL, trade_context VARCHAR(100), "
+                "created_at DATETIME NOT NULL, updated_at DATETIME)"
+            ))
+
+        alembic_command.upgrade(config, "head")
+
+        Base.metadata.create_all(bind=deployed)
+        with sessionmaker(bind=deployed)() as db:
+            db.add(make_context(0))
+            db.commit()
+            assert db.scalar(select(CulturalContext.lexicon_version)) is None
+        with deployed.connect() as conn:
+            indexes = {row[1] for row in conn.execute(text("PRAGMA index_list(anisa_cultural_contexts)"))}
+        assert "ix_anisa_cultural_contexts_lexicon_version" in indexes
+        deployed.dispose()
+
+    def test_fresh_database_is_left_to_init_db(self, alembic_config):
+        alembic_command, config, url = alembic_config
+        alembic_command.upgrade(config, "head")
+
+        fresh = create_anisa_engine(url)
+        Base.metadata.create_all(bind=fresh)
+        with sessionmaker(bind=fresh)() as db:
+            db.add(make_context(0))
+            db.commit()
+        fresh.dispose()
+
+    def test_lot_timeline_index_replaces_single_column_indexes(self, alembic_config):
+        alembic_command, config, url = alembic_config
+        deployed = create_anisa_engine(url)
+        with deployed.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE anisa_cultural_verifications (id INTEGER PRIMARY KEY, context_id INTEGER, "
+                "panx_event_id VARCHAR(100), lot_id VARCHAR(100), validators JSON, cultural_weights JSON NOT NULL, "
+                "consensus_adjustment FLOAT, verification_status VARCHAR(20), cultural_approval JSON, "
+                "community_feedback JSON, created_at DATETIME NOT NULL, verified_at DATETIME)"
+            ))
+            conn.execute(text("CREATE INDEX idx_lot_id ON anisa_cultural_verifications (lot_id)"))
+            conn.execute(text(
+                "CREATE INDEX ix_anisa_cultural_verifications_lot_id ON anisa_cultural_verifications (lot_id)"
+            ))
+
+        def indexes():
+            with deployed.connect() as conn:
+                return {row[1] for row in conn.execute(text("PRAGMA index_list(anisa_cultural_verifications)"))}
+
+        alembic_command.upgrade(config, "head")
+        assert "idx_lot_created" in indexes()
+        assert not indexes() & {"idx_lot_id", "ix_anisa_cultural_verifications_lot_id"}
+
+        alembic_command.downgrade(config, "8b1e5c03d6f2")
+        assert indexes() == {"idx_lot_id", "ix_anisa_cultural_verifications_lot_id"}
+        deployed.dispose()
+
+    def offline_sql(self, config, revision, dialect_name, direction="upgrade"):
+        """SQL a revision emits for a dialect in offline (--sql) mode."""
+        from alembic.operations import Operations
+        from alembic.runtime.migration import MigrationContext
+        from alembic.script import ScriptDirectory
+
+        module = ScriptDirectory.from_config(config).get_revision(revision).module
+        output = io.StringIO()
+        context = MigrationContext.configure(dialect_name=dialect_name, opts={"as_sql": True, "output_buffer": output})
+        with Operations.context(context):
+            getattr(module, direction)()
+        return output.getvalue()
+
+    def test_knowledge_trigram_indexes_on_postgres(self, alembic_config):
+        _, config, _ = alembic_config
+        upgrade = self.offline_sql(config, "8b1e5c03d6f2", "postgresql")
+        downgrade = self.offline_sql(config, "8b1e5c03d6f2", "postgresql", "downgrade")
+
+        assert "CREATE EXTENSION IF NOT EXISTS pg_trgm" in upgrade
+        for column in KNOWLEDGE_TRGM_COLUMNS:
+            assert (
+                f"CREATE INDEX IF NOT EXISTS idx_knowledge_{column}_trgm "
+                f"ON anisa_cultural_knowledge USING gin ({column} gin_trgm_ops)"
+            ) in upgrade
+            assert f"DROP INDEX IF EXISTS idx_knowledge_{column}_trgm" in downgrade
+
+    def test_knowledge_trigram_indexes_skipped_on_sqlite(self, alembic_config):
+        _, config, _ = alembic_config
+        assert self.offline_sql(config, "8b1e5c03d6f2", "sqlite").strip() == ""
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Removal Tests
+MinHash similarity estimates and streaming LSH deduplication.
+"""
+
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+import numpy as np
+
+from training.data.dedup import DedupConfig, NearDuplicateFilter, minhash_signature, optimal_bands
+from training.data.streaming import JsonlShardWriter, iter_jsonl
+
+
+BASE = "Benefits should be shared with the entire community, not just a few individuals."
+
+
+class TestMinHash:
+    """Test signatures and band selection."""
+
+    def test_signature_is_deterministic(self):
+        assert np.array_equal(minhash_signature(BASE), minhash_signature(BASE))
+
+    def test_similarity_estimate(self):
+        near = np.mean(minhash_signature(BASE) == minhash_signature(BASE + "!"))
+        far = np.mean(minhash_signature(BASE) == minhash_signature("Preserve face in all negotiations."))
+        assert near > 0.85
+        assert far < 0.2
+
+    def test_optimal_bands_fit_num_perm(self):
+        bands, rows = optimal_bands(0.85, 128)
+        assert bands * rows <= 128
+
+
+class TestNearDuplicateFilter:
+    """Test streaming deduplication."""
+
+    def test_keeps_first_of_each_cluster(self):
+        records = [
+            {"text": BASE, "i": 0},
+            {"text": BASE.upper(), "i": 1},
+            {"text": "Let's build relationships first before discussing business terms.", "i": 2},
+            {"text": BASE + "!", "i": 3},
+        ]
+        dedup = NearDuplicateFilter(DedupConfig(workers=1))
+        assert [r["i"] for r in dedup.filter(records)] == [0, 2]
+        assert dedup.stats.dropped == 2
+
+    def test_dedup_shards_in_parallel(self, tmp_path):
+        with JsonlShardWriter(tmp_path / "in", max_records_per_shard=5) as writer:
+            writer.write_all({"text": f"{BASE} {i % 3}" if i % 2 else f"unique text number {i} " * 3} for i in range(20))
+        dedup = NearDuplicateFilter(DedupConfig(workers=2, batch_size=4))
+        dedup.dedup_shards(tmp_path / "in", tmp_path / "out")
+        kept = list(iter_jsonl(tmp_path / "out"))
+        assert len(kept) == dedup.stats.kept < 20
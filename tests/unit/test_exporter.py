@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Analysis Exporter Tests
+Streaming Parquet export of stored analyses from an embedded SQLite database.
+"""
+
+import sys
+import os
+import tempfile
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+# Must be set before `database` is first imported, which binds its engine
+os.environ.setdefault("ANISA_DB_URL", f"sqlite:///{tempfile.mkdtemp(prefix='anisa-test-')}/anisa.db")
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, CulturalContext, CulturalInsight, create_anisa_engine
+from training.data import exporter
+from training.data.exporter import HIVE_NULL_PARTITION, AnalysisExporter, ExportConfig, iter_training_examples
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Sessions on an empty SQLite database."""
+    engine = create_anisa_engine(f"sqlite:///{tmp_path / 'anisa.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    """Session on a database holding a few stored analyses."""
+    session = session_factory()
+    contexts = [
+        CulturalContext(text="Ubuntu guides our cooperative", region="west_africa", variant="ubuntu",
+                        confidence_score=0.9, cultural_markers={"ubuntu": 1}, trade_context="compliance"),
+        CulturalContext(text="Elders approve the lot", region="west_africa", variant="ubuntu",
+                        confidence_score=0.8, cultural_markers={}, trade_context="compliance"),
+        CulturalContext(text="Guanxi opens doors", region="east_asia", variant="guanxi",
+                        confidence_score=0.7, cultural_markers={"guanxi": 1}, trade_context="export"),
+        CulturalContext(text="Neutral text", region="", variant="standard",
+                        confidence_score=0.1, cultural_markers={}, trade_context=None),
+    ]
+    session.add_all(contexts)
+    session.flush()
+    session.add_all([
+        CulturalInsight(context_id=contexts[0].id, event_type="lot_verification", cultural_factors={"consent": True},
+                        recommendations=["Engage elders"], authenticity_score=0.9),
+        CulturalInsight(context_id=contexts[2].id, event_type="export_permit", cultural_factors={},
+                        recommendations=[], authenticity_score=0.6),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+class TestAnalysisExporter:
+    """Test partitioned Parquet export."""
+
+    def test_export_writes_hive_partitions(self, db, tmp_path):
+        output = tmp_path / "exports"
+        results = AnalysisExporter(ExportConfig(output_dir=str(output))).export(db)
+
+        by_table = {result.table: result for result in results}
+        assert by_table["contexts"].rows == 4
+        assert by_table["insights"].rows == 2
+        assert len(by_table["contexts"].files) == 3
+        assert {p.name for p in (output / "contexts").iterdir()} == {
+            "region=west_africa", "region=east_asia", f"region={HIVE_NULL_PARTITION}",
+        }
+        assert {p.name for p in (output / "insights").iterdir()} == {
+            "event_type=lot_verification", "event_type=export_permit",
+        }
+
+    def test_parquet_round_trip(self, db, tmp_path):
+        output = tmp_path / "exports"
+        AnalysisExporter(ExportConfig(output_dir=str(output))).export(db)
+
+        table = pq.read_table(str(output / "contexts" / "region=west_africa"))
+        assert table.num_rows == 2
+        assert "region" not in table.column_names
+        assert sorted(table.column("text").to_pylist()) == ["Elders approve the lot", "Ubuntu guides our cooperative"]
+        assert '{"ubuntu": 1}' in table.column("cultural_markers").to_pylist()
+
+        dataset = pq.read_table(str(output / "insights"), partitioning="hive")
+        assert sorted(dataset.column("event_type").to_pylist()) == ["export_permit", "lot_verification"]
+
+    def test_training_examples_read_back(self, db, tmp_path):
+        output = tmp_path / "exports"
+        AnalysisExporter(ExportConfig(output_dir=str(output), tables=["contexts"])).export(db)
+
+        examples = list(iter_training_examples(str(output)))
+        assert len(examples) == 4
+        assert {e["cultural_context"] for e in examples} == {"ubuntu", "guanxi", "standard"}
+
+    def test_empty_table(self, session_factory, tmp_path):
+        session = session_factory()
+        try:
+            results = AnalysisExporter(ExportConfig(output_dir=str(tmp_path / "exports"))).export(session)
+        finally:
+            session.close()
+
+        assert [(r.table, r.rows, r.files) for r in results] == [("contexts", 0, []), ("insights", 0, [])]
+        assert not (tmp_path / "exports").exists()
+
+    def test_unpartitioned_export(self, db, tmp_path):
+        output = tmp_path / "exports"
+        result = AnalysisExporter(ExportConfig(output_dir=str(output), partition_by=[])).export_table(db, "contexts")
+
+        assert result.files == [str(output / "contexts" / "part-00000.parquet")]
+        assert pq.read_table(result.files[0]).num_rows == 4
+
+    def test_unknown_partition_column_rejected(self):
+        with pytest.raises(ValueError, match="lot_id"):
+            AnalysisExporter(ExportConfig(partition_by=["region", "lot_id"]))
+
+    def test_unknown_table_rejected(self):
+        with pytest.raises(ValueError, match="verifications"):
+            AnalysisExporter(ExportConfig(tables=["verifications"]))
+
+    @pytest.mark.parametrize("column", ["id", "text", "confidence_score", "created_at"])
+    def test_high_cardinality_partition_column_rejected(self, column):
+        with pytest.raises(ValueError, match="Unsupported partition columns"):
+            AnalysisExporter(ExportConfig(partition_by=[column]))
+
+    def test_all_writers_closed_when_a_flush_fails(self, db, tmp_path, monkeypatch):
+        closed = []
+        flush = exporter._PartitionWriter.flush
+        close = exporter._PartitionWriter.close
+
+        def failing_flush(writer):
+            if "west_africa" in str(writer.directory):
+                raise OSError("disk full")
+            flush(writer)
+
+        def recording_close(writer):
+            closed.append(writer.directory.name)
+            close(writer)
+
+        monkeypatch.setattr(exporter._PartitionWriter, "flush", failing_flush)
+        monkeypatch.setattr(exporter._PartitionWriter, "close", recording_close)
+        config = ExportConfig(output_dir=str(tmp_path / "exports"), partition_by=["region"])
+        with pytest.raises(OSError, match="disk full"):
+            AnalysisExporter(config).export_table(db, "contexts")
+
+        assert sorted(closed) == ["region=__HIVE_DEFAULT_PARTITION__", "region=east_asia", "region=west_africa"]
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Insight Index Tests
+Hashed embeddings, IVF retrieval, persistence and ANISACore integration.
+"""
+
+import sys
+import os
+import asyncio
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+import numpy as np
+
+from config import ANISAConfig
+from core import ANISACore
+from insight_index import HashedEmbedder, InsightIndex
+
+
+ENTRIES = [
+    {"text": "Community consent before mining decisions", "source": "knowledge", "variant": "ubuntu"},
+    {"text": "Build trust through long-term relationships", "source": "knowledge", "variant": "guanxi"},
+    {"text": "Creative workarounds for regulatory hurdles", "source": "knowledge", "variant": "jeitinho"},
+    {"text": "Use family connections and influence", "source": "knowledge", "variant": "wasta"},
+    {"text": "Frugal innovation under resource constraints", "source": "knowledge", "variant": "jugaad"},
+]
+
+
+class TestHashedEmbedder:
+    """Test embedding shape and similarity."""
+
+    def test_vectors_are_unit_length(self):
+        vectors = HashedEmbedder(128).embed(["community consent", "", "trust"])
+        assert vectors.shape == (3, 128) and vectors.dtype == np.float32
+        assert np.allclose(np.linalg.norm(vectors[[0, 2]], axis=1), 1.0)
+        assert not vectors[1].any()
+
+    def test_inflections_stay_close(self):
+        a, b, c = HashedEmbedder().embed(["relationships", "relationship building", "mining permits"])
+        assert a @ b > a @ c
+
+
+class TestInsightIndex:
+    """Test IVF search and memory-mapped persistence."""
+
+    def test_search_ranks_matching_entry_first(self):
+        index = InsightIndex.build(ENTRIES, n_lists=2, n_probe=2)
+        hits = index.search("trust relationships", k=2)
+        assert hits[0].text == "Build trust through long-term relationships"
+        assert hits[0].variant == "guanxi"
+        assert hits[0].score >= hits[-1].score
+
+    def test_probing_every_list_matches_exact_search(self):
+        rng = np.random.default_rng(0)
+        words = [f"w{i}" for i in range(300)]
+        entries = [{"text": " ".join(rng.choice(words, 6))} for _ in range(500)]
+        index = InsightIndex.build(entries, n_lists=16)
+        query = entries[7]["text"]
+        exact = index.search(query, k=5, n_probe=16)
+        assert exact[0].text == query
+        assert index.search(query, k=5, n_probe=4)[0].text == query
+
+    def test_save_and_load_memory_maps_vectors(self, tmp_path):
+        index = InsightIndex.build(ENTRIES, n_lists=2)
+        index.save(str(tmp_path / "index"))
+        loaded = InsightIndex.load(str(tmp_path / "index"))
+
+        assert isinstance(loaded.vectors, np.memmap)
+        assert len(loaded) == len(ENTRIES)
+        assert loaded.search("community mining")[0].text == ENTRIES[0]["text"]
+
+
+class TestCoreInsights:
+    """Test ANISACore.get_cultural_insights."""
+
+    def test_builtin_insights(self):
+        core = ANISACore(ANISAConfig())
+        insights = asyncio.run(core.get_cultural_insights("community"))
+        assert insights[0] == "Community-first approach"
+        assert asyncio.run(core.get_cultural_insights("zzzz")) == []
+
+    def test_saved_index(self, tmp_path):
+        InsightIndex.build(ENTRIES, n_lists=2).save(str(tmp_path / "index"))
+        core = ANISACore(ANISAConfig(insight_index_dir=str(tmp_path / "index")))
+        insights = asyncio.run(core.get_cultural_insights("frugal innovation", limit=1))
+        assert insights == ["Frugal innovation under resource constraints"]
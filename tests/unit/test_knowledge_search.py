@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Knowledge Search Tests
+In-process trigram index used by embedded deployments.
+"""
+
+import sys
+import os
+import tempfile
+from datetime import datetime
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+# Must be set before `database` is first imported, which binds its engine
+os.environ.setdefault("ANISA_DB_URL", f"sqlite:///{tempfile.mkdtemp(prefix='anisa-test-')}/anisa.db")
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, CulturalKnowledge, create_anisa_engine
+from knowledge_search import KnowledgeSearchIndex, trigrams
+
+
+@pytest.fixture
+def index():
+    """Small knowledge index."""
+    idx = KnowledgeSearchIndex()
+    idx.add(1, "wasta", "Connection-based access through family ties", None, "middle_east", "wasta", "concept")
+    idx.add(
+        2, "traditional authority", "Chiefs and elders who grant community consent",
+        "Required for artisanal mining approvals", "west_africa", "ubuntu", "governance"
+    )
+    idx.add(3, "guanxi", "Relationship networks built on trust", None, "east_asia", "guanxi", "concept")
+    return idx
+
+
+class TestTrigrams:
+    """Test trigram extraction."""
+
+    def test_pg_trgm_padding(self):
+        """Words are padded like pg_trgm."""
+        assert set(trigrams("Cat")) == {"  c", " ca", "cat", "at "}
+
+    def test_empty_text(self):
+        """Empty text has no trigrams."""
+        assert trigrams("") == []
+
+
+class TestKnowledgeSearchIndex:
+    """Test ranked fuzzy and prefix search."""
+
+    def test_exact_term_ranks_first(self, index):
+        results = index.search("wasta")
+        assert results[0].term == "wasta"
+
+    def test_fuzzy_term_match(self, index):
+        results = index.search("wsta")
+        assert [r.term for r in results] == ["wasta"]
+
+    def test_prefix_match(self, index):
+        results = index.search("tradition")
+        assert results[0].term == "traditional authority"
+        assert "term" in results[0].matched_fields
+
+    def test_definition_match(self, index):
+        results = index.search("elders")
+        assert results[0].id == 2
+        assert results[0].matched_fields == ["definition"]
+
+    def test_limit_and_ordering(self, index):
+        results = index.search("trust networks wasta", limit=2)
+        assert len(results) <= 2
+        assert all(a.score >= b.score for a, b in zip(results, results[1:]))
+
+    def test_no_match(self, index):
+        assert index.search("zzzz") == []
+
+    def test_add_after_search(self, index):
+        index.search("wasta")
+        index.add(4, "jeitinho", "Flexible workaround", None, "latin_america", "jeitinho", "concept")
+        assert index.search("jeitinho")[0].id == 4
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Session on an empty SQLite database."""
+    engine = create_anisa_engine(f"sqlite:///{tmp_path / 'anisa.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def knowledge(term):
+    return CulturalKnowledge(region="middle_east", variant="wasta", category="concept", term=term)
+
+
+class TestIndexFreshness:
+    """Test rebuilding the index when the knowledge table changes."""
+
+    def test_built_before_seeding_is_stale(self, db):
+        index = KnowledgeSearchIndex.from_session(db)
+        assert len(index) == 0 and not index.is_stale(db)
+
+        db.add(knowledge("wasta"))
+        db.commit()
+
+        assert index.is_stale(db)
+        assert KnowledgeSearchIndex.from_session(db).search("wasta")[0].term == "wasta"
+
+    def test_delete_and_validation_make_index_stale(self, db):
+        db.add_all([knowledge("wasta"), knowledge("guanxi")])
+        db.commit()
+        index = KnowledgeSearchIndex.from_session(db)
+
+        entry = db.query(CulturalKnowledge).filter_by(term="guanxi").one()
+        entry.validated, entry.validated_at = "approved", datetime.utcnow()
+        db.commit()
+        assert index.is_stale(db)
+
+        index = KnowledgeSearchIndex.from_session(db)
+        db.delete(entry)
+        db.commit()
+        assert index.is_stale(db)
+
+    def test_max_age(self, db):
+        index = KnowledgeSearchIndex.from_session(db)
+        assert not index.is_stale(db, max_age=60)
+        assert index.is_stale(db, max_age=0)
+
+    def test_index_without_snapshot_is_stale(self, db, index):
+        assert index.is_stale(db)
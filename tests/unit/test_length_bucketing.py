@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Length Bucketing Tests
+Batch composition of the length-bucketed training sampler.
+"""
+
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+import numpy as np
+
+from training.automl.huggingface_training import LengthBucketSampler
+
+
+class TestLengthBucketSampler:
+    """Test that batches cover the data once and group similar lengths."""
+
+    def test_covers_every_index_once(self):
+        sampler = LengthBucketSampler(np.arange(103) % 17, batch_size=8, bucket_size_multiplier=4)
+        batches = list(sampler)
+        assert len(batches) == len(sampler) == 13
+        assert sorted(i for batch in batches for i in batch) == list(range(103))
+
+    def test_reduces_padding(self):
+        lengths = np.random.default_rng(0).integers(5, 256, size=2000)
+        sampler = LengthBucketSampler(lengths, batch_size=16, bucket_size_multiplier=50)
+        padded = sum(len(b) * lengths[b].max() for b in sampler)
+        random_padded = sum(len(b) * lengths[b].max() for b in np.array_split(np.arange(2000), 125))
+        assert padded < 0.7 * random_padded
+
+    def test_epochs_reshuffle_deterministically(self):
+        sampler = LengthBucketSampler(np.arange(64), batch_size=4, bucket_size_multiplier=2)
+        first = list(sampler)
+        sampler.set_epoch(1)
+        assert list(sampler) != first
+        sampler.set_epoch(0)
+        assert list(sampler) == first
+
+    def test_no_shuffle_is_sorted_within_pools(self):
+        sampler = LengthBucketSampler([3, 1, 2, 0], batch_size=2, shuffle=False)
+        assert list(sampler) == [[3, 1], [2, 0]]
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Load Generator Tests
+Open-loop schedules, request log parsing and latency summaries.
+"""
+
+import sys
+import os
+
+# Add scripts to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'scripts'))
+
+import numpy as np
+import pytest
+
+from load_generator import RequestSpec, _logged_request, arrival_offsets, parse_mix, summarize
+
+
+class TestArrivalOffsets:
+    """Test uniform and Poisson schedules."""
+
+    def test_uniform_fills_duration(self):
+        offsets = arrival_offsets(10, 2.0)
+        assert offsets.size == 20
+        assert np.allclose(np.diff(offsets), 0.1)
+        assert offsets[0] == 0.0 and offsets[-1] < 2.0
+
+    def test_uniform_fractional_count(self):
+        offsets = arrival_offsets(3, 1.5)
+        assert offsets.size == 5
+        assert offsets[-1] < 1.5
+
+    def test_poisson_reaches_end_of_duration(self):
+        for seed in range(20):
+            offsets = arrival_offsets(50, 10.0, "poisson", seed)
+            assert offsets[-1] < 10.0
+            assert offsets[-1] > 9.5
+            assert np.all(np.diff(offsets) > 0)
+
+    def test_poisson_rate(self):
+        offsets = arrival_offsets(1000, 20.0, "poisson", seed=1)
+        assert abs(offsets.size - 20_000) < 4 * np.sqrt(20_000)
+
+    def test_poisson_is_seeded(self):
+        assert np.array_equal(arrival_offsets(5, 4.0, "poisson", 3), arrival_offsets(5, 4.0, "poisson", 3))
+
+
+class TestParseMix:
+    """Test endpoint mix parsing."""
+
+    def test_normalises_weights(self):
+        assert parse_mix("analyze=3, health=1") == {"analyze": 0.75, "health": 0.25}
+
+    def test_missing_weight_defaults_to_one(self):
+        assert parse_mix("analyze,health=1") == {"analyze": 0.5, "health": 0.5}
+
+    def test_rejects_zero_total(self):
+        with pytest.raises(ValueError):
+            parse_mix("analyze=0")
+
+
+class TestLoggedRequest:
+    """Test request log records."""
+
+    def test_path_with_body(self):
+        spec = _logged_request({"path": "/api/v2/analyze", "body": {"text": "hi"}}, "v2")
+        assert (spec.name, spec.method, spec.path, spec.body) == ("POST /api/v2/analyze", "POST", "/api/v2/analyze", {"text": "hi"})
+
+    def test_url_keeps_query_string(self):
+        spec = _logged_request({"url": "http://host/api/v2/knowledge/search?q=wasta", "method": "get"}, "v2")
+        assert (spec.name, spec.method, spec.path) == ("GET /api/v2/knowledge/search", "GET", "/api/v2/knowledge/search?q=wasta")
+
+    def test_text_only_goes_to_query_endpoint(self):
+        assert _logged_request({"text": "Build trust first"}, "v1").path == "/api/v1/query"
+        assert _logged_request({"json": {"query": "Build trust first"}}, "v2").path == "/api/v2/analyze"
+
+    def test_unusable_record(self):
+        assert _logged_request({"status": 200}, "v2") is None
+
+
+class TestSummarize:
+    """Test latency summaries over synthetic results."""
+
+    REQUESTS = [RequestSpec("analyze", "POST", "/api/v2/analyze"), RequestSpec("health", "GET", "/health")]
+
+    def summary(self, sent, done, statuses, warmup=0.0, duration=1.0, timeout=None):
+        offsets = np.arange(len(sent), dtype=np.float64) / len(sent) * duration
+        indexes = np.arange(len(sent)) % 2
+        results = {
+            "sent": offsets + np.asarray(sent, dtype=np.float64),
+            "done": offsets + np.asarray(done, dtype=np.float64),
+            "statuses": np.asarray(statuses, dtype=np.int16),
+            "failures": {},
+        }
+        return summarize(self.REQUESTS, offsets, indexes, results, warmup, duration, timeout)
+
+    def test_errors_count_in_corrected_latency(self):
+        # Eight fast successes and two timeouts after 5 s
+        done = [0.01] * 8 + [5.0, 5.0]
+        report = self.summary([0.0] * 10, done, [200] * 8 + [0, 0])
+
+        assert report["errors"] == 2
+        assert report["latency"]["corrected"]["count"] == 10
+        assert report["latency"]["corrected"]["max_ms"] == pytest.approx(5000.0)
+        assert report["latency"]["corrected"]["p99_ms"] > 4000.0
+        assert report["latency"]["corrected_success"]["count"] == 8
+        assert report["latency"]["corrected_success"]["max_ms"] == pytest.approx(10.0)
+
+    def test_corrected_includes_send_lag(self):
+        report = self.summary([0.2] * 4, [0.3] * 4, [200] * 4)
+
+        assert report["latency"]["corrected"]["p50_ms"] == pytest.approx(300.0)
+        assert report["latency"]["uncorrected"]["p50_ms"] == pytest.approx(100.0)
+        assert report["max_send_lag_ms"] == pytest.approx(200.0)
+
+    def test_unfinished_requests_count_at_timeout(self):
+        report = self.summary([0.0] * 4, [0.01, 0.01, 0.01, np.nan], [200, 200, 200, 0], timeout=2.0)
+
+        assert report["latency"]["corrected"]["max_ms"] == pytest.approx(2000.0)
+        assert report["statuses"] == {"200": 3, "transport_error": 1}
+
+    def test_warmup_excluded(self):
+        report = self.summary([0.0] * 10, [0.5] * 5 + [0.01] * 5, [500] * 5 + [200] * 5, warmup=0.5)
+
+        assert report["requests"] == 5
+        assert report["errors"] == 0
+        assert report["latency"]["corrected"]["max_ms"] == pytest.approx(10.0)
+
+    def test_per_endpoint_breakdown(self):
+        report = self.summary([0.0] * 4, [0.01, 0.02, 1.0, 0.02], [200, 200, 503, 200])
+
+        analyze, health = report["endpoints"]["analyze"], report["endpoints"]["health"]
+        assert (analyze["requests"], analyze["errors"], analyze["error_rate"]) == (2, 1, 0.5)
+        assert analyze["corrected"]["max_ms"] == pytest.approx(1000.0)
+        assert analyze["corrected_success"]["count"] == 1
+        assert health["errors"] == 0
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Lot Verification Cache Tests
+LRU behaviour and incremental aggregates for PANX lot timelines.
+"""
+
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from lot_cache import LotTimeline, LotVerificationCache, LotVerificationEntry
+
+
+def make_entry(entry_id, weights, adjustment=1.0, status="pending"):
+    """Build a verification entry."""
+    return LotVerificationEntry(
+        id=entry_id,
+        panx_event_id=f"event_{entry_id}",
+        validators=list(weights),
+        cultural_weights=weights,
+        consensus_adjustment=adjustment,
+        verification_status=status,
+        created_at=None,
+    )
+
+
+class TestLotTimeline:
+    """Test running aggregates."""
+
+    def test_aggregate_weights(self):
+        timeline = LotTimeline.from_entries("lot-1", [
+            make_entry(1, {"community": 0.6, "government": 0.4}, 1.2),
+            make_entry(2, {"community": 1.0}, 1.0, "verified"),
+        ])
+        assert timeline.verification_count == 2
+        assert timeline.aggregate_weights() == pytest.approx({"community": 0.8, "government": 0.4})
+        assert timeline.mean_consensus_adjustment() == pytest.approx(1.1)
+        assert timeline.status_counts == {"pending": 1, "verified": 1}
+
+    def test_empty_timeline(self):
+        timeline = LotTimeline(lot_id="lot-1")
+        assert timeline.mean_consensus_adjustment() == 1.0
+        assert timeline.summary()["first_verified_at"] is None
+
+
+class TestLotVerificationCache:
+    """Test LRU eviction and incremental updates."""
+
+    def test_lru_eviction(self):
+        cache = LotVerificationCache(max_lots=2, ttl_seconds=0)
+        for lot_id in ("a", "b"):
+            cache.put(LotTimeline(lot_id=lot_id))
+        cache.get("a")
+        cache.put(LotTimeline(lot_id="c"))
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+
+    def test_record_updates_cached_lot(self):
+        cache = LotVerificationCache(ttl_seconds=0)
+        cache.put(LotTimeline.from_entries("lot-1", [make_entry(1, {"community": 1.0})]))
+        cache.record("lot-1", make_entry(2, {"community": 0.5}))
+        assert cache.get("lot-1").aggregate_weights() == pytest.approx({"community": 0.75})
+
+    def test_record_ignores_uncached_lot(self):
+        cache = LotVerificationCache(ttl_seconds=0)
+        cache.record("lot-1", make_entry(1, {"community": 1.0}))
+        assert len(cache) == 0
+
+    def test_oversized_lot_evicted(self):
+        cache = LotVerificationCache(ttl_seconds=0, max_entries_per_lot=1)
+        cache.put(LotTimeline.from_entries("lot-1", [make_entry(1, {"community": 1.0})]))
+        cache.record("lot-1", make_entry(2, {"community": 1.0}))
+        assert cache.get("lot-1") is None
+
+    def test_hit_ratio(self):
+        cache = LotVerificationCache(ttl_seconds=0)
+        cache.put(LotTimeline(lot_id="lot-1"))
+        cache.get("lot-1")
+        cache.get("lot-2")
+        assert cache.stats()["hit_ratio"] == 0.5
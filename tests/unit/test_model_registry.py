@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Model Registry Tests
+Versioned artifacts, manifest activation and hot-swapping in ANISACore.
+"""
+
+import sys
+import os
+import asyncio
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+
+from config import ANISAConfig
+from core import ANISACore
+from model_registry import ModelRegistry, load_and_warm
+from models import CulturalVariant
+from training.automl.linear_training import LinearTrainingConfig, train_linear_detector
+
+
+SEED_TEXTS = {
+    ("ubuntu", "west_africa"): "community consent before mining with the cooperative in ghana",
+    ("guanxi", "east_asia"): "build trust and relationship networks in china before the deal",
+    ("wasta", "middle_east"): "family ties and influence with traditional authority in jordan",
+}
+UBUNTU_TEXT = "community consent before mining with the cooperative in ghana"
+
+
+def _train(tmp_path, name, relabel=None):
+    """Train and save a tiny detector; ``relabel`` maps variants to other variants."""
+    relabel = relabel or {}
+    records = [
+        {"text": f"{text} item {i}", "cultural_context": relabel.get(variant, variant), "region": region}
+        for i in range(30)
+        for (variant, region), text in SEED_TEXTS.items()
+    ]
+    detector, _ = train_linear_detector(records, LinearTrainingConfig(n_features=2 ** 16, test_size=0.2))
+    return str(detector.save(str(tmp_path / name)))
+
+
+@pytest.fixture(scope="module")
+def artifacts(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp("artifacts")
+    return {
+        "v1": _train(tmp_path, "v1"),
+        "v2": _train(tmp_path, "v2", relabel={"ubuntu": "guanxi", "guanxi": "ubuntu"}),
+    }
+
+
+class TestModelRegistry:
+    """Test registration, activation and loading."""
+
+    def test_first_version_is_activated(self, tmp_path, artifacts):
+        registry = ModelRegistry(str(tmp_path / "registry"))
+        registry.register(artifacts["v1"], version="v1", metrics={"accuracy": 1.0})
+        registry.register(artifacts["v2"], version="v2")
+
+        assert registry.versions() == ["v1", "v2"]
+        assert registry.active_version() == "v1"
+        assert registry.info(version="v1")["metrics"] == {"accuracy": 1.0}
+
+    def test_activate_is_visible_to_other_instances(self, tmp_path, artifacts):
+        root = str(tmp_path / "registry")
+        writer, reader = ModelRegistry(root), ModelRegistry(root)
+        writer.register(artifacts["v1"], version="v1")
+        writer.register(artifacts["v2"], version="v2")
+        assert reader.active_version() == "v1"
+
+        writer.activate("v2")
+        assert reader.active_version() == "v2"
+        with pytest.raises(KeyError):
+            writer.activate("missing")
+
+    def test_duplicate_version_is_rejected(self, tmp_path, artifacts):
+        registry = ModelRegistry(str(tmp_path / "registry"))
+        registry.register(artifacts["v1"], version="v1")
+        with pytest.raises(ValueError):
+            registry.register(artifacts["v1"], version="v1")
+
+    def test_kinds(self, tmp_path, artifacts):
+        registry = ModelRegistry(str(tmp_path / "registry"))
+        registry.register(artifacts["v1"], version="v1", kind="onnx")
+
+        assert registry.info(version="v1")["kind"] == "onnx"
+        with pytest.raises(ValueError, match="Unknown model kind"):
+            registry.register(artifacts["v2"], version="v2", kind="torchscript")
+
+    def test_load_and_warm_memory_maps_weights(self, tmp_path, artifacts):
+        registry = ModelRegistry(str(tmp_path / "registry"))
+        registry.register(artifacts["v1"], version="v1")
+
+        loaded = load_and_warm(registry, "cultural-detector")
+        assert loaded["version"] == "v1"
+        assert isinstance(loaded["model"].coef["variant"], np.memmap)
+        assert loaded["model"].predict_variants([UBUNTU_TEXT])[0][0] == CulturalVariant.UBUNTU
+
+
+class TestCoreHotSwap:
+    """Test background reloads in ANISACore."""
+
+    def _core(self, tmp_path, artifacts):
+        registry = ModelRegistry(str(tmp_path / "registry"))
+        registry.register(artifacts["v1"], version="v1")
+        registry.register(artifacts["v2"], version="v2")
+        config = ANISAConfig(
+            detector_backend="linear",
+            model_registry_dir=str(registry.root),
+            enable_micro_batching=False,
+        )
+        return ANISACore(config)
+
+    def test_core_loads_active_version(self, tmp_path, artifacts):
+        core = self._core(tmp_path, artifacts)
+        assert core.model_version == "v1"
+        assert core.auth_service.detect_cultural_variant(UBUNTU_TEXT) == CulturalVariant.UBUNTU
+
+    def test_reload_swaps_detector(self, tmp_path, artifacts):
+        core = self._core(tmp_path, artifacts)
+        result = asyncio.run(core.reload_detector("v2", activate=True))
+
+        assert result["previous_version"] == "v1"
+        assert result["version"] == "v2"
+        assert core.model_registry.active_version() == "v2"
+        assert core.auth_service.detect_cultural_variant(UBUNTU_TEXT) == CulturalVariant.GUANXI
+
+    def test_watch_picks_up_activation(self, tmp_path, artifacts):
+        core = self._core(tmp_path, artifacts)
+        core.config.model_poll_seconds = 0.01
+
+        async def scenario():
+            core.start_model_watch()
+            ModelRegistry(core.config.model_registry_dir).activate("v2")
+            for _ in range(200):
+                if core.model_version == "v2":
+                    break
+                await asyncio.sleep(0.01)
+            await core.stop_model_watch()
+
+        asyncio.run(scenario())
+        assert core.model_version == "v2"
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Monitoring Tests
+Stage histograms, sampled runtime metrics and multiprocess aggregation.
+"""
+
+import sys
+import os
+import asyncio
+import subprocess
+import textwrap
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from config import ANISAConfig
+from core import ANISACore
+from lot_cache import LotVerificationCache
+from monitoring import RuntimeMetrics, instrument_engine, stage_timer
+
+SRC = os.path.join(os.path.dirname(__file__), '..', '..', 'src')
+
+
+def _value(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestMonitoring:
+    """Test the Prometheus instrumentation."""
+
+    def test_stage_histograms(self):
+        before = _value("anisa_stage_duration_seconds_count", stage="authentication")
+        core = ANISACore(ANISAConfig())
+        core.add_stage_hook(stage_timer)
+        asyncio.run(core.process_cultural_query("We need to consult with the community elders."))
+
+        assert _value("anisa_stage_duration_seconds_count", stage="authentication") == before + 1
+
+    def test_sample_advances_counters_by_delta(self):
+        cache = LotVerificationCache(max_lots=4)
+        metrics = RuntimeMetrics(ANISACore(ANISAConfig()), caches={"test_lots": cache}, queues={"test_queue": lambda: 7})
+
+        cache.misses, cache.hits = 3, 5
+        metrics.sample()
+        cache.hits = 8
+        metrics.sample()
+        metrics.sample()
+
+        assert _value("anisa_cache_lookups_total", cache="test_lots", result="hit") == 8
+        assert _value("anisa_cache_lookups_total", cache="test_lots", result="miss") == 3
+        assert _value("anisa_queue_depth", queue="test_queue") == 7
+
+    def test_pool_usage(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path}/pool.db", poolclass=QueuePool, pool_size=2)
+        instrument_engine(engine)
+        metrics = RuntimeMetrics(ANISACore(ANISAConfig()), engine=engine)
+        in_use = _value("anisa_db_pool_connections", state="in_use")
+
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            assert _value("anisa_db_pool_connections", state="in_use") == in_use + 1
+        metrics.sample()
+
+        assert _value("anisa_db_pool_connections", state="in_use") == in_use
+        assert _value("anisa_db_pool_connections", state="size") == engine.pool.size()
+
+    def test_multiprocess_aggregation(self, tmp_path):
+        env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+        worker = textwrap.dedent("""
+            from monitoring import cache_lookups, queue_depth
+            cache_lookups.labels(cache="lots", result="hit").inc(2)
+            queue_depth.labels(queue="detection_batch").set(3)
+        """)
+        scrape = "from monitoring import render_latest; print(render_latest()[0].decode())"
+        for _ in range(2):
+            subprocess.run([sys.executable, "-c", worker], cwd=SRC, env=env, check=True)
+        output = subprocess.run(
+            [sys.executable, "-c", scrape], cwd=SRC, env=env, check=True, capture_output=True, text=True
+        ).stdout
+
+        assert 'anisa_cache_lookups_total{cache="lots",result="hit"} 4.0' in output
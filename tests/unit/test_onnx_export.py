@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+ONNX Export Tests
+Export, int8 quantization and batched ONNX Runtime inference of a tiny classifier.
+"""
+
+import sys
+import os
+import json
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("onnx")
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from model_registry import ModelRegistry, load_and_warm
+from models import CulturalRegion, CulturalVariant
+from training.automl import onnx_export
+from training.automl.onnx_export import (
+    FP32_MODEL, INT8_MODEL, LABELS_FILE, ONNXCulturalClassifier, ONNXCulturalDetector, ONNXExportConfig,
+    benchmark_model, compare_fp32_int8, export_and_quantize,
+)
+
+LABELS = ["ubuntu", "guanxi", "wasta"]
+WORDS = ["community", "consent", "before", "trade", "trust", "family", "ties", "elders", "network", "deal"]
+TEXTS = [
+    "community consent before trade",
+    "trust",
+    "family ties and elders before the deal " * 4,
+    "network deal",
+    "elders",
+]
+
+
+def save_tiny_classifier(model_dir, labels_file=True):
+    """Save a randomly initialised one-layer BERT classifier with a word-level vocab."""
+    model_dir.mkdir(parents=True, exist_ok=True)
+    vocab = model_dir / "vocab.txt"
+    vocab.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + WORDS) + "\n")
+    tokenizer = transformers.BertTokenizer(str(vocab))
+    torch.manual_seed(0)
+    config = transformers.BertConfig(
+        vocab_size=len(tokenizer), hidden_size=16, num_hidden_layers=1, num_attention_heads=2,
+        intermediate_size=32, max_position_embeddings=64, num_labels=len(LABELS),
+        id2label=dict(enumerate(LABELS)), label2id={label: i for i, label in enumerate(LABELS)},
+    )
+    model = transformers.BertForSequenceClassification(config)
+    model.save_pretrained(str(model_dir))
+    tokenizer.save_pretrained(str(model_dir))
+    if labels_file:
+        with open(model_dir / LABELS_FILE, "w", encoding="utf-8") as f:
+            json.dump({"labels": LABELS}, f)
+    return model, tokenizer
+
+
+@pytest.fixture(scope="module")
+def exported(tmp_path_factory):
+    """Tiny classifier exported to fp32 and int8 ONNX."""
+    root = tmp_path_factory.mktemp("onnx")
+    model, tokenizer = save_tiny_classifier(root / "model")
+    config = ONNXExportConfig(model_dir=str(root / "model"), output_dir=str(root / "onnx"), max_length=32)
+    paths = export_and_quantize(config)
+    return model, tokenizer, config, paths
+
+
+class TestExport:
+    """Test the exported graphs and their serving directory."""
+
+    def test_writes_self_contained_directory(self, exported):
+        _, _, config, paths = exported
+        output = os.listdir(config.output_dir)
+
+        assert paths["fp32"].name == FP32_MODEL and paths["int8"].name == INT8_MODEL
+        assert {FP32_MODEL, INT8_MODEL, LABELS_FILE, "export.json", "vocab.txt"} <= set(output)
+
+    def test_fp32_graph_matches_torch(self, exported):
+        model, tokenizer, _, paths = exported
+        classifier = ONNXCulturalClassifier(str(paths["fp32"]), max_length=32)
+        with torch.no_grad():
+            encoded = tokenizer(TEXTS, truncation=True, max_length=32, padding=True, return_tensors="pt")
+            expected = torch.softmax(model(**encoded).logits, dim=-1).numpy()
+
+        np.testing.assert_allclose(classifier.predict_proba(TEXTS), expected, atol=1e-4)
+
+    def test_int8_graph_stays_close_to_fp32(self, exported):
+        _, _, _, paths = exported
+        fp32 = ONNXCulturalClassifier(str(paths["fp32"]), max_length=32).predict_proba(TEXTS)
+        int8 = ONNXCulturalClassifier(str(paths["int8"]), max_length=32).predict_proba(TEXTS)
+
+        np.testing.assert_allclose(int8, fp32, atol=0.1)
+
+    def test_labels_from_model_config_without_labels_file(self, tmp_path):
+        save_tiny_classifier(tmp_path / "model", labels_file=False)
+        config = ONNXExportConfig(model_dir=str(tmp_path / "model"), output_dir=str(tmp_path / "onnx"), quantize=False)
+        paths = export_and_quantize(config)
+
+        assert set(paths) == {"fp32"}
+        with open(tmp_path / "onnx" / LABELS_FILE, encoding="utf-8") as f:
+            assert json.load(f) == {"labels": LABELS}
+
+
+class TestONNXCulturalClassifier:
+    """Test batching, ordering, softmax and label mapping."""
+
+    @pytest.fixture
+    def classifier(self, exported):
+        return ONNXCulturalClassifier(str(exported[3]["fp32"]), max_length=32)
+
+    def test_batches_keep_input_order(self, classifier):
+        batched = classifier.predict_proba(TEXTS, batch_size=2)
+        one_by_one = np.vstack([classifier.predict_proba([text]) for text in TEXTS])
+
+        np.testing.assert_allclose(batched, one_by_one, atol=1e-5)
+
+    def test_probabilities_sum_to_one(self, classifier):
+        probs = classifier.predict_proba(TEXTS)
+        assert probs.shape == (len(TEXTS), len(LABELS))
+        np.testing.assert_allclose(probs.sum(axis=1), 1.0, atol=1e-5)
+
+    def test_softmax_is_stable_for_large_logits(self, classifier, monkeypatch):
+        class LargeLogits:
+            def run(self, names, feeds):
+                return [np.tile([[1000.0, 0.0, -1000.0]], (len(feeds["input_ids"]), 1)).astype(np.float32)]
+
+        monkeypatch.setattr(classifier, "session", LargeLogits())
+        probs = classifier.predict_proba(TEXTS[:2])
+
+        assert np.isfinite(probs).all()
+        np.testing.assert_allclose(probs, [[1.0, 0.0, 0.0]] * 2, atol=1e-6)
+
+    def test_predict_maps_argmax_to_labels(self, classifier):
+        probs = classifier.predict_proba(TEXTS)
+        predictions = classifier.predict(TEXTS, batch_size=2)
+
+        assert [p["label"] for p in predictions] == [LABELS[k] for k in probs.argmax(axis=1)]
+        assert [p["confidence"] for p in predictions] == pytest.approx(probs.max(axis=1).tolist(), abs=1e-5)
+        assert classifier.predict([]) == []
+
+    def test_truncates_to_max_length(self, exported):
+        long_text = " ".join(WORDS * 20)  # longer than the model's 64 positions
+        classifier = ONNXCulturalClassifier(str(exported[3]["fp32"]), max_length=16)
+
+        assert classifier.predict_proba([long_text]).shape == (1, len(LABELS))
+
+
+class TestBenchmark:
+    """Test the fp32/int8 comparison."""
+
+    def test_benchmark_model(self, exported):
+        classifier = ONNXCulturalClassifier(str(exported[3]["fp32"]), max_length=32)
+        labels = [p["label"] for p in classifier.predict(TEXTS)]
+        result = benchmark_model(classifier, TEXTS, labels, "fp32", batch_size=2, warmup=1)
+
+        assert result.accuracy == 1.0
+        assert set(result.latency_ms) == {"p50", "p95", "p99"}
+        assert result.batch_throughput > 0 and result.size_mb > 0
+
+    def test_compare_uses_export_max_length(self, exported, monkeypatch):
+        _, _, config, _ = exported
+        seen = []
+        benchmark = onnx_export.benchmark_model
+
+        def recording_benchmark(classifier, *args, **kwargs):
+            seen.append((kwargs.get("batch_size"), classifier.model_path.name, classifier.max_length))
+            return benchmark(classifier, *args, **kwargs)
+
+        monkeypatch.setattr(onnx_export, "benchmark_model", recording_benchmark)
+        results = compare_fp32_int8(config.output_dir, TEXTS, ["ubuntu"] * len(TEXTS), batch_size=2,
+                                    max_length=config.max_length)
+
+        assert [r.model for r in results] == ["fp32", "int8"]
+        assert seen == [(2, FP32_MODEL, 32), (2, INT8_MODEL, 32)]
+
+
+class TestONNXCulturalDetector:
+    """Test the detector adapter and loading it through the model registry."""
+
+    def test_prefers_int8_and_export_max_length(self, exported):
+        _, _, config, _ = exported
+        detector = ONNXCulturalDetector.load(config.output_dir)
+
+        assert detector.classifier.model_path.name == INT8_MODEL
+        assert detector.classifier.max_length == 32
+        assert ONNXCulturalDetector.load(config.output_dir, quantized=False).classifier.model_path.name == FP32_MODEL
+
+    def test_regions_follow_variants(self, exported):
+        detector = ONNXCulturalDetector.load(exported[2].output_dir, quantized=False)
+        variants = detector.predict_variants(TEXTS)
+        regions = detector.predict_regions(TEXTS)
+
+        homes = {
+            CulturalVariant.UBUNTU: CulturalRegion.WEST_AFRICA,
+            CulturalVariant.GUANXI: CulturalRegion.EAST_ASIA,
+            CulturalVariant.WASTA: CulturalRegion.MIDDLE_EAST,
+        }
+        assert [(homes[v], p) for v, p in variants] == regions
+        assert detector.predict_variants([]) == []
+
+    def test_registry_loads_onnx_kind(self, exported, tmp_path):
+        registry = ModelRegistry(str(tmp_path / "registry"))
+        registry.register(exported[2].output_dir, version="onnx-v1", kind="onnx")
+
+        loaded = load_and_warm(registry, "cultural-detector")
+        assert loaded["version"] == "onnx-v1"
+        assert isinstance(loaded["model"], ONNXCulturalDetector)
+        assert isinstance(loaded["model"].predict_variants(["trust"])[0][0], CulturalVariant)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Profiling Tests
+Sampling profiler output and profile runs over the pipeline and an endpoint.
+"""
+
+import sys
+import os
+import asyncio
+import pstats
+import time
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from config import ANISAConfig
+from core import ANISACore
+from profiling import EndpointWorkload, PipelineWorkload, ProfileConfig, SamplingProfiler, run_profile
+
+
+def _busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+
+class TestSamplingProfiler:
+    """Test collapsed stacks and hot-function summaries."""
+
+    def test_collapsed_stacks_name_the_hot_function(self, tmp_path):
+        with SamplingProfiler(interval_ms=1.0) as sampler:
+            _busy_loop(0.2)
+
+        assert sampler.samples > 0
+        path = sampler.write_collapsed(str(tmp_path / "busy.collapsed"))
+        lines = path.read_text().splitlines()
+        assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+        assert any("_busy_loop (unit/test_profiling.py" in line for line in lines)
+
+        top = sampler.top(5)
+        assert top[0]["function"].startswith("_busy_loop")
+        assert top[0]["total_pct"] >= top[0]["self_pct"]
+
+
+class TestRunProfile:
+    """Test profile runs and the files they write."""
+
+    def test_pipeline_profile_writes_all_outputs(self, tmp_path):
+        workload = PipelineWorkload(ANISACore(ANISAConfig()), ["How can I build a strong community?"])
+        config = ProfileConfig(output_dir=str(tmp_path), name="pipe", count=20, warmup=2, sampling_seconds=0.1)
+        result = asyncio.run(run_profile(workload, config))
+
+        assert set(result.files) == {"pstats", "collapsed", "top"}
+        assert result.iterations["cprofile"] == 20 and result.iterations["sampling"] >= 20
+        stats = pstats.Stats(result.files["pstats"])
+        assert any(func[2] == "process_cultural_query" for func in stats.stats)
+        assert "== cProfile" in (tmp_path / "pipe-top.txt").read_text()
+
+    def test_endpoint_profile_counts_failures(self, tmp_path):
+        from fastapi import FastAPI, HTTPException
+
+        app = FastAPI()
+
+        @app.post("/echo")
+        async def echo(body: dict):
+            if body["text"] == "bad":
+                raise HTTPException(status_code=400)
+            return body
+
+        workload = EndpointWorkload(app, "/echo", texts=["good", "bad"])
+        config = ProfileConfig(output_dir=str(tmp_path), name="echo", profiler="cprofile", count=10, warmup=0)
+        result = asyncio.run(run_profile(workload, config))
+
+        assert result.failures == 5
+        assert workload.statuses == {200: 5, 400: 5}
+        assert "collapsed" not in result.files
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Historical Reprocessing Tests
+Checkpointed, parallel re-scoring of stored analyses.
+"""
+
+import sys
+import os
+import json
+import tempfile
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+# Must be set before `database` is first imported, which binds its engine
+os.environ.setdefault("ANISA_DB_URL", f"sqlite:///{tempfile.mkdtemp(prefix='anisa-test-')}/anisa.db")
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, CulturalContext, create_anisa_engine
+from reprocess import ReprocessCheckpoint, ReprocessConfig, ReprocessJob
+from services import LEXICON_VERSION
+
+
+TEXTS = [
+    "We need to consult with the community before mining",
+    "Build trust and relationships before the deal",
+    "Find a creative solution with limited resources",
+    "Use family connections to speed up the permit",
+]
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Eight stored analyses; ids 7 and 8 are already at the current lexicon."""
+    engine = create_anisa_engine(f"sqlite:///{tmp_path / 'anisa.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        for i in range(8):
+            db.add(CulturalContext(
+                text=TEXTS[i % len(TEXTS)],
+                region="unknown",
+                variant="unknown",
+                confidence_score=0.0,
+                cultural_markers={},
+                lexicon_version=LEXICON_VERSION if i >= 6 else "0",
+            ))
+        db.commit()
+    yield factory
+    engine.dispose()
+
+
+def rows(session_factory):
+    with session_factory() as db:
+        return {
+            c.id: (c.lexicon_version, c.variant)
+            for c in db.query(CulturalContext).order_by(CulturalContext.id)
+        }
+
+
+def make_job(session_factory, tmp_path, **overrides):
+    config = ReprocessConfig(chunk_size=2, workers=1, checkpoint_path=str(tmp_path / "checkpoint.json"), **overrides)
+    return ReprocessJob(config, session_factory=session_factory)
+
+
+class TestReprocessCheckpoint:
+    """Test checkpoint persistence."""
+
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "state" / "checkpoint.json")
+        ReprocessCheckpoint(lexicon_version="v2", last_id=42, processed=40, changed=3).save(path)
+
+        loaded = ReprocessCheckpoint.load(path, "v2")
+        assert (loaded.last_id, loaded.processed, loaded.changed) == (42, 40, 3)
+        assert loaded.updated_at is not None
+
+    def test_other_lexicon_version_starts_fresh(self, tmp_path):
+        path = str(tmp_path / "checkpoint.json")
+        ReprocessCheckpoint(lexicon_version="v1", last_id=42).save(path)
+
+        assert ReprocessCheckpoint.load(path, "v2").last_id == 0
+
+
+class TestReprocessJob:
+    """Test stale-row selection, resume and forced re-scoring."""
+
+    def test_rescores_only_stale_rows(self, session_factory, tmp_path):
+        checkpoint = make_job(session_factory, tmp_path).run()
+
+        assert checkpoint.completed
+        assert checkpoint.processed == 6
+        assert checkpoint.last_id == 6
+        after = rows(session_factory)
+        assert all(version == LEXICON_VERSION for version, _ in after.values())
+        assert all(variant != "unknown" for _, variant in list(after.values())[:6])
+        assert [after[7][1], after[8][1]] == ["unknown", "unknown"]
+
+        saved = json.loads((tmp_path / "checkpoint.json").read_text())
+        assert saved["completed"] and saved["processed"] == 6
+
+    def test_resumes_from_checkpoint(self, session_factory, tmp_path):
+        ReprocessCheckpoint(lexicon_version=LEXICON_VERSION, last_id=4, processed=4).save(
+            str(tmp_path / "checkpoint.json")
+        )
+        checkpoint = make_job(session_factory, tmp_path).run()
+
+        assert checkpoint.completed
+        assert checkpoint.processed == 6
+        after = rows(session_factory)
+        assert [after[i][0] for i in range(1, 5)] == ["0"] * 4
+        assert [after[i][0] for i in (5, 6)] == [LEXICON_VERSION] * 2
+
+    def test_restart_ignores_checkpoint(self, session_factory, tmp_path):
+        ReprocessCheckpoint(lexicon_version=LEXICON_VERSION, last_id=4, processed=4).save(
+            str(tmp_path / "checkpoint.json")
+        )
+        checkpoint = make_job(session_factory, tmp_path, restart=True).run()
+
+        assert checkpoint.processed == 6
+        assert all(version == LEXICON_VERSION for version, _ in rows(session_factory).values())
+
+    def test_completed_checkpoint_starts_over(self, session_factory, tmp_path):
+        make_job(session_factory, tmp_path).run()
+        checkpoint = make_job(session_factory, tmp_path).run()
+
+        assert checkpoint.completed
+        assert checkpoint.processed == 0
+
+    def test_all_rescores_current_rows(self, session_factory, tmp_path):
+        checkpoint = make_job(session_factory, tmp_path, only_stale=False).run()
+
+        assert checkpoint.processed == 8
+        after = rows(session_factory)
+        assert all(variant != "unknown" for _, variant in after.values())
+        assert checkpoint.changed == 8
+
+    def test_stop_before_run_leaves_checkpoint_incomplete(self, session_factory, tmp_path):
+        job = make_job(session_factory, tmp_path)
+        job.stop()
+        checkpoint = job.run()
+
+        assert not checkpoint.completed
+        assert checkpoint.processed == 0
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Hyperparameter Search Tests
+Parameter sampling, median pruning and the parallel search driver.
+"""
+
+import sys
+import os
+import json
+import threading
+from functools import partial
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+import numpy as np
+import pytest
+
+from training.automl.search import (
+    Choice, LogUniform, MedianPruner, SearchConfig, TrialPruned, TrialReporter,
+    best_trial, linear_objective, run_search, sample_params,
+)
+
+
+SEED_TEXTS = {
+    ("ubuntu", "west_africa"): "community consent before mining with the cooperative in ghana",
+    ("guanxi", "east_asia"): "build trust and relationship networks in china before the deal",
+    ("wasta", "middle_east"): "family ties and influence with traditional authority in jordan",
+}
+
+
+class TestSampling:
+    """Test search space sampling."""
+
+    def test_sample_params_is_seeded(self):
+        space = {"C": LogUniform(0.1, 10.0), "ngram_max": Choice([1, 2, 3]), "min_df": 1}
+        first = sample_params(space, np.random.default_rng(7))
+        second = sample_params(space, np.random.default_rng(7))
+        assert first == second
+        assert 0.1 <= first["C"] <= 10.0
+        assert first["ngram_max"] in (1, 2, 3)
+        assert first["min_df"] == 1
+
+
+class TestMedianPruner:
+    """Test the median stopping rule."""
+
+    def test_prunes_below_median_after_min_trials(self):
+        pruner = MedianPruner({}, threading.Lock(), min_trials=3)
+        for value in (0.6, 0.7, 0.8):
+            assert not pruner.should_prune(0, value)
+        assert pruner.should_prune(0, 0.5)
+        assert not pruner.should_prune(0, 0.9)
+
+    def test_warmup_steps_are_never_pruned(self):
+        pruner = MedianPruner({}, threading.Lock(), min_trials=1, warmup_steps=1)
+        pruner.should_prune(0, 0.9)
+        assert not pruner.should_prune(0, 0.1)
+
+    def test_reporter_raises_when_pruned(self):
+        pruner = MedianPruner({0: [0.8, 0.9]}, threading.Lock(), min_trials=2)
+        reporter = TrialReporter(trial=3, pruner=pruner)
+        with pytest.raises(TrialPruned):
+            reporter(0, 0.1)
+        assert reporter.intermediate == [(0, 0.1)]
+
+
+class TestRunSearch:
+    """Test the process-pool driver on the linear detector."""
+
+    def test_records_every_trial(self, tmp_path):
+        pytest.importorskip("sklearn")
+        data = tmp_path / "train.jsonl"
+        with open(data, "w", encoding="utf-8") as f:
+            for i in range(40):
+                for (variant, region), text in SEED_TEXTS.items():
+                    f.write(json.dumps({"text": f"{text} item {i}", "cultural_context": variant, "region": region}) + "\n")
+
+        config = SearchConfig(
+            n_trials=4, workers=2, min_trials_before_pruning=2, results_path=str(tmp_path / "results.jsonl"),
+        )
+        space = {"C": LogUniform(0.5, 8.0), "ngram_max": Choice([1, 2]), "n_features": 2 ** 14}
+        records = run_search(partial(linear_objective, data=(str(data),)), space, config)
+
+        assert sorted(r["trial"] for r in records) == [0, 1, 2, 3]
+        assert all(r["status"] in ("complete", "pruned") for r in records)
+        assert all(r["threads"] == 1 and r["wall_seconds"] > 0 for r in records)
+        with open(config.results_path, encoding="utf-8") as f:
+            assert len(f.readlines()) == 4
+        best = best_trial(records)
+        assert best is not None and best["metrics"]["accuracy"] == 1.0
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Streaming Training Data Tests
+Sharded JSONL round trips and request-log sources.
+"""
+
+import sys
+import os
+import json
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+import pytest
+
+from training.data.data_collector import CulturalDataCollector
+from training.data.streaming import JsonlShardWriter, iter_jsonl, iter_request_log_examples
+
+
+class TestJsonlShardWriter:
+    """Test shard rotation and reading back."""
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_round_trip_across_shards(self, tmp_path, compress):
+        with JsonlShardWriter(tmp_path, max_records_per_shard=3, compress=compress) as writer:
+            writer.write_all({"i": i} for i in range(7))
+        assert len(writer.paths) == 3
+        assert [r["i"] for r in iter_jsonl(tmp_path)] == list(range(7))
+
+        manifest = json.loads((tmp_path / "shard-manifest.json").read_text())
+        assert manifest["total_records"] == 7
+        assert [s["records"] for s in manifest["shards"]] == [3, 3, 1]
+
+    def test_rewrite_removes_stale_shards(self, tmp_path):
+        with JsonlShardWriter(tmp_path, max_records_per_shard=1) as writer:
+            writer.write_all({"i": i} for i in range(3))
+        with JsonlShardWriter(tmp_path, max_records_per_shard=1) as writer:
+            writer.write({"i": 0})
+        assert list(iter_jsonl(tmp_path)) == [{"i": 0}]
+
+    def test_skips_malformed_lines(self, tmp_path):
+        path = tmp_path / "log.jsonl"
+        path.write_text('{"a": 1}\nnot json\n\n{"a": 2}\n')
+        assert [r["a"] for r in iter_jsonl(path)] == [1, 2]
+
+
+class TestSources:
+    """Test collector streaming and request-log examples."""
+
+    def test_collector_streams_seed_data(self, tmp_path):
+        collector = CulturalDataCollector(data_dir=str(tmp_path))
+        shards = collector.stream_training_data(collector.iter_initial_training_data(), name="seed")
+        records = list(collector.iter_training_data("seed"))
+        assert shards and len(records) == len(collector.collect_initial_training_data())
+        assert {"text", "cultural_context", "region"} <= set(records[0])
+
+    def test_request_logs_are_labelled(self, tmp_path):
+        path = tmp_path / "requests.jsonl"
+        path.write_text(
+            json.dumps({"body": {"text": "community consensus"}}) + "\n"
+            + json.dumps({"text": "labelled", "cultural_context": "wasta", "region": "middle_east"}) + "\n"
+            + json.dumps({"status": 200}) + "\n"
+        )
+        labeler = lambda text: {"cultural_context": "ubuntu", "region": "west_africa"}
+        examples = list(iter_request_log_examples(path, labeler=labeler))
+        assert [e["cultural_context"] for e in examples] == ["ubuntu", "wasta"]
+        assert examples[1]["region"] == "middle_east"
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tokenized Dataset Cache Tests
+Concurrent writers of the same HFCulturalTrainer cache entry.
+"""
+
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+import pytest
+
+from training.automl import huggingface_training
+from training.automl.huggingface_training import HFConfig, HFCulturalTrainer
+
+
+class FakeDataset:
+    """Stands in for a DatasetDict; saves a single marker file."""
+
+    def __init__(self, owner):
+        self.owner = owner
+
+    def save_to_disk(self, path):
+        os.makedirs(path)
+        with open(os.path.join(path, "owner"), "w") as f:
+            f.write(self.owner)
+
+
+@pytest.fixture
+def trainer(tmp_path, monkeypatch):
+    """Trainer without a model whose cache entry is tmp_path/cache/entry."""
+    def load_from_disk(path):
+        with open(os.path.join(path, "owner")) as f:
+            return f.read()
+
+    monkeypatch.setattr(huggingface_training, "load_from_disk", load_from_disk, raising=False)
+    trainer = HFCulturalTrainer.__new__(HFCulturalTrainer)
+    trainer.config = HFConfig(cache_dir=str(tmp_path / "cache"))
+    trainer._cache_path = lambda data_hash: tmp_path / "cache" / "entry"
+    trainer._split_and_tokenize = lambda built: built
+    return trainer
+
+
+def leftovers(tmp_path):
+    return sorted(p.name for p in (tmp_path / "cache").iterdir())
+
+
+class TestTokenizedCache:
+    """Test that racing builds share one cache entry."""
+
+    def test_builds_and_caches(self, trainer, tmp_path):
+        assert trainer._cached("hash", lambda: FakeDataset("first")) == "first"
+        assert trainer._cached("hash", lambda: FakeDataset("second")) == "first"
+        assert leftovers(tmp_path) == ["entry"]
+
+    def test_entry_cached_during_build_wins(self, trainer, tmp_path):
+        def build():
+            # Another trial finishes the same entry while this one tokenizes
+            FakeDataset("other").save_to_disk(str(tmp_path / "cache" / "entry"))
+            return FakeDataset("mine")
+
+        assert trainer._cached("hash", build) == "other"
+        assert leftovers(tmp_path) == ["entry"]
+
+    def test_entry_cached_during_save_wins(self, trainer, tmp_path):
+        class RacingDataset(FakeDataset):
+            def save_to_disk(self, path):
+                FakeDataset("other").save_to_disk(str(tmp_path / "cache" / "entry"))
+                super().save_to_disk(path)
+
+        assert trainer._cached("hash", lambda: RacingDataset("mine")) == "other"
+        assert leftovers(tmp_path) == ["entry"]
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tracing Tests
+Span nesting, request ID propagation, sampling and the file exporters.
+"""
+
+import sys
+import os
+import asyncio
+import json
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from sqlalchemy import Column, Integer, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from config import ANISAConfig
+from core import ANISACore, PIPELINE_STAGES
+from tracing import JsonlSpanExporter, OtlpFileSpanExporter, Tracer
+
+REQUEST_ID = "3f1c2b4e-9d2a-4c4e-8f0a-6b1d2c3e4f50"
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+class TestTracer:
+    """Test span creation and export."""
+
+    def test_disabled_tracer_is_noop(self):
+        tracer = Tracer()
+        with tracer.span("request") as span:
+            assert span is None
+        assert tracer.start_span("request") is None
+
+    def test_request_spans_share_request_id(self, tmp_path):
+        path = str(tmp_path / "spans.jsonl")
+        core = ANISACore(ANISAConfig(trace_exporter="jsonl", trace_path=path, trace_sample_rate=1.0))
+
+        async def request():
+            with core.tracer.span("POST /api/v2/query", kind="server", request_id=REQUEST_ID):
+                await core.process_cultural_query("We need to consult with the community elders.")
+
+        asyncio.run(request())
+        core.tracer.close()
+        spans = _read(path)
+
+        root = next(span for span in spans if span["parent_span_id"] is None)
+        assert root["trace_id"] == REQUEST_ID.replace("-", "")
+        assert {span["request_id"] for span in spans} == {REQUEST_ID}
+        stages = {span["attributes"]["anisa.stage"] for span in spans if span["name"].startswith("stage.")}
+        assert stages == set(PIPELINE_STAGES) - {"trade_response"}
+        assert all(span["parent_span_id"] == root["span_id"] for span in spans if span is not root)
+
+    def test_sampling_keeps_slow_traces(self, tmp_path):
+        path = str(tmp_path / "spans.jsonl")
+        tracer = Tracer(JsonlSpanExporter(path), sample_rate=0.0, slow_ms=5.0)
+
+        with tracer.span("fast"):
+            pass
+        with tracer.span("slow"):
+            with tracer.span("dependency"):
+                asyncio.run(asyncio.sleep(0.01))
+        tracer.close()
+
+        assert [span["name"] for span in _read(path)] == ["slow", "dependency"]
+
+    def test_flush_spans_and_otlp_export(self, tmp_path):
+        path = str(tmp_path / "spans.otlp.jsonl")
+        tracer = Tracer(OtlpFileSpanExporter(path))
+        Base = declarative_base()
+
+        class Row(Base):
+            __tablename__ = "rows"
+            id = Column(Integer, primary_key=True)
+
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        factory = sessionmaker(bind=engine)
+        tracer.instrument_sessions(factory)
+
+        with tracer.span("handler", request_id=REQUEST_ID):
+            session = factory()
+            session.add(Row())
+            session.commit()
+            session.close()
+        tracer.close()
+
+        (request,) = _read(path)
+        spans = request["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        flush = next(span for span in spans if span["name"] == "db.flush")
+        assert flush["kind"] == 3
+        assert flush["parentSpanId"] == next(span["spanId"] for span in spans if span["name"] == "handler")
+        attributes = {attribute["key"]: attribute["value"] for attribute in flush["attributes"]}
+        assert attributes["db.new"] == {"intValue": "1"}
+        assert attributes["anisa.request_id"] == {"stringValue": REQUEST_ID}
+
+    def test_trace_request_names_span_after_route(self, tmp_path):
+        from fastapi import FastAPI, Request
+        from fastapi.testclient import TestClient
+
+        path = str(tmp_path / "spans.jsonl")
+        tracer = Tracer(JsonlSpanExporter(path))
+        app = FastAPI()
+
+        @app.middleware("http")
+        async def trace_requests(request: Request, call_next):
+            response, _ = await tracer.trace_request(request, call_next, REQUEST_ID)
+            return response
+
+        @app.get("/items/{item_id}")
+        async def item(item_id: int):
+            return {"id": item_id}
+
+        assert TestClient(app).get("/items/7").status_code == 200
+        tracer.close()
+
+        (span,) = _read(path)
+        assert span["name"] == "GET /items/{item_id}"
+        assert span["kind"] == "server"
+        assert span["attributes"]["http.route"] == "/items/{item_id}"
+        assert span["attributes"]["http.status_code"] == 200